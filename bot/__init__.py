@@ -3,6 +3,6 @@
 Пакет для конфігурації та ініціалізації бота.
 """
 
-from .bot_instance import bot, init_bot
+from .bot_instance import bot, handler_bot, init_bot
 
-__all__ = ['bot', 'init_bot']
+__all__ = ['bot', 'handler_bot', 'init_bot']
@@ -1,18 +1,30 @@
 # -*- coding: utf-8 -*-
 
-from telebot import TeleBot
-from config.config import TOKEN
+from config.config import TOKEN, BOT_RUNTIME, HANDLER_WORKERS
+from utils.handler_runtime import ThreadedBotApi
 
 print("[*] Creating bot instance...", flush=True)
-bot = TeleBot(TOKEN, parse_mode='HTML')
 
-try:
-    bot_info = bot.get_me()
-    print(f"[OK] Bot instance created: @{bot_info.username}", flush=True)
-except Exception as e:
-    print(f"[ERROR] Cannot connect to Telegram API: {e}", flush=True)
-    print("[!] Please check your internet connection and TOKEN", flush=True)
-    raise
+if BOT_RUNTIME == 'asyncio':
+    # З'єднання з Bot API перевіряється при запуску циклу подій (utils/async_runtime.py)
+    from utils.async_runtime import create_async_bot
+    bot = create_async_bot(TOKEN)
+    handler_bot = bot
+    print("[OK] Bot instance created (asyncio)", flush=True)
+else:
+    from utils.update_dispatcher import ShardedTeleBot
+    # Оновлення одного користувача обробляються по черзі, різних - паралельно (HANDLER_WORKERS потоків)
+    bot = ShardedTeleBot(TOKEN, workers=HANDLER_WORKERS, parse_mode='HTML')
+    # Обробники - корутини; ThreadedBotApi виконує їх у потоках шардів
+    handler_bot = ThreadedBotApi(bot)
+    
+    try:
+        bot_info = bot.get_me()
+        print(f"[OK] Bot instance created: @{bot_info.username}", flush=True)
+    except Exception as e:
+        print(f"[ERROR] Cannot connect to Telegram API: {e}", flush=True)
+        print("[!] Please check your internet connection and TOKEN", flush=True)
+        raise
 
 
 def init_bot():
@@ -25,14 +37,19 @@ def init_bot():
         from handlers import start, income, expenses, finance, settings, misc, report, categories
         
         print("[*] Registering handlers...", flush=True)
-        start.register_handlers(bot)
-        income.register_handlers(bot)
-        expenses.register_handlers(bot)
-        finance.register_handlers(bot)
-        settings.register_handlers(bot)
-        categories.register_handlers(bot)
-        report.register_handlers(bot)
-        misc.register_handlers(bot)
+        start.register_handlers(handler_bot)
+        income.register_handlers(handler_bot)
+        expenses.register_handlers(handler_bot)
+        finance.register_handlers(handler_bot)
+        settings.register_handlers(handler_bot)
+        categories.register_handlers(handler_bot)
+        report.register_handlers(handler_bot)
+        misc.register_handlers(handler_bot)
+        
+        # callback_query обробляються одним обробником з індексованим пошуком
+        from utils.callback_router import callback_router
+        callback_router.attach(handler_bot)
+        print(f"[OK] Callback router attached: {len(callback_router)} routes", flush=True)
         
         print("[OK] Bot initialized successfully!", flush=True)
         print("[OK] Registered handlers: start, income, expenses, finance, settings, categories, report, misc", flush=True)
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from .config import TOKEN
+from .config import TOKEN, DB_STORAGE_PROFILE, HTML_REPORT_WORKERS
 from .constants import (
     INCOME_TYPES,
     EXPENSE_TYPES,
@@ -13,6 +13,8 @@ from .constants import (
 
 __all__ = [
     'TOKEN',
+    'DB_STORAGE_PROFILE',
+    'HTML_REPORT_WORKERS',
     'INCOME_TYPES',
     'EXPENSE_TYPES',
     'TIME_PERIODS',
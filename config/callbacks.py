@@ -23,6 +23,9 @@ CALLBACK_PERIOD_MONTH = 'period_month'
 CALLBACK_PERIOD_YEAR = 'period_year'
 CALLBACK_ANOTHER_PERIOD = 'another_period'
 
+# Посторінковий перегляд транзакцій: префікс + '{тип}{період}{напрямок}[:{epoch}:{id}]'
+CALLBACK_TRANSACTIONS_PAGE_PREFIX = 'txp:'
+
 # Типи доходів (префікси)
 CALLBACK_INCOME_TYPE_PREFIX = 'income_type_'
 CALLBACK_INCOME_SALARY = 'income_type_salary'
@@ -61,6 +64,18 @@ CALLBACK_REPORT_QUICK = 'report_quick'
 CALLBACK_REPORT_COMPARISON = 'report_comparison'
 CALLBACK_REPORT_EXPORT = 'report_export'
 CALLBACK_BACK_TO_REPORT_MENU = 'back_to_report_menu'
+CALLBACK_DETAILED_REPORT_PREFIX = 'detailed_'  # + період
+CALLBACK_HTML_REPORT_PREFIX = 'html_'  # + 'detailed_'/'quick_' + період
+
+# Категорії
+CALLBACK_CATEGORY_MANAGEMENT = 'category_management'
+CALLBACK_CATEGORY_ADD_TYPE_SELECT = 'category_add_type_select'
+CALLBACK_CATEGORY_VIEW_TYPE_SELECT = 'category_view_type_select'
+CALLBACK_CATEGORY_ADD_PREFIX = 'category_add_'  # + тип
+CALLBACK_CATEGORY_VIEW_PREFIX = 'category_view_'  # + тип
+CALLBACK_CATEGORY_DELETE_PREFIX = 'category_delete_'  # + id або 'confirmed_' + id
+CALLBACK_INCOME_CATEGORY_PREFIX = 'income_cat_'  # + id категорії
+CALLBACK_EXPENSE_CATEGORY_PREFIX = 'expense_cat_'  # + id категорії
 
 # Навігація
 CALLBACK_BACK = 'back'
@@ -1,7 +1,24 @@
 # -*- coding: utf-8 -*-
 
 import os
+import secrets
 from dotenv import load_dotenv
+from .constants import (
+    DB_STORAGE_PROFILES,
+    DEFAULT_DB_STORAGE_PROFILE,
+    DEFAULT_HTML_REPORT_WORKERS,
+    BOT_MODES,
+    DEFAULT_BOT_MODE,
+    DEFAULT_WEBHOOK_LISTEN,
+    DEFAULT_WEBHOOK_PORT,
+    DEFAULT_WEBHOOK_PATH,
+    BOT_RUNTIMES,
+    DEFAULT_BOT_RUNTIME,
+    DEFAULT_ASYNC_BLOCKING_WORKERS,
+    DEFAULT_HANDLER_WORKERS,
+    STATE_STORE_BACKENDS,
+    DEFAULT_STATE_STORE,
+)
 
 load_dotenv()
 
@@ -15,3 +32,83 @@ if ':' not in TOKEN or len(TOKEN) < 20:
 
 print(f"[OK] Token loaded: {TOKEN[:10]}...", flush=True)
 
+DB_STORAGE_PROFILE = os.getenv('DB_STORAGE_PROFILE', DEFAULT_DB_STORAGE_PROFILE)
+
+if DB_STORAGE_PROFILE not in DB_STORAGE_PROFILES:
+    raise ValueError(
+        f"[ERROR] Unknown DB_STORAGE_PROFILE '{DB_STORAGE_PROFILE}'. "
+        f"Available profiles: {', '.join(DB_STORAGE_PROFILES)}"
+    )
+
+try:
+    HTML_REPORT_WORKERS = int(os.getenv('HTML_REPORT_WORKERS', DEFAULT_HTML_REPORT_WORKERS))
+except ValueError:
+    HTML_REPORT_WORKERS = 0
+
+if HTML_REPORT_WORKERS < 1:
+    raise ValueError("[ERROR] HTML_REPORT_WORKERS must be a positive integer.")
+
+BOT_MODE = os.getenv('BOT_MODE', DEFAULT_BOT_MODE)
+
+if BOT_MODE not in BOT_MODES:
+    raise ValueError(
+        f"[ERROR] Unknown BOT_MODE '{BOT_MODE}'. "
+        f"Available modes: {', '.join(BOT_MODES)}"
+    )
+
+# Webhook: публічна HTTPS адреса (без шляху) та локальна адреса HTTP сервера.
+# Якщо WEBHOOK_URL не задано, бот не викликає setWebhook (webhook налаштовано окремо)
+WEBHOOK_URL = os.getenv('WEBHOOK_URL', '').rstrip('/')
+WEBHOOK_LISTEN = os.getenv('WEBHOOK_LISTEN', DEFAULT_WEBHOOK_LISTEN)
+WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', DEFAULT_WEBHOOK_PATH)
+# Без WEBHOOK_SECRET генерується новий секрет при кожному запуску (передається в setWebhook)
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET') or secrets.token_urlsafe(32)
+
+try:
+    WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', DEFAULT_WEBHOOK_PORT))
+except ValueError:
+    WEBHOOK_PORT = 0
+
+if not 0 < WEBHOOK_PORT < 65536:
+    raise ValueError("[ERROR] WEBHOOK_PORT must be a valid TCP port.")
+
+if WEBHOOK_URL and not WEBHOOK_URL.startswith('https://'):
+    raise ValueError("[ERROR] WEBHOOK_URL must be an https:// URL (Telegram requirement).")
+
+if not WEBHOOK_PATH.startswith('/'):
+    raise ValueError("[ERROR] WEBHOOK_PATH must start with '/'.")
+
+BOT_RUNTIME = os.getenv('BOT_RUNTIME', DEFAULT_BOT_RUNTIME)
+
+if BOT_RUNTIME not in BOT_RUNTIMES:
+    raise ValueError(
+        f"[ERROR] Unknown BOT_RUNTIME '{BOT_RUNTIME}'. "
+        f"Available runtimes: {', '.join(BOT_RUNTIMES)}"
+    )
+
+if BOT_RUNTIME == 'asyncio' and BOT_MODE != 'polling':
+    raise ValueError("[ERROR] BOT_RUNTIME=asyncio supports only BOT_MODE=polling.")
+
+try:
+    ASYNC_BLOCKING_WORKERS = int(os.getenv('ASYNC_BLOCKING_WORKERS', DEFAULT_ASYNC_BLOCKING_WORKERS))
+except ValueError:
+    ASYNC_BLOCKING_WORKERS = 0
+
+if ASYNC_BLOCKING_WORKERS < 1:
+    raise ValueError("[ERROR] ASYNC_BLOCKING_WORKERS must be a positive integer.")
+
+try:
+    HANDLER_WORKERS = int(os.getenv('HANDLER_WORKERS', DEFAULT_HANDLER_WORKERS))
+except ValueError:
+    HANDLER_WORKERS = 0
+
+if HANDLER_WORKERS < 1:
+    raise ValueError("[ERROR] HANDLER_WORKERS must be a positive integer.")
+
+STATE_STORE = os.getenv('STATE_STORE', DEFAULT_STATE_STORE)
+
+if STATE_STORE not in STATE_STORE_BACKENDS:
+    raise ValueError(
+        f"[ERROR] Unknown STATE_STORE '{STATE_STORE}'. "
+        f"Available backends: {', '.join(STATE_STORE_BACKENDS)}"
+    )
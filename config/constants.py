@@ -44,6 +44,88 @@ TIME_PERIODS = {
 # Доступні валюти
 AVAILABLE_CURRENCIES = ['UAH', 'USD', 'EUR']
 DEFAULT_CURRENCY = 'UAH'
+# Суми в БД зберігаються цілими мінімальними одиницями (копійки/центи) - models/units.py
+AMOUNT_MINOR_UNITS = 100
 DB_FILE = 'budget_helper.db'
 DEFAULT_LANGUAGE = 'uk'
 AVAILABLE_LANGUAGES = ['uk', 'en']
+
+# Профілі зберігання SQLite: PRAGMA, які застосовуються до кожного нового з'єднання.
+# Профіль обирається змінною оточення DB_STORAGE_PROFILE.
+DB_STORAGE_PROFILES = {
+    # WAL: читачі не блокуються записом, fsync лише на checkpoint
+    'wal': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -16000,  # ~16 MB
+        'mmap_size': 134217728,  # 128 MB
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    # WAL з fsync на кожен commit (максимальна надійність)
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'cache_size': -16000,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    # Стандартний rollback-журнал SQLite (попередня поведінка)
+    'legacy': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'busy_timeout': 5000,
+    },
+}
+DEFAULT_DB_STORAGE_PROFILE = 'wal'
+
+# Пул з'єднань з БД: як часто (в секундах) перевіряти з'єднання потоку
+DB_HEALTH_CHECK_INTERVAL = 60
+
+# Кеш готових звітів (database/report_cache.py)
+REPORT_CACHE_MAX_ENTRIES = 256
+REPORT_CACHE_MAX_BYTES = 32 * 1024 * 1024  # Оцінка розміру, не точний облік
+REPORT_CACHE_TTL = 300  # Секунд; обмежує вік курсів валют у закешованих сумах
+
+# Періоди, для яких звіти читають денні підсумки (daily_totals) замість сирих транзакцій
+ROLLUP_REPORT_PERIODS = ('month', 'year')
+
+# Черга генерації HTML звітів (utils/report_jobs.py)
+DEFAULT_HTML_REPORT_WORKERS = 2
+HTML_REPORT_MAX_PENDING = 32  # Максимум задач у черзі та в роботі одночасно
+
+# HTML звіти більші за цей розмір (байт) надсилаються як .html.gz; None - ніколи не стискати
+HTML_REPORT_GZIP_THRESHOLD = 10 * 1024 * 1024
+
+# Посторінкове читання транзакцій (keyset pagination по (add_date, id))
+TRANSACTIONS_PAGE_SIZE = 10  # Транзакцій на сторінці в перегляді фінансів
+TRANSACTIONS_ITER_BATCH_SIZE = 500  # Рядків за один запит в iter_incomes/iter_expenses
+TRANSACTION_DESCRIPTION_PREVIEW = 100  # Символів опису на сторінці (ліміт повідомлення Telegram - 4096)
+
+# Режим отримання оновлень (BOT_MODE): polling - цикл getUpdates, webhook - HTTP сервер (utils/webhook.py)
+BOT_MODES = ('polling', 'webhook')
+DEFAULT_BOT_MODE = 'polling'
+DEFAULT_WEBHOOK_LISTEN = '0.0.0.0'
+DEFAULT_WEBHOOK_PORT = 8080
+DEFAULT_WEBHOOK_PATH = '/telegram/webhook'
+WEBHOOK_MAX_CONNECTIONS = 40  # Одночасних з'єднань від Telegram (1-100)
+WEBHOOK_MAX_BODY_BYTES = 1024 * 1024  # Більші запити відхиляються (413)
+
+# Середовище виконання (BOT_RUNTIME): threaded - TeleBot з пулом потоків,
+# asyncio - AsyncTeleBot, обробники-корутини в циклі подій (utils/async_runtime.py)
+BOT_RUNTIMES = ('threaded', 'asyncio')
+DEFAULT_BOT_RUNTIME = 'threaded'
+DEFAULT_ASYNC_BLOCKING_WORKERS = 8  # Потоків для SQLite та рендерингу звітів у режимі asyncio (run_blocking)
+
+# Пул обробників threaded (utils/update_dispatcher.py): оновлення розподіляються за user_id на
+# HANDLER_WORKERS потоків - послідовно для користувача, паралельно для різних користувачів
+DEFAULT_HANDLER_WORKERS = 16
+
+# Стан багатокрокових діалогів (utils/state_store.py): memory - лише в пам'яті процесу,
+# sqlite - в пам'яті з записом у таблицю conversation_states (переживає перезапуск)
+STATE_STORE_BACKENDS = ('memory', 'sqlite')
+DEFAULT_STATE_STORE = 'sqlite'
+CONVERSATION_STATE_TTL = 24 * 60 * 60  # Покинутий діалог забувається через добу (сек)
+CONVERSATION_STATE_MAX_ENTRIES = 10000  # Записів у одному сховищі; найдавніше використані витісняються
+CONVERSATION_STATE_SWEEP_INTERVAL = 60  # Як часто видаляти прострочені записи (сек)
+HTML_REPORT_MESSAGE_TTL = 48 * 60 * 60  # Telegram дозволяє боту видаляти повідомлення лише 48 годин
@@ -7,6 +7,7 @@
 from .db_manager import (
     init_db,
     get_connection,
+    close_all_connections,
     ensure_user,
     save_bot_message,
     get_user_bot_messages,
@@ -26,6 +27,8 @@ from .income_repository import (
     add_income,
     get_income_by_id,
     get_all_incomes,
+    get_incomes_page,
+    iter_incomes,
     get_incomes_aggregated,
     update_income,
     delete_income,
@@ -34,20 +37,32 @@ from .expense_repository import (
     add_expense,
     get_expense_by_id,
     get_all_expenses,
+    get_expenses_page,
+    iter_expenses,
     get_expenses_aggregated,
     update_expense,
     delete_expense,
 )
 from .report_repository import (
     generate_user_report,
-    compare_with_previous_period,
 )
 from .category_repository import CategoryRepository
+from .exchange_rate_repository import (
+    save_exchange_rates,
+    get_latest_exchange_rates,
+)
+from .state_repository import (
+    load_conversation_states,
+    save_conversation_state,
+    delete_conversation_states,
+    purge_expired_conversation_states,
+)
 
 __all__ = [
     # DB Manager
     'init_db',
     'get_connection',
+    'close_all_connections',
     'ensure_user',
     'save_bot_message',
     'get_user_bot_messages',
@@ -67,6 +82,8 @@ __all__ = [
     'add_income',
     'get_income_by_id',
     'get_all_incomes',
+    'get_incomes_page',
+    'iter_incomes',
     'get_incomes_aggregated',
     'update_income',
     'delete_income',
@@ -75,15 +92,26 @@ __all__ = [
     'add_expense',
     'get_expense_by_id',
     'get_all_expenses',
+    'get_expenses_page',
+    'iter_expenses',
     'get_expenses_aggregated',
     'update_expense',
     'delete_expense',
     
     # Report Repository
     'generate_user_report',
-    'compare_with_previous_period',
     
     # Category Repository
     'CategoryRepository',
+    
+    # Exchange Rate Repository
+    'save_exchange_rates',
+    'get_latest_exchange_rates',
+    
+    # Conversation State Repository
+    'load_conversation_states',
+    'save_conversation_state',
+    'delete_conversation_states',
+    'purge_expired_conversation_states',
 ]
 
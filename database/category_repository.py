@@ -4,9 +4,9 @@ Repository для роботи з категоріями доходів/витр
 """
 
 import logging
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 from models.category import Category
-from database.db_manager import get_connection, ensure_user, generate_uuid, _lock
+from database.db_manager import get_connection, ensure_user, generate_uuid, _write_lock
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +26,7 @@ class CategoryRepository:
         Returns:
             List[Category]: Список категорій
         """
-        with _lock:
+        with _write_lock:
             with get_connection() as conn:
                 cursor = conn.cursor()
                 ensure_user(cursor, user_id)
@@ -55,7 +55,7 @@ class CategoryRepository:
         Returns:
             Optional[int]: ID створеної категорії або None якщо помилка
         """
-        with _lock:
+        with _write_lock:
             with get_connection() as conn:
                 cursor = conn.cursor()
                 ensure_user(cursor, user_id)
@@ -85,7 +85,7 @@ class CategoryRepository:
         Returns:
             bool: True якщо успішно, False якщо помилка
         """
-        with _lock:
+        with _write_lock:
             with get_connection() as conn:
                 cursor = conn.cursor()
                 
@@ -113,18 +113,43 @@ class CategoryRepository:
         Returns:
             Optional[Category]: Об'єкт категорії або None
         """
-        with _lock:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    SELECT id, name, type, is_default, user_id, add_date
-                    FROM categories
-                    WHERE id = ?
-                ''', (category_id,))
-                
-                row = cursor.fetchone()
-                return Category.from_db_row(row) if row else None
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT id, name, type, is_default, user_id, add_date
+                FROM categories
+                WHERE id = ?
+            ''', (category_id,))
+            
+            row = cursor.fetchone()
+            return Category.from_db_row(row) if row else None
+
+    @staticmethod
+    def get_category_names(category_ids: Iterable) -> Dict[str, str]:
+        """
+        Отримати назви кількох категорій одним запитом.
+        
+        Args:
+            category_ids: ID категорій (можуть повторюватись)
+        
+        Returns:
+            Dict[str, str]: Словник {category_id: name} для знайдених категорій
+        """
+        unique_ids = list(set(category_ids))
+        if not unique_ids:
+            return {}
+        
+        placeholders = ', '.join('?' for _ in unique_ids)
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT id, name
+                FROM categories
+                WHERE id IN ({placeholders})
+            ''', unique_ids)
+            
+            return {row[0]: row[1] for row in cursor.fetchall()}
     
     @staticmethod
     def category_exists(user_id: int, name: str, category_type: str) -> bool:
@@ -139,15 +164,14 @@ class CategoryRepository:
         Returns:
             bool: True якщо існує
         """
-        with _lock:
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    SELECT COUNT(*)
-                    FROM categories
-                    WHERE name = ? AND type = ? AND (is_default = 1 OR user_id = ?)
-                ''', (name, category_type, user_id))
-                
-                count = cursor.fetchone()[0]
-                return count > 0
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT COUNT(*)
+                FROM categories
+                WHERE name = ? AND type = ? AND (is_default = 1 OR user_id = ?)
+            ''', (name, category_type, user_id))
+            
+            count = cursor.fetchone()[0]
+            return count > 0
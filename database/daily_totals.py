@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+Денні підсумки (rollup) доходів і витрат.
+
+Таблиця daily_totals зберігає суму та кількість транзакцій на
+(користувач, тип, день, категорія, валюта); день - номер дня від
+1970-01-01, сума - в мінімальних одиницях валюти. Підсумки оновлюються
+інкрементально при кожному записі в incomes/expenses, тому звіти за
+довгі періоди читають O(днів) рядків замість O(транзакцій).
+
+Перебудова з сирих даних:
+    python -m database.daily_totals
+"""
+
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from .db_manager import get_connection, _write_lock
+from models.units import SECONDS_PER_DAY, from_day_number, from_minor_units, to_day_number, to_timestamp
+
+# Тип підсумку -> таблиця транзакцій
+_KIND_TABLES = {'income': 'incomes', 'expense': 'expenses'}
+
+
+def fill_daily_totals(cursor, user_id: Optional[int] = None):
+    """
+    Порахувати підсумки з сирих транзакцій (таблиця має бути порожньою
+    для цих користувачів).
+    
+    Args:
+        cursor: Курсор з'єднання (commit виконує викликаюча сторона)
+        user_id: Тільки для цього користувача (за замовчуванням - для всіх)
+    """
+    where = 'WHERE user_id = ?' if user_id is not None else ''
+    params = (user_id,) if user_id is not None else ()
+    
+    for kind, table in _KIND_TABLES.items():
+        cursor.execute(f'''
+            INSERT INTO daily_totals (user_id, kind, day, category_id, currency, amount, count)
+            SELECT user_id, ?, add_date / {SECONDS_PER_DAY}, COALESCE(category_id, ''),
+                   COALESCE(currency, 'UAH'), SUM(amount), COUNT(*)
+            FROM {table}
+            {where}
+            GROUP BY user_id, add_date / {SECONDS_PER_DAY}, COALESCE(category_id, ''), COALESCE(currency, 'UAH')
+        ''', (kind,) + params)
+
+
+def apply_daily_delta(cursor, user_id: int, kind: str, add_date: int, category_id, currency: str,
+                      amount: int, count: int):
+    """
+    Додати зміну до денного підсумку (від'ємні amount/count - для видалення).
+    Викликається в тій самій транзакції, що й запис у incomes/expenses,
+    зі значеннями в одиницях БД: add_date - секунди, amount - мінімальні одиниці.
+    """
+    key = (user_id, kind, add_date // SECONDS_PER_DAY, category_id or '', currency or 'UAH')
+    cursor.execute('''
+        INSERT INTO daily_totals (user_id, kind, day, category_id, currency, amount, count)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (user_id, kind, day, category_id, currency)
+        DO UPDATE SET amount = amount + excluded.amount, count = count + excluded.count
+    ''', key + (amount, count))
+    
+    if count < 0:
+        cursor.execute('''
+            DELETE FROM daily_totals
+            WHERE user_id = ? AND kind = ? AND day = ? AND category_id = ? AND currency = ? AND count <= 0
+        ''', key)
+
+
+def rebuild_daily_totals(user_id: Optional[int] = None):
+    """
+    Перебудувати підсумки з сирих транзакцій.
+    
+    Args:
+        user_id: Тільки для цього користувача (за замовчуванням - для всіх)
+    """
+    with _write_lock:
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            if user_id is None:
+                cursor.execute('DELETE FROM daily_totals')
+            else:
+                cursor.execute('DELETE FROM daily_totals WHERE user_id = ?', (user_id,))
+            fill_daily_totals(cursor, user_id)
+            conn.commit()
+
+
+def scan_daily_window(
+    user_id: int,
+    kind: str,
+    start: datetime,
+    end: datetime,
+    split: datetime
+) -> Tuple[list, list]:
+    """
+    Групи (category_name, currency, amount, count) за вікно [start, end],
+    розділені на поточний і попередній період - як scan_*_window в режимі
+    GROUP BY. Повні дні читаються з daily_totals, неповні крайні дні
+    (початок вікна та сьогодні) - з сирих транзакцій.
+    
+    Args:
+        user_id: ID користувача
+        kind: 'income' або 'expense'
+        start: Початок вікна
+        end: Кінець вікна
+        split: Початок поточного періоду (має бути початком дня)
+    
+    Returns:
+        Tuple: (групи поточного періоду, групи попереднього періоду)
+               в порядку від найновіших; amount - в мінімальних одиницях
+    """
+    # Повні дні: [first_day, last_day); last_day - день кінця вікна, він неповний
+    first_day = start.date() if start == datetime.combine(start.date(), datetime.min.time()) \
+        else start.date() + timedelta(days=1)
+    last_day = end.date()
+    if first_day > last_day:
+        first_day = last_day
+    
+    first_day_number = to_day_number(first_day)
+    last_day_number = to_day_number(last_day)
+    
+    merged = {}  # {(is_previous, name, currency): [amount, count, last_timestamp]}
+    
+    def merge(rows):
+        for is_previous, name, currency, amount, count, last_date in rows:
+            group = merged.setdefault((bool(is_previous), name, currency), [0, 0, last_date])
+            group[0] += amount
+            group[1] += count
+            group[2] = max(group[2], last_date)
+    
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
+        if first_day < last_day:
+            cursor.execute(f'''
+                SELECT d.day < ?, c.name, d.currency, SUM(d.amount), SUM(d.count), MAX(d.day) * {SECONDS_PER_DAY}
+                FROM daily_totals d
+                LEFT JOIN categories c ON c.id = d.category_id
+                WHERE d.user_id = ? AND d.kind = ? AND d.day >= ? AND d.day < ?
+                GROUP BY 1, c.name, d.currency
+            ''', (to_day_number(split), user_id, kind, first_day_number, last_day_number))
+            merge(cursor.fetchall())
+        
+        # Початок дня (день * SECONDS_PER_DAY) не більший за будь-яку дату цього дня
+        cursor.execute(f'''
+            SELECT t.add_date < ?, c.name, t.currency, SUM(t.amount), COUNT(*), MAX(t.add_date)
+            FROM {_KIND_TABLES[kind]} t
+            LEFT JOIN categories c ON c.id = t.category_id
+            WHERE t.user_id = ?
+              AND ((t.add_date >= ? AND t.add_date < ?) OR t.add_date BETWEEN ? AND ?)
+            GROUP BY 1, c.name, t.currency
+        ''', (to_timestamp(split), user_id, to_timestamp(start), first_day_number * SECONDS_PER_DAY,
+              last_day_number * SECONDS_PER_DAY, to_timestamp(end)))
+        merge(cursor.fetchall())
+    
+    ordered = sorted(merged.items(), key=lambda item: item[1][2], reverse=True)
+    groups = [(name, currency, amount, count) for (is_previous, name, currency), (amount, count, _) in ordered
+              if not is_previous]
+    previous_groups = [(name, currency, amount, count) for (is_previous, name, currency), (amount, count, _) in ordered
+                       if is_previous]
+    return groups, previous_groups
+
+
+def get_daily_totals(user_id: int, start: datetime, end: datetime) -> List[Tuple[str, str, str, float]]:
+    """
+    Денні суми за період для графіка динаміки.
+    
+    Args:
+        user_id: ID користувача
+        start: Початок періоду
+        end: Кінець періоду
+    
+    Returns:
+        List[Tuple]: (day, kind, currency, amount), відсортовані по днях
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT day, kind, currency, SUM(amount)
+            FROM daily_totals
+            WHERE user_id = ? AND day BETWEEN ? AND ?
+            GROUP BY day, kind, currency
+            ORDER BY day
+        ''', (user_id, to_day_number(start), to_day_number(end)))
+        return [(from_day_number(day), kind, currency, from_minor_units(amount))
+                for day, kind, currency, amount in cursor.fetchall()]
+
+
+if __name__ == '__main__':
+    from .db_manager import init_db
+    
+    init_db()
+    print("[*] Rebuilding daily totals...", flush=True)
+    rebuild_daily_totals()
+    with get_connection() as conn:
+        rows = conn.execute('SELECT COUNT(*) FROM daily_totals').fetchone()[0]
+    print(f"[OK] Daily totals rebuilt: {rows} rows", flush=True)
@@ -1,27 +1,125 @@
 # -*- coding: utf-8 -*-
 
+import atexit
 import sqlite3
+import threading
+import time
 import uuid
-from threading import Lock
-from config.constants import DB_FILE
+from threading import Lock, RLock
+from config.constants import DB_FILE, DB_HEALTH_CHECK_INTERVAL, DB_STORAGE_PROFILES
+from config.config import DB_STORAGE_PROFILE
 from locales.locale_manager import get_income_types, get_expense_types
+from .migrations import apply_schema_migrations
 
-_lock = Lock()
+# Єдиний канал запису: записи виконуються по черзі, читання - паралельно
+# (з WAL читачі не блокуються записом). RLock, бо запис може викликати
+# інший запис у тому ж потоці.
+_write_lock = RLock()
 
+# Пул з'єднань: одне постійне з'єднання на потік {thread: connection}
+_pool_local = threading.local()
+_pool_connections = {}
+_pool_lock = Lock()
+_pool_generation = 0
 
-def get_connection():
+
+def _apply_storage_profile(conn, profile: str):
+    """Застосувати PRAGMA профілю зберігання до з'єднання."""
+    for pragma, value in DB_STORAGE_PROFILES[profile].items():
+        conn.execute(f'PRAGMA {pragma} = {value}')
+
+
+def _create_connection():
+    """Відкрити нове з'єднання з БД та налаштувати його."""
     conn = sqlite3.connect(DB_FILE, check_same_thread=False)
     conn.execute('PRAGMA foreign_keys = ON')
+    _apply_storage_profile(conn, DB_STORAGE_PROFILE)
+    return conn
+
+
+def _is_connection_healthy(conn) -> bool:
+    """Перевірити що з'єднання відкрите та відповідає."""
+    try:
+        conn.execute('SELECT 1').fetchone()
+        return True
+    except sqlite3.Error:
+        return False
+
+
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+
+def _register_connection(conn):
+    """Зареєструвати з'єднання потоку та закрити з'єднання завершених потоків."""
+    current = threading.current_thread()
+    with _pool_lock:
+        dead_threads = [thread for thread in _pool_connections if not thread.is_alive()]
+        for thread in dead_threads:
+            _close_quietly(_pool_connections.pop(thread))
+        _pool_connections[current] = conn
+        return _pool_generation
+
+
+def get_connection():
+    """
+    Отримати з'єднання з БД для поточного потоку.
+    
+    З'єднання відкривається один раз на потік і перевикористовується
+    наступними викликами, тому `with get_connection() as conn:` лише
+    керує транзакцією (commit/rollback) і не закриває з'єднання.
+    Раз на DB_HEALTH_CHECK_INTERVAL секунд з'єднання перевіряється
+    і перевідкривається, якщо воно зламане або пул було закрито.
+    
+    Returns:
+        sqlite3.Connection: З'єднання поточного потоку
+    """
+    conn = getattr(_pool_local, 'conn', None)
+    
+    if conn is not None:
+        if _pool_local.generation != _pool_generation:
+            conn = None
+        elif time.monotonic() - _pool_local.checked_at >= DB_HEALTH_CHECK_INTERVAL:
+            if _is_connection_healthy(conn):
+                _pool_local.checked_at = time.monotonic()
+            else:
+                _close_quietly(conn)
+                conn = None
+    
+    if conn is None:
+        conn = _create_connection()
+        _pool_local.conn = conn
+        _pool_local.generation = _register_connection(conn)
+        _pool_local.checked_at = time.monotonic()
+    
     return conn
 
 
+def close_all_connections():
+    """Закрити всі з'єднання пулу (при зупинці бота)."""
+    global _pool_generation
+    
+    with _pool_lock:
+        for conn in _pool_connections.values():
+            _close_quietly(conn)
+        _pool_connections.clear()
+        # Потоки, що тримають старі з'єднання, перевідкриють їх при наступному виклику
+        _pool_generation += 1
+
+
+atexit.register(close_all_connections)
+
+
 def generate_uuid():
     """Генерувати UUID як рядок."""
     return str(uuid.uuid4())
 
 
 def init_db():
-    with _lock:
+    with _write_lock:
         with get_connection() as conn:
             cursor = conn.cursor()
             
@@ -48,12 +146,12 @@ def init_db():
             CREATE TABLE IF NOT EXISTS incomes (
                 id TEXT PRIMARY KEY,
                 user_id INTEGER,
-                amount REAL,
+                amount INTEGER,  -- мінімальні одиниці валюти (models/units.py)
                 category_id TEXT,
                 description TEXT,
                 currency TEXT DEFAULT 'UAH',
-                add_date TEXT,
-                update_date TEXT,
+                add_date INTEGER,  -- секунди від 1970-01-01
+                update_date INTEGER,
                 FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
                 FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE RESTRICT
             );
@@ -63,12 +161,12 @@ def init_db():
             CREATE TABLE IF NOT EXISTS expenses (
                 id TEXT PRIMARY KEY,
                 user_id INTEGER,
-                amount REAL,
+                amount INTEGER,  -- мінімальні одиниці валюти (models/units.py)
                 category_id TEXT,
                 description TEXT,
                 currency TEXT DEFAULT 'UAH',
-                add_date TEXT,
-                update_date TEXT,
+                add_date INTEGER,  -- секунди від 1970-01-01
+                update_date INTEGER,
                 FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
                 FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE RESTRICT
             );
@@ -121,6 +219,9 @@ def init_db():
                         VALUES (?, ?, ?, 1, datetime('now'))
                     ''', (generate_uuid(), name, cat_type))
             
+            # Індекси та інші зміни схеми з версіонованих міграцій
+            apply_schema_migrations(cursor)
+            
             conn.commit()
 
 
@@ -130,7 +231,7 @@ def ensure_user(cursor, user_id):
 
 def save_bot_message(user_id: int, message_id: int):
     """Зберігає message_id повідомлення відправленого ботом."""
-    with _lock:
+    with _write_lock:
         with get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
@@ -142,21 +243,20 @@ def save_bot_message(user_id: int, message_id: int):
 
 def get_user_bot_messages(user_id: int):
     """Отримує всі message_id для користувача."""
-    with _lock:
-        with get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT message_id FROM bot_messages 
-                WHERE user_id = ?
-                ORDER BY id DESC
-                LIMIT 100
-            ''', (user_id,))
-            return [row[0] for row in cursor.fetchall()]
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT message_id FROM bot_messages 
+            WHERE user_id = ?
+            ORDER BY id DESC
+            LIMIT 100
+        ''', (user_id,))
+        return [row[0] for row in cursor.fetchall()]
 
 
 def clear_user_bot_messages(user_id: int):
     """Видаляє всі збережені message_id для користувача."""
-    with _lock:
+    with _write_lock:
         with get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM bot_messages WHERE user_id = ?', (user_id,))
@@ -165,7 +265,7 @@ def clear_user_bot_messages(user_id: int):
 
 def delete_bot_message(user_id: int, message_id: int):
     """Видаляє конкретний message_id з бази даних."""
-    with _lock:
+    with _write_lock:
         with get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM bot_messages WHERE user_id = ? AND message_id = ?', (user_id, message_id))
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Репозиторій для останніх завантажених курсів валют.
+Курси зберігаються як матриця {base: {quote: rate}}, щоб після перезапуску
+бот одразу мав курси, не чекаючи завантаження з мережі.
+"""
+
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from .db_manager import get_connection, _write_lock
+
+
+def save_exchange_rates(rates: Dict[str, Dict], source: str = None):
+    """
+    Замінити збережені курси валют новими.
+    
+    Args:
+        rates: Курси у форматі {'UAH': {'USD': rate, ...}, ...}
+        source: Джерело курсів ('NBU', 'ExchangeRate-API')
+    """
+    update_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    rows = [(base, quote, rate, source, update_date)
+            for base, quotes in rates.items()
+            for quote, rate in quotes.items()]
+    
+    with _write_lock:
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM exchange_rates')
+            cursor.executemany('''
+                INSERT INTO exchange_rates (base, quote, rate, source, update_date)
+                VALUES (?, ?, ?, ?, ?)
+            ''', rows)
+            conn.commit()
+
+
+def get_latest_exchange_rates() -> Optional[Tuple[Dict[str, Dict], datetime]]:
+    """
+    Отримати останні збережені курси.
+    
+    Returns:
+        (курси, час їх збереження) або None, якщо таблиця порожня
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT base, quote, rate, update_date FROM exchange_rates')
+        rows = cursor.fetchall()
+    
+    if not rows:
+        return None
+    
+    rates = {}
+    for base, quote, rate, _ in rows:
+        rates.setdefault(base, {})[quote] = rate
+    update_date = max(row[3] for row in rows)
+    return rates, datetime.strptime(update_date, '%Y-%m-%d %H:%M:%S')
@@ -5,16 +5,16 @@
 """
 
 from datetime import datetime
-from threading import Lock
-from typing import List, Optional
-from .db_manager import get_connection, ensure_user, generate_uuid
-from .utils import get_date_range_for_period
-from models import Income
-from config.constants import DEFAULT_CURRENCY
+from typing import Iterator, List, Optional, Tuple
+from .db_manager import get_connection, ensure_user, generate_uuid, _write_lock
+from .utils import get_date_range_for_period, aggregate_category_totals, build_keyset_filter
+from .report_cache import bump_data_version
+from .daily_totals import apply_daily_delta
+from models.units import from_minor_units, from_timestamp, to_minor_units, to_timestamp
+from models import Income, TransactionRecord
+from config.constants import DEFAULT_CURRENCY, TRANSACTIONS_PAGE_SIZE, TRANSACTIONS_ITER_BATCH_SIZE
 from locales import translate_category_name
 
-_lock = Lock()
-
 
 def add_income(user_id: int, amount: float, category_id: int, description: str = None, currency: str = DEFAULT_CURRENCY, add_date: str = None) -> Income:
     """
@@ -44,7 +44,11 @@ def add_income(user_id: int, amount: float, category_id: int, description: str =
         income.add_date = add_date
         income.update_date = add_date
     
-    with _lock:
+    # В БД: сума в мінімальних одиницях, дати - секунди від 1970-01-01
+    amount_units = to_minor_units(income.amount)
+    add_timestamp = to_timestamp(income.add_date)
+    
+    with _write_lock:
         with get_connection() as conn:
             cursor = conn.cursor()
             ensure_user(cursor, user_id)
@@ -52,9 +56,12 @@ def add_income(user_id: int, amount: float, category_id: int, description: str =
             cursor.execute('''
                 INSERT INTO incomes (id, user_id, amount, category_id, description, currency, add_date, update_date)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (income.id, income.user_id, income.amount, income.category_id, income.description,
-                  income.currency, income.add_date, income.update_date))
+            ''', (income.id, income.user_id, amount_units, income.category_id, income.description,
+                  income.currency, add_timestamp, to_timestamp(income.update_date)))
+            apply_daily_delta(cursor, user_id, 'income', add_timestamp, income.category_id,
+                              income.currency, amount_units, 1)
             conn.commit()
+            bump_data_version(user_id)
     
     return income
 
@@ -69,27 +76,26 @@ def get_income_by_id(income_id: int) -> Optional[Income]:
     Returns:
         Income або None
     """
-    with _lock:
-        with get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT id, user_id, amount, category_id, description, currency, add_date, update_date
-                FROM incomes WHERE id = ?
-            ''', (income_id,))
-            row = cursor.fetchone()
-            
-            if row:
-                return Income.from_dict({
-                    'id': row[0],
-                    'user_id': row[1],
-                    'amount': row[2],
-                    'category_id': row[3],
-                    'description': row[4],
-                    'currency': row[5],
-                    'add_date': row[6],
-                    'update_date': row[7]
-                })
-            return None
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT id, user_id, amount, category_id, description, currency, add_date, update_date
+            FROM incomes WHERE id = ?
+        ''', (income_id,))
+        row = cursor.fetchone()
+        
+        if row:
+            return Income.from_dict({
+                'id': row[0],
+                'user_id': row[1],
+                'amount': from_minor_units(row[2]),
+                'category_id': row[3],
+                'description': row[4],
+                'currency': row[5],
+                'add_date': from_timestamp(row[6]),
+                'update_date': from_timestamp(row[7])
+            })
+        return None
 
 
 def get_all_incomes(user_id: int) -> List[Income]:
@@ -102,121 +108,204 @@ def get_all_incomes(user_id: int) -> List[Income]:
     Returns:
         List[Income]: Список об'єктів Income
     """
-    with _lock:
-        with get_connection() as conn:
-            cursor = conn.cursor()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT id, user_id, amount, category_id, description, currency, add_date, update_date
+            FROM incomes WHERE user_id = ?
+            ORDER BY add_date DESC
+        ''', (user_id,))
+        rows = cursor.fetchall()
+        
+        return [Income.from_dict({
+            'id': row[0],
+            'user_id': row[1],
+            'amount': from_minor_units(row[2]),
+            'category_id': row[3],
+            'description': row[4],
+            'currency': row[5],
+            'add_date': from_timestamp(row[6]),
+            'update_date': from_timestamp(row[7])
+        }) for row in rows]
+
+
+def get_incomes_page(
+    user_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[Tuple[str, str]] = None,
+    backward: bool = False,
+    limit: int = TRANSACTIONS_PAGE_SIZE
+) -> Tuple[List[TransactionRecord], bool]:
+    """
+    Отримати сторінку доходів (keyset pagination по (add_date, id), без OFFSET).
+    
+    Args:
+        user_id: ID користувача
+        start: Початок періоду (опціонально)
+        end: Кінець періоду (опціонально)
+        cursor: (add_date, id) крайньої транзакції сусідньої сторінки або None - перша сторінка
+        backward: False - сторінка старіших за cursor, True - новіших за cursor
+        limit: Розмір сторінки
+    
+    Returns:
+        Tuple: (доходи від найновіших, чи є ще сторінки в напрямку читання)
+    """
+    where, order, params = build_keyset_filter(user_id, start, end, cursor, backward)
+    
+    with get_connection() as conn:
+        db_cursor = conn.cursor()
+        db_cursor.execute(f'''
+            SELECT t.id, t.user_id, t.amount, t.category_id, t.description, t.currency, t.add_date, t.update_date
+            FROM incomes t
+            WHERE {where}
+            ORDER BY {order}
+            LIMIT ?
+        ''', params + [limit + 1])
+        rows = db_cursor.fetchall()
+    
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backward:
+        rows.reverse()
+    
+    return [TransactionRecord.from_row(row) for row in rows], has_more
+
+
+def iter_incomes(
+    user_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    batch_size: int = TRANSACTIONS_ITER_BATCH_SIZE
+) -> Iterator[TransactionRecord]:
+    """
+    Ітерувати доходи користувача від найновіших пакетами по batch_size.
+    
+    В пам'яті одночасно не більше одного пакета, а з'єднання не тримається
+    відкритим між пакетами, тому історія будь-якого розміру читається
+    з обмеженим використанням пам'яті.
+    
+    Args:
+        user_id: ID користувача
+        start: Початок періоду (опціонально)
+        end: Кінець періоду (опціонально)
+        batch_size: Кількість рядків за один запит
+    
+    Yields:
+        TransactionRecord: Доходи по черзі
+    """
+    cursor = None
+    while True:
+        page, has_more = get_incomes_page(user_id, start, end, cursor, limit=batch_size)
+        yield from page
+        if not has_more:
+            return
+        cursor = (page[-1].add_date, page[-1].id)
+
+
+def scan_incomes_window(
+    user_id: int,
+    start: datetime,
+    end: datetime,
+    split: Optional[datetime] = None,
+    include_transactions: bool = True
+) -> Tuple[List[TransactionRecord], list, list]:
+    """
+    Один прохід по доходах у вікні [start, end] з розподілом на два періоди.
+    
+    Args:
+        user_id: ID користувача
+        start: Початок вікна
+        end: Кінець вікна
+        split: Початок поточного періоду; доходи раніше split відносяться до
+            попереднього періоду (за замовчуванням - start, тобто все вікно поточне)
+        include_transactions: Чи завантажувати записи (TransactionRecord) поточного періоду.
+            Якщо False, групи рахуються в SQLite через GROUP BY
+    
+    Returns:
+        Tuple: (доходи поточного періоду, групи поточного періоду,
+                групи попереднього періоду), де групи - списки кортежів
+                (category_name, currency, amount, count) в порядку від найновіших,
+                amount - в мінімальних одиницях валюти
+    """
+    split_timestamp = to_timestamp(split or start)
+    params = (user_id, to_timestamp(start), to_timestamp(end))
+    
+    incomes = []
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
+        if include_transactions:
+            # Назву категорії отримуємо через JOIN, щоб не робити окремий запит на кожен рядок
             cursor.execute('''
-                SELECT id, user_id, amount, category_id, description, currency, add_date, update_date
-                FROM incomes WHERE user_id = ?
-                ORDER BY add_date DESC
-            ''', (user_id,))
-            rows = cursor.fetchall()
+                SELECT t.id, t.user_id, t.amount, t.category_id, t.description, t.currency,
+                       t.add_date, t.update_date, c.name
+                FROM incomes t
+                LEFT JOIN categories c ON c.id = t.category_id
+                WHERE t.user_id = ? AND t.add_date BETWEEN ? AND ?
+                ORDER BY t.add_date DESC
+            ''', params)
             
-            return [Income.from_dict({
-                'id': row[0],
-                'user_id': row[1],
-                'amount': row[2],
-                'category_id': row[3],
-                'description': row[4],
-                'currency': row[5],
-                'add_date': row[6],
-                'update_date': row[7]
-            }) for row in rows]
+            # Групуємо по (категорія, валюта) в порядку появи
+            grouped = {}
+            previous = {}
+            for row in cursor:
+                if row[6] < split_timestamp:
+                    group = previous.setdefault((row[8], row[5]), [0, 0])
+                else:
+                    group = grouped.setdefault((row[8], row[5]), [0, 0])
+                    incomes.append(TransactionRecord.from_row(row))
+                group[0] += row[2]
+                group[1] += 1
+            
+            groups = [(name, currency, amount, count) for (name, currency), (amount, count) in grouped.items()]
+            previous_groups = [(name, currency, amount, count) for (name, currency), (amount, count) in previous.items()]
+        else:
+            # Агрегування в SQLite; порядок груп - за останньою транзакцією, як і в повному режимі
+            cursor.execute('''
+                SELECT t.add_date < ?, c.name, t.currency, SUM(t.amount), COUNT(*)
+                FROM incomes t
+                LEFT JOIN categories c ON c.id = t.category_id
+                WHERE t.user_id = ? AND t.add_date BETWEEN ? AND ?
+                GROUP BY 1, c.name, t.currency
+                ORDER BY MAX(t.add_date) DESC
+            ''', (split_timestamp,) + params)
+            
+            groups = []
+            previous_groups = []
+            for is_previous, name, currency, amount, count in cursor.fetchall():
+                (previous_groups if is_previous else groups).append((name, currency, amount, count))
+    
+    return incomes, groups, previous_groups
 
 
-def get_incomes_aggregated(user_id: int, period: str) -> dict:
+def get_incomes_aggregated(user_id: int, period: str, include_transactions: bool = True) -> dict:
     """
     Отримати агреговані доходи за період.
     
     Args:
         user_id: ID користувача
         period: Період ('today', 'week', 'month', 'year')
+        include_transactions: Чи завантажувати записи доходів. Якщо False,
+            суми та кількості рахуються в SQLite через GROUP BY, а список
+            'incomes' буде порожнім
     
     Returns:
-        dict: Словник з агрегованими даними та списком Income
+        dict: Словник з агрегованими даними та списком записів TransactionRecord
     """
     start, end = get_date_range_for_period(period)
+    incomes, groups, _ = scan_incomes_window(user_id, start, end, include_transactions=include_transactions)
     
-    # Використовуємо однаковий запит для всіх періодів
-    query = '''
-        SELECT id, user_id, amount, category_id, description, currency, add_date, update_date
-        FROM incomes
-        WHERE user_id = ? AND add_date BETWEEN ? AND ?
-        ORDER BY add_date DESC
-    '''
-    params = (user_id, start.strftime('%Y-%m-%d %H:%M:%S'), end.strftime('%Y-%m-%d %H:%M:%S'))
-
-    with _lock:
-        with get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-            
-            incomes = [Income.from_dict({
-                'id': row[0],
-                'user_id': row[1],
-                'amount': row[2],
-                'category_id': row[3],
-                'description': row[4],
-                'currency': row[5],
-                'add_date': row[6],
-                'update_date': row[7]
-            }) for row in rows]
-            
-            # Отримуємо категорії для агрегування
-            from database import CategoryRepository, get_user
-            from utils.currency_converter import convert_currency
-            from config.constants import DEFAULT_CURRENCY
-            
-            # Отримуємо дефолтну валюту користувача
-            user = get_user(user_id)
-            user_currency = user.default_currency if user else DEFAULT_CURRENCY
-            
-            # Агрегування по категоріях з конвертацією валют
-            aggregated = {}
-            aggregated_by_category_currency = {}  # {category: {currency: amount}}
-            by_currency = {}  # Розбивка по валютах (оригінальні суми)
-            total = 0.0
-            for income in incomes:
-                category = CategoryRepository.get_category_by_id(income.category_id)
-                category_name = category.name if category else 'Інше'
-                
-                # Додаємо до розбивки по валютах
-                if income.currency not in by_currency:
-                    by_currency[income.currency] = 0.0
-                by_currency[income.currency] = round(by_currency[income.currency] + income.amount, 2)
-                
-                # Зберігаємо оригінальні суми по категоріях та валютах
-                if category_name not in aggregated_by_category_currency:
-                    aggregated_by_category_currency[category_name] = {}
-                if income.currency not in aggregated_by_category_currency[category_name]:
-                    aggregated_by_category_currency[category_name][income.currency] = 0.0
-                aggregated_by_category_currency[category_name][income.currency] = round(
-                    aggregated_by_category_currency[category_name][income.currency] + income.amount, 2
-                )
-                
-                # Конвертуємо суму в дефолтну валюту користувача для загального підрахунку
-                amount_in_user_currency = income.amount
-                if income.currency != user_currency:
-                    converted = convert_currency(income.amount, income.currency, user_currency)
-                    if converted:
-                        amount_in_user_currency = converted
-                
-                # Не перекладаємо назви в aggregated - переклад буде в formatters
-                # Зберігаємо оригінальні назви з БД
-                if category_name not in aggregated:
-                    aggregated[category_name] = 0.0
-                aggregated[category_name] = round(aggregated[category_name] + amount_in_user_currency, 2)
-                total = round(total + amount_in_user_currency, 2)
-            
-            return {
-                'incomes': incomes,
-                'aggregated': aggregated,
-                'aggregated_by_category_currency': aggregated_by_category_currency,
-                'total': total,
-                'currency': user_currency,
-                'by_currency': by_currency  # Оригінальні суми по валютах
-            }
+    from database import get_user
+    
+    # Отримуємо дефолтну валюту користувача
+    user = get_user(user_id)
+    user_currency = user.default_currency if user else DEFAULT_CURRENCY
+    
+    # Агрегування по категоріях з конвертацією валют
+    result = aggregate_category_totals(groups, user_currency)
+    result['incomes'] = incomes
+    return result
 
 
 def update_income(income: Income) -> bool:
@@ -231,17 +320,31 @@ def update_income(income: Income) -> bool:
     """
     income.update()
     
-    with _lock:
+    with _write_lock:
         with get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute('''
+                SELECT user_id, amount, category_id, currency, add_date FROM incomes WHERE id = ?
+            ''', (income.id,))
+            old = cursor.fetchone()
+            if old is None:
+                return False
+            
             cursor.execute('''
                 UPDATE incomes
                 SET amount = ?, description = ?, currency = ?, update_date = ?
                 WHERE id = ?
-            ''', (income.amount, income.description, income.currency, 
-                  income.update_date, income.id))
+            ''', (to_minor_units(income.amount), income.description, income.currency,
+                  to_timestamp(income.update_date), income.id))
+            updated = cursor.rowcount > 0
+            
+            # Переносимо суму в денних підсумках: старе значення знімаємо, нове додаємо
+            apply_daily_delta(cursor, old[0], 'income', old[4], old[2], old[3], -old[1], -1)
+            apply_daily_delta(cursor, old[0], 'income', old[4], old[2], income.currency,
+                              to_minor_units(income.amount), 1)
             conn.commit()
-            return cursor.rowcount > 0
+            bump_data_version(old[0])
+            return updated
 
 
 def delete_income(income_id: int) -> bool:
@@ -254,9 +357,18 @@ def delete_income(income_id: int) -> bool:
     Returns:
         bool: True якщо успішно видалено
     """
-    with _lock:
+    with _write_lock:
         with get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute('''
+                SELECT user_id, amount, category_id, currency, add_date FROM incomes WHERE id = ?
+            ''', (income_id,))
+            row = cursor.fetchone()
+            if row is None:
+                return False
+            
             cursor.execute('DELETE FROM incomes WHERE id = ?', (income_id,))
+            apply_daily_delta(cursor, row[0], 'income', row[4], row[2], row[3], -row[1], -1)
             conn.commit()
-            return cursor.rowcount > 0
+            bump_data_version(row[0])
+            return True
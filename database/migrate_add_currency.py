@@ -4,6 +4,10 @@ Migration script to add currency support to existing database.
 Adds:
 - currency column to expenses table (if not exists)
 - default_currency column to users table (if not exists)
+
+Run it before starting the bot: schema migration 5 (database/migrations.py)
+copies expenses.currency when it converts amounts and dates to integers.
+init_db() applies the schema migrations on the next start.
 """
 
 import sqlite3
@@ -67,6 +71,7 @@ def migrate_add_currency():
         
         conn.commit()
         print("[OK] Currency migration completed successfully!")
+        print("[*] Schema migrations will be applied by init_db() on the next bot start")
         
     except Exception as e:
         print(f"[ERROR] Migration failed: {e}")
@@ -9,7 +9,7 @@ import uuid
 import shutil
 from datetime import datetime
 from pathlib import Path
-from config.constants import DB_FILE
+from config.constants import DB_FILE, DEFAULT_CURRENCY
 
 def backup_database():
     """Створити бекап БД перед міграцією."""
@@ -18,6 +18,49 @@ def backup_database():
     print(f"✅ Бекап створено: {backup_path}")
     return backup_path
 
+def _copy_transactions(cursor, table: str, category_mapping: dict) -> int:
+    """
+    Скопіювати incomes/expenses у {table}_new з UUID замість INTEGER ID.
+    Типи сум і дат беруться з вихідної таблиці (REAL/TEXT до міграції схеми 5,
+    INTEGER після неї), тому значення копіюються без перетворень.
+    """
+    column_types = {row[1]: row[2] for row in cursor.execute(f'PRAGMA table_info({table})').fetchall()}
+    amount_type = column_types.get('amount') or 'REAL'
+    date_type = column_types.get('add_date') or 'TEXT'
+    # До migrate_add_currency у expenses немає стовпця currency
+    currency_column = 'currency' if 'currency' in column_types else f"'{DEFAULT_CURRENCY}'"
+    
+    cursor.execute(f'''
+        SELECT id, user_id, amount, category_id, description, {currency_column}, add_date, update_date
+        FROM {table}
+    ''')
+    rows = cursor.fetchall()
+    
+    cursor.execute(f'''
+        CREATE TABLE {table}_new (
+            id TEXT PRIMARY KEY,
+            user_id INTEGER,
+            amount {amount_type},
+            category_id TEXT,
+            description TEXT,
+            currency TEXT DEFAULT '{DEFAULT_CURRENCY}',
+            add_date {date_type},
+            update_date {date_type},
+            FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+            FOREIGN KEY (category_id) REFERENCES categories_new(id) ON DELETE RESTRICT
+        )
+    ''')
+    
+    for old_id, user_id, amount, old_category_id, description, currency, add_date, update_date in rows:
+        new_category_id = category_mapping.get(old_category_id)
+        if new_category_id:
+            cursor.execute(f'''
+                INSERT INTO {table}_new (id, user_id, amount, category_id, description, currency, add_date, update_date)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (str(uuid.uuid4()), user_id, amount, new_category_id, description, currency, add_date, update_date))
+    
+    return len(rows)
+
 def migrate_to_uuid():
     """Міграція БД з INTEGER ID на UUID."""
     
@@ -68,66 +111,13 @@ def migrate_to_uuid():
         
         # 2. Міграція incomes
         print("\n💰 Міграція таблиці incomes...")
-        
-        cursor.execute('SELECT id, user_id, amount, category_id, description, currency, add_date, update_date FROM incomes')
-        incomes = cursor.fetchall()
-        
-        cursor.execute('''
-            CREATE TABLE incomes_new (
-                id TEXT PRIMARY KEY,
-                user_id INTEGER,
-                amount REAL,
-                category_id TEXT,
-                description TEXT,
-                currency TEXT DEFAULT 'UAH',
-                add_date TEXT,
-                update_date TEXT,
-                FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
-                FOREIGN KEY (category_id) REFERENCES categories_new(id) ON DELETE RESTRICT
-            )
-        ''')
-        
-        for old_id, user_id, amount, old_category_id, description, currency, add_date, update_date in incomes:
-            new_id = str(uuid.uuid4())
-            new_category_id = category_mapping.get(old_category_id)
-            if new_category_id:
-                cursor.execute('''
-                    INSERT INTO incomes_new (id, user_id, amount, category_id, description, currency, add_date, update_date)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (new_id, user_id, amount, new_category_id, description, currency, add_date, update_date))
-        
-        print(f"  ✅ Змігровано {len(incomes)} доходів")
+        incomes_count = _copy_transactions(cursor, 'incomes', category_mapping)
+        print(f"  ✅ Змігровано {incomes_count} доходів")
         
         # 3. Міграція expenses
         print("\n💸 Міграція таблиці expenses...")
-        
-        cursor.execute('SELECT id, user_id, amount, category_id, description, add_date, update_date FROM expenses')
-        expenses = cursor.fetchall()
-        
-        cursor.execute('''
-            CREATE TABLE expenses_new (
-                id TEXT PRIMARY KEY,
-                user_id INTEGER,
-                amount REAL,
-                category_id TEXT,
-                description TEXT,
-                add_date TEXT,
-                update_date TEXT,
-                FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
-                FOREIGN KEY (category_id) REFERENCES categories_new(id) ON DELETE RESTRICT
-            )
-        ''')
-        
-        for old_id, user_id, amount, old_category_id, description, add_date, update_date in expenses:
-            new_id = str(uuid.uuid4())
-            new_category_id = category_mapping.get(old_category_id)
-            if new_category_id:
-                cursor.execute('''
-                    INSERT INTO expenses_new (id, user_id, amount, category_id, description, add_date, update_date)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (new_id, user_id, amount, new_category_id, description, add_date, update_date))
-        
-        print(f"  ✅ Змігровано {len(expenses)} витрат")
+        expenses_count = _copy_transactions(cursor, 'expenses', category_mapping)
+        print(f"  ✅ Змігровано {expenses_count} витрат")
         
         # 4. Видаляємо старі таблиці та перейменовуємо нові
         print("\n🔄 Заміна таблиць...")
@@ -139,6 +129,13 @@ def migrate_to_uuid():
         cursor.execute('ALTER TABLE incomes_new RENAME TO incomes')
         cursor.execute('ALTER TABLE expenses_new RENAME TO expenses')
         
+        # 5. Індекси зникли разом зі старими таблицями, а daily_totals посилається на старі
+        # ID категорій - init_db при наступному запуску бота застосує всі міграції схеми
+        # заново (вони ідемпотентні); міграція 5 переведе суми та дати в цілі числа,
+        # якщо вони ще REAL/TEXT
+        cursor.execute('DROP TABLE IF EXISTS daily_totals')
+        cursor.execute('PRAGMA user_version = 0')
+        
         conn.execute('PRAGMA foreign_keys = ON')
         conn.commit()
         conn.close()
@@ -146,9 +143,10 @@ def migrate_to_uuid():
         print("\n" + "="*60)
         print("✅ Міграція завершена успішно!")
         print(f"📊 Категорій: {len(categories)}")
-        print(f"💰 Доходів: {len(incomes)}")
-        print(f"💸 Витрат: {len(expenses)}")
+        print(f"💰 Доходів: {incomes_count}")
+        print(f"💸 Витрат: {expenses_count}")
         print(f"💾 Бекап збережено: {backup_path}")
+        print("🔄 Міграції схеми застосуються при наступному запуску бота (init_db)")
         print("="*60)
         
         return True
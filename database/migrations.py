@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+Версіоновані міграції схеми БД.
+Поточна версія схеми зберігається в PRAGMA user_version,
+init_db() застосовує всі міграції з більшою версією по черзі.
+"""
+
+from typing import Callable, List, Tuple
+
+
+def _migration_1_report_indexes(cursor):
+    """Індекси для звітних запитів (фільтр user_id + add_date) та JOIN по категоріях."""
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_incomes_user_date ON incomes(user_id, add_date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_expenses_user_date ON expenses(user_id, add_date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_incomes_category ON incomes(category_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_expenses_category ON expenses(category_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_bot_messages_user ON bot_messages(user_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_categories_type_user ON categories(type, user_id)')
+
+
+def _migration_2_exchange_rates(cursor):
+    """Останні завантажені курси валют: один курс на (базова валюта, валюта котирування)."""
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS exchange_rates (
+        base TEXT NOT NULL,
+        quote TEXT NOT NULL,
+        rate REAL NOT NULL,
+        source TEXT,
+        update_date TEXT,
+        PRIMARY KEY (base, quote)
+    );
+    ''')
+
+
+def _migration_3_daily_totals(cursor):
+    """Денні підсумки доходів/витрат по категоріях і валютах + заповнення з наявних даних."""
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS daily_totals (
+        user_id INTEGER NOT NULL,
+        kind TEXT NOT NULL CHECK(kind IN ('income', 'expense')),
+        day TEXT NOT NULL,
+        category_id TEXT NOT NULL,
+        currency TEXT NOT NULL,
+        amount REAL NOT NULL DEFAULT 0,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, kind, day, category_id, currency)
+    );
+    ''')
+    
+    # Заповнення в тому вигляді, в якому міграція вийшла (суми REAL, дні 'YYYY-MM-DD');
+    # fill_daily_totals тепер рахує цілі одиниці, тому запит тут зафіксовано.
+    # Міграція 5 перебудовує таблицю і заповнює її заново.
+    for kind, table in (('income', 'incomes'), ('expense', 'expenses')):
+        cursor.execute(f'''
+            INSERT INTO daily_totals (user_id, kind, day, category_id, currency, amount, count)
+            SELECT user_id, ?, substr(add_date, 1, 10), COALESCE(category_id, ''),
+                   COALESCE(currency, 'UAH'), SUM(amount), COUNT(*)
+            FROM {table}
+            GROUP BY user_id, substr(add_date, 1, 10), COALESCE(category_id, ''), COALESCE(currency, 'UAH')
+        ''', (kind,))
+
+
+def _migration_4_keyset_indexes(cursor):
+    """Індекси (user_id, add_date, id) для посторінкового читання; замінюють індекси (user_id, add_date)."""
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_incomes_user_date_id ON incomes(user_id, add_date, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_expenses_user_date_id ON expenses(user_id, add_date, id)')
+    cursor.execute('DROP INDEX IF EXISTS idx_incomes_user_date')
+    cursor.execute('DROP INDEX IF EXISTS idx_expenses_user_date')
+
+
+def _migration_5_integer_units(cursor):
+    """
+    Суми - цілі мінімальні одиниці валюти, дати - секунди від 1970-01-01 (models/units.py).
+    SQLite не змінює тип стовпця, тому таблиці перебудовуються; daily_totals
+    створюється заново (день - номер дня від 1970-01-01) і заповнюється з транзакцій.
+    """
+    from config.constants import AMOUNT_MINOR_UNITS
+
+    for table in ('incomes', 'expenses'):
+        columns = {row[1]: row[2] for row in cursor.execute(f'PRAGMA table_info({table})').fetchall()}
+        if columns.get('amount') == 'INTEGER':
+            continue  # Нова БД - init_db вже створив таблицю з цілими стовпцями
+
+        # Залишок перерваної міграції (до того, як міграції стали транзакційними)
+        cursor.execute(f'DROP TABLE IF EXISTS {table}_new')
+        cursor.execute(f'''
+        CREATE TABLE {table}_new (
+            id TEXT PRIMARY KEY,
+            user_id INTEGER,
+            amount INTEGER,
+            category_id TEXT,
+            description TEXT,
+            currency TEXT DEFAULT 'UAH',
+            add_date INTEGER,
+            update_date INTEGER,
+            FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+            FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE RESTRICT
+        );
+        ''')
+        # strftime('%s') трактує дату як UTC - так само, як models.units.to_timestamp
+        cursor.execute(f'''
+            INSERT INTO {table}_new (id, user_id, amount, category_id, description, currency, add_date, update_date)
+            SELECT id, user_id, CAST(ROUND(amount * {int(AMOUNT_MINOR_UNITS)}) AS INTEGER), category_id,
+                   description, currency,
+                   CAST(strftime('%s', add_date) AS INTEGER), CAST(strftime('%s', update_date) AS INTEGER)
+            FROM {table}
+        ''')
+        cursor.execute(f'DROP TABLE {table}')
+        cursor.execute(f'ALTER TABLE {table}_new RENAME TO {table}')
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_user_date_id ON {table}(user_id, add_date, id)')
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_category ON {table}(category_id)')
+
+    cursor.execute('DROP TABLE IF EXISTS daily_totals')
+    cursor.execute('''
+    CREATE TABLE daily_totals (
+        user_id INTEGER NOT NULL,
+        kind TEXT NOT NULL CHECK(kind IN ('income', 'expense')),
+        day INTEGER NOT NULL,
+        category_id TEXT NOT NULL,
+        currency TEXT NOT NULL,
+        amount INTEGER NOT NULL DEFAULT 0,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, kind, day, category_id, currency)
+    );
+    ''')
+
+    from .daily_totals import fill_daily_totals
+    fill_daily_totals(cursor)
+
+
+def _migration_6_conversation_states(cursor):
+    """Стан незавершених діалогів (utils/state_store.py): JSON значення на (сховище, користувач)."""
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS conversation_states (
+        namespace TEXT NOT NULL,
+        user_id INTEGER NOT NULL,
+        value TEXT NOT NULL,
+        expires_at INTEGER NOT NULL,
+        PRIMARY KEY (namespace, user_id)
+    );
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_conversation_states_expires ON conversation_states(expires_at)')
+
+
+# (версія, опис, функція міграції) - тільки додавати в кінець!
+SCHEMA_MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, 'report indexes', _migration_1_report_indexes),
+    (2, 'exchange rates', _migration_2_exchange_rates),
+    (3, 'daily totals rollup', _migration_3_daily_totals),
+    (4, 'keyset pagination indexes', _migration_4_keyset_indexes),
+    (5, 'integer amounts and timestamps', _migration_5_integer_units),
+    (6, 'conversation states', _migration_6_conversation_states),
+]
+
+
+def get_schema_version(cursor) -> int:
+    """Отримати поточну версію схеми БД."""
+    cursor.execute('PRAGMA user_version')
+    return cursor.fetchone()[0]
+
+
+def apply_schema_migrations(cursor) -> int:
+    """
+    Застосувати всі міграції, новіші за поточну версію схеми.
+
+    Args:
+        cursor: Курсор з'єднання (commit виконує викликаюча сторона)
+
+    Returns:
+        int: Кількість застосованих міграцій
+    """
+    current_version = get_schema_version(cursor)
+    applied = 0
+
+    for version, description, migration in SCHEMA_MIGRATIONS:
+        if version <= current_version:
+            continue
+
+        print(f"[*] Applying schema migration {version}: {description}", flush=True)
+        # Міграція разом з user_version - одна транзакція (SAVEPOINT працює і всередині
+        # вже відкритої): при помилці БД лишається на попередній версії без половини змін
+        savepoint = f'schema_migration_{int(version)}'
+        cursor.execute(f'SAVEPOINT {savepoint}')
+        try:
+            migration(cursor)
+            cursor.execute(f'PRAGMA user_version = {int(version)}')
+        except Exception:
+            cursor.execute(f'ROLLBACK TO {savepoint}')
+            raise
+        finally:
+            cursor.execute(f'RELEASE {savepoint}')
+        applied += 1
+
+    return applied
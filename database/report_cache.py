@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Кеш готових звітів (ReportData) у пам'яті процесу.
+
+Кожен користувач має лічильник версії даних, який збільшується при
+додаванні/зміні/видаленні доходів і витрат та зміні мови чи валюти.
+Версія входить у ключ кешу, тому після запису старі звіти користувача
+просто перестають знаходитись і з часом витісняються (LRU).
+"""
+
+import time
+from collections import OrderedDict
+from datetime import datetime
+from threading import Lock
+from typing import Dict
+from config.constants import REPORT_CACHE_MAX_ENTRIES, REPORT_CACHE_MAX_BYTES, REPORT_CACHE_TTL
+
+# {user_id: версія даних}
+_data_versions: Dict[int, int] = {}
+
+# {ключ: (звіт, оцінка розміру, час створення)}
+_report_cache: 'OrderedDict[tuple, tuple]' = OrderedDict()
+_cache_bytes = 0
+_cache_lock = Lock()
+_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+
+def bump_data_version(user_id: int):
+    """Позначити що дані користувача змінились (закешовані звіти застаріли)."""
+    with _cache_lock:
+        _data_versions[user_id] = _data_versions.get(user_id, 0) + 1
+
+
+def get_data_version(user_id: int) -> int:
+    """Поточна версія даних користувача."""
+    with _cache_lock:
+        return _data_versions.get(user_id, 0)
+
+
+def _make_key(user_id: int, period: str, include_comparison: bool, include_transactions: bool) -> tuple:
+    # Дата в ключі: межі періодів ('today', 'week', ...) зсуваються опівночі
+    return (user_id, _data_versions.get(user_id, 0), datetime.now().strftime('%Y-%m-%d'),
+            period, include_comparison, include_transactions)
+
+
+def _estimate_report_size(report) -> int:
+    """Груба оцінка пам'яті звіту в байтах (TransactionRecord з рядками - ~350 байт)."""
+    transactions = len(report.incomes) + len(report.expenses)
+    categories = len(report.income_by_category) + len(report.expense_by_category)
+    return 4096 + 384 * transactions + 256 * categories
+
+
+def get_cached_report(user_id: int, period: str, include_comparison: bool, include_transactions: bool):
+    """
+    Отримати звіт з кешу.
+    
+    Звіт без транзакцій може бути відданий із закешованого повного звіту
+    з тими ж параметрами (він містить ті самі суми).
+    
+    Returns:
+        ReportData або None, якщо в кеші немає актуального звіту
+    """
+    variants = [include_transactions] if include_transactions else [False, True]
+    
+    with _cache_lock:
+        for variant in variants:
+            key = _make_key(user_id, period, include_comparison, variant)
+            entry = _report_cache.get(key)
+            if entry is None:
+                continue
+            
+            report, size, created_at = entry
+            if time.monotonic() - created_at >= REPORT_CACHE_TTL:
+                _evict(key)
+                continue
+            
+            _report_cache.move_to_end(key)
+            _cache_stats['hits'] += 1
+            return report
+        
+        _cache_stats['misses'] += 1
+        return None
+
+
+def store_report(user_id: int, period: str, include_comparison: bool, include_transactions: bool,
+                 report, data_version: int):
+    """
+    Зберегти звіт у кеш.
+    
+    Args:
+        data_version: Версія даних користувача на момент початку побудови звіту;
+            якщо за цей час дані змінились, звіт не кешується
+    """
+    size = _estimate_report_size(report)
+    if size > REPORT_CACHE_MAX_BYTES:
+        return
+    
+    global _cache_bytes
+    
+    with _cache_lock:
+        if _data_versions.get(user_id, 0) != data_version:
+            return
+        
+        key = _make_key(user_id, period, include_comparison, include_transactions)
+        if key in _report_cache:
+            _evict(key)
+        
+        _report_cache[key] = (report, size, time.monotonic())
+        _cache_bytes += size
+        
+        while len(_report_cache) > REPORT_CACHE_MAX_ENTRIES or _cache_bytes > REPORT_CACHE_MAX_BYTES:
+            _evict(next(iter(_report_cache)))
+            _cache_stats['evictions'] += 1
+
+
+def _evict(key):
+    """Видалити запис з кешу (викликається під _cache_lock)."""
+    global _cache_bytes
+    _, size, _ = _report_cache.pop(key)
+    _cache_bytes -= size
+
+
+def clear_report_cache():
+    """Очистити кеш звітів."""
+    global _cache_bytes
+    
+    with _cache_lock:
+        _report_cache.clear()
+        _cache_bytes = 0
+
+
+def get_report_cache_stats() -> Dict:
+    """
+    Метрики кешу звітів.
+    
+    Returns:
+        Dict: hits, misses, evictions, entries, bytes (оцінка)
+    """
+    with _cache_lock:
+        stats = dict(_cache_stats)
+        stats['entries'] = len(_report_cache)
+        stats['bytes'] = _cache_bytes
+    return stats
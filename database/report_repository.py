@@ -3,23 +3,25 @@
 Report repository - агрегація даних для звітів та аналізу бюджету.
 """
 
+from dataclasses import replace
 from datetime import datetime, timedelta
-from threading import Lock
 from typing import Dict, Optional
-from .db_manager import get_connection
-from .utils import get_date_range_for_period
-from .income_repository import get_incomes_aggregated
-from .expense_repository import get_expenses_aggregated
+from .utils import get_date_range_for_period, aggregate_category_totals
+from .income_repository import scan_incomes_window
+from .expense_repository import scan_expenses_window
+from .user_repository import get_user
+from .report_cache import get_cached_report, store_report, get_data_version
+from .daily_totals import scan_daily_window, get_daily_totals
+from config.constants import DEFAULT_CURRENCY, ROLLUP_REPORT_PERIODS
 from models import ReportData, PeriodComparison, Income, Expense
 from locales import get_period_name
 
-_lock = Lock()
-
 
 def generate_user_report(
     user_id: int,
     period: str = 'month',
-    include_comparison: bool = False
+    include_comparison: bool = False,
+    include_transactions: bool = True
 ) -> ReportData:
     """
     Генерує повний звіт для користувача за вказаний період.
@@ -28,28 +30,85 @@ def generate_user_report(
         user_id: ID користувача
         period: Період ('today', 'week', 'month', 'year')
         include_comparison: Чи включати порівняння з попереднім періодом
+        include_transactions: Чи завантажувати списки транзакцій (потрібні для
+            HTML звіту). Якщо False, суми рахуються в SQLite через GROUP BY
     
     Returns:
-        ReportData: Повний звіт з усіма даними
+        ReportData: Повний звіт з усіма даними (спільний об'єкт з кешу - не змінювати)
     """
+    report = get_cached_report(user_id, period, include_comparison, include_transactions)
+    if report is not None:
+        return report
+    
+    from utils.currency_converter import has_loaded_rates
+    
+    data_version = get_data_version(user_id)
+    # Поки курси не завантажені, суми рахуються за FALLBACK_RATES - такий звіт не кешуємо
+    cacheable = has_loaded_rates()
+    
+    # HTML звіт зазвичай відкривають після детального: суми беремо з його кешу
+    totals = get_cached_report(user_id, period, include_comparison, False) if include_transactions else None
+    if totals is not None:
+        report = _with_transactions(totals, user_id, period)
+    else:
+        report = _build_user_report(user_id, period, include_comparison, include_transactions)
+    if cacheable:
+        store_report(user_id, period, include_comparison, include_transactions, report, data_version)
+    return report
+
+
+def _with_transactions(totals: ReportData, user_id: int, period: str) -> ReportData:
+    """Звіт із сум закешованого звіту без транзакцій і транзакцій поточного періоду."""
+    start, end = get_date_range_for_period(period)
+    incomes, _, _ = scan_incomes_window(user_id, start, end)
+    expenses, _, _ = scan_expenses_window(user_id, start, end)
+    report = replace(totals, incomes=incomes, expenses=expenses)
+    if period in ROLLUP_REPORT_PERIODS:
+        report.daily_totals = get_daily_totals(user_id, start, end)
+    return report
+
+
+def _build_user_report(
+    user_id: int,
+    period: str,
+    include_comparison: bool,
+    include_transactions: bool
+) -> ReportData:
+    """Побудувати звіт з БД (без кешу)."""
     # Отримуємо діапазон дат
     start, end = get_date_range_for_period(period)
     
-    # Отримуємо агреговані дані
-    incomes_data = get_incomes_aggregated(user_id, period)
-    expenses_data = get_expenses_aggregated(user_id, period)
+    # Вікно сканування: з порівнянням захоплюємо і попередній період,
+    # щоб обидва періоди порахувати одним запитом на таблицю
+    window_start = _get_previous_period(start, end)[0] if include_comparison else start
+    
+    use_rollup = period in ROLLUP_REPORT_PERIODS
     
-    # Валюта (має бути однаковою в обох)
-    currency = incomes_data.get('currency', 'UAH')
+    if use_rollup and not include_transactions:
+        # Довгі періоди без транзакцій: суми з денних підсумків, O(днів)
+        incomes, expenses = [], []
+        income_groups, prev_income_groups = scan_daily_window(user_id, 'income', window_start, end, start)
+        expense_groups, prev_expense_groups = scan_daily_window(user_id, 'expense', window_start, end, start)
+    else:
+        incomes, income_groups, prev_income_groups = scan_incomes_window(
+            user_id, window_start, end, split=start, include_transactions=include_transactions
+        )
+        expenses, expense_groups, prev_expense_groups = scan_expenses_window(
+            user_id, window_start, end, split=start, include_transactions=include_transactions
+        )
+    
+    # Дефолтна валюта користувача
+    user = get_user(user_id)
+    currency = user.default_currency if user else DEFAULT_CURRENCY
+    
+    # Агрегування по категоріях з конвертацією валют
+    incomes_data = aggregate_category_totals(income_groups, currency)
+    expenses_data = aggregate_category_totals(expense_groups, currency)
     
     # Розбивка по валютах
     income_by_currency = incomes_data.get('by_currency', {})
     expense_by_currency = expenses_data.get('by_currency', {})
     
-    # Списки транзакцій
-    incomes = incomes_data.get('incomes', [])
-    expenses = expenses_data.get('expenses', [])
-    
     # Загальні суми
     total_income = round(incomes_data.get('total', 0.0), 2)
     total_expense = round(expenses_data.get('total', 0.0), 2)
@@ -62,8 +121,8 @@ def generate_user_report(
     expense_by_category_currency = expenses_data.get('aggregated_by_category_currency', {})
     
     # Статистика
-    income_count = len(incomes)
-    expense_count = len(expenses)
+    income_count = incomes_data.get('count', len(incomes))
+    expense_count = expenses_data.get('count', len(expenses))
     transaction_count = income_count + expense_count
     
     avg_income = round(total_income / income_count, 2) if income_count > 0 else 0.0
@@ -95,47 +154,41 @@ def generate_user_report(
         expense_by_currency=expense_by_currency,
         income_by_category_currency=income_by_category_currency,
         expense_by_category_currency=expense_by_category_currency,
+        income_count_by_currency=incomes_data.get('count_by_currency', {}),
+        expense_count_by_currency=expenses_data.get('count_by_currency', {}),
     )
     
+    # Денна динаміка для HTML звіту з денних підсумків
+    if use_rollup and include_transactions:
+        report.daily_totals = get_daily_totals(user_id, start, end)
+    
     # Додаємо порівняння з попереднім періодом (опціонально)
     if include_comparison and transaction_count > 0:
-        report.previous_period = compare_with_previous_period(
-            user_id, start, end, total_income, total_expense, net_balance
+        prev_income = aggregate_category_totals(prev_income_groups, currency)['total']
+        prev_expense = aggregate_category_totals(prev_expense_groups, currency)['total']
+        report.previous_period = _build_period_comparison(
+            total_income, total_expense, net_balance, prev_income, prev_expense
         )
     
     return report
 
 
-def compare_with_previous_period(
-    user_id: int,
-    current_start: datetime,
-    current_end: datetime,
-    current_income: float,
-    current_expense: float,
-    current_balance: float
-) -> Optional[PeriodComparison]:
-    """
-    Порівнює поточний період з попереднім.
-    
-    Args:
-        user_id: ID користувача
-        current_start: Початок поточного періоду
-        current_end: Кінець поточного періоду
-        current_income: Поточний дохід
-        current_expense: Поточні витрати
-        current_balance: Поточний баланс
-    
-    Returns:
-        PeriodComparison або None якщо попередніх даних немає
-    """
-    # Обчислюємо попередній період
+def _get_previous_period(current_start: datetime, current_end: datetime):
+    """Попередній період такої ж тривалості, що закінчується перед current_start."""
     period_length = current_end - current_start
     prev_end = current_start - timedelta(seconds=1)
     prev_start = prev_end - period_length
-    
-    # Отримуємо дані попереднього періоду
-    prev_incomes = _get_period_totals(user_id, prev_start, prev_end, 'incomes')
-    prev_expenses = _get_period_totals(user_id, prev_start, prev_end, 'expenses')
+    return prev_start, prev_end
+
+
+def _build_period_comparison(
+    current_income: float,
+    current_expense: float,
+    current_balance: float,
+    prev_incomes: float,
+    prev_expenses: float
+) -> Optional[PeriodComparison]:
+    """Обчислити зміни відносно попереднього періоду (None якщо він порожній)."""
     prev_balance = prev_incomes - prev_expenses
     
     # Якщо попередній період порожній, не повертаємо порівняння
@@ -163,38 +216,3 @@ def compare_with_previous_period(
         balance_change=balance_change,
         balance_change_percent=balance_change_percent,
     )
-
-
-def _get_period_totals(
-    user_id: int,
-    start: datetime,
-    end: datetime,
-    table: str
-) -> float:
-    """
-    Отримує загальну суму для періоду з вказаної таблиці.
-    
-    Args:
-        user_id: ID користувача
-        start: Початок періоду
-        end: Кінець періоду
-        table: Назва таблиці ('incomes' або 'expenses')
-    
-    Returns:
-        float: Загальна сума
-    """
-    query = f'''
-        SELECT COALESCE(SUM(amount), 0.0)
-        FROM {table}
-        WHERE user_id = ? AND add_date BETWEEN ? AND ?
-    '''
-    
-    with _lock:
-        with get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                query,
-                (user_id, start.strftime('%Y-%m-%d %H:%M:%S'), end.strftime('%Y-%m-%d %H:%M:%S'))
-            )
-            result = cursor.fetchone()
-            return result[0] if result else 0.0
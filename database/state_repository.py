@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Репозиторій стану незавершених діалогів (таблиця conversation_states).
+Значення - JSON рядки, час закінчення - секунди від 1970-01-01.
+Використовується через utils/state_store.py.
+"""
+
+from typing import List, Tuple
+from .db_manager import get_connection, _write_lock
+
+
+def load_conversation_states(namespace: str, now: int) -> List[Tuple[int, str, int]]:
+    """
+    Отримати непрострочені стани сховища.
+    
+    Args:
+        namespace: Назва сховища
+        now: Поточний час (сек від 1970-01-01)
+    
+    Returns:
+        List[Tuple]: (user_id, value, expires_at), від найстаріших до найновіших
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT user_id, value, expires_at FROM conversation_states
+            WHERE namespace = ? AND expires_at > ?
+            ORDER BY expires_at
+        ''', (namespace, now))
+        return cursor.fetchall()
+
+
+def save_conversation_state(namespace: str, user_id: int, value: str, expires_at: int):
+    """Зберегти (або замінити) стан користувача."""
+    with _write_lock:
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO conversation_states (namespace, user_id, value, expires_at)
+                VALUES (?, ?, ?, ?)
+            ''', (namespace, user_id, value, expires_at))
+            conn.commit()
+
+
+def delete_conversation_states(namespace: str, user_ids: List[int]):
+    """Видалити стани користувачів."""
+    with _write_lock:
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                'DELETE FROM conversation_states WHERE namespace = ? AND user_id = ?',
+                [(namespace, user_id) for user_id in user_ids]
+            )
+            conn.commit()
+
+
+def purge_expired_conversation_states(now: int) -> int:
+    """
+    Видалити прострочені стани всіх сховищ.
+    
+    Returns:
+        int: Кількість видалених записів
+    """
+    with _write_lock:
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM conversation_states WHERE expires_at <= ?', (now,))
+            conn.commit()
+            return cursor.rowcount
@@ -4,13 +4,11 @@
 Використовує модель User для представлення даних.
 """
 
-from threading import Lock
 from typing import Optional
-from .db_manager import get_connection
+from .db_manager import get_connection, _write_lock
+from .report_cache import bump_data_version
 from models import User
 
-_lock = Lock()
-
 
 def get_user(user_id: int) -> Optional[User]:
     """
@@ -22,23 +20,22 @@ def get_user(user_id: int) -> Optional[User]:
     Returns:
         User або None
     """
-    with _lock:
-        with get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT user_id, language, username, default_currency
-                FROM users WHERE user_id = ?
-            ''', (user_id,))
-            row = cursor.fetchone()
-            
-            if row:
-                return User(
-                    user_id=row[0],
-                    language=row[1] if row[1] else 'uk',
-                    username=row[2],
-                    default_currency=row[3] if row[3] else 'UAH'
-                )
-            return None
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT user_id, language, username, default_currency
+            FROM users WHERE user_id = ?
+        ''', (user_id,))
+        row = cursor.fetchone()
+        
+        if row:
+            return User(
+                user_id=row[0],
+                language=row[1] if row[1] else 'uk',
+                username=row[2],
+                default_currency=row[3] if row[3] else 'UAH'
+            )
+        return None
 
 
 def create_user(user_id: int, language: str = 'uk', username: str = None, default_currency: str = 'UAH') -> User:
@@ -56,7 +53,7 @@ def create_user(user_id: int, language: str = 'uk', username: str = None, defaul
     """
     user = User(user_id=user_id, language=language, username=username, default_currency=default_currency)
     
-    with _lock:
+    with _write_lock:
         with get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
@@ -79,13 +76,15 @@ def update_user_language(user_id: int, language: str) -> bool:
     Returns:
         bool: True якщо успішно оновлено
     """
-    with _lock:
+    with _write_lock:
         with get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 UPDATE users SET language = ? WHERE user_id = ?
             ''', (language, user_id))
             conn.commit()
+            # Назва періоду в закешованих звітах залежить від мови
+            bump_data_version(user_id)
             return cursor.rowcount > 0
 
 
@@ -100,13 +99,15 @@ def update_user_currency(user_id: int, currency: str) -> bool:
     Returns:
         bool: True якщо успішно оновлено
     """
-    with _lock:
+    with _write_lock:
         with get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 UPDATE users SET default_currency = ? WHERE user_id = ?
             ''', (currency, user_id))
             conn.commit()
+            # Суми в закешованих звітах пораховані у валюті користувача
+            bump_data_version(user_id)
             return cursor.rowcount > 0
 
 
@@ -120,14 +121,13 @@ def get_user_language(user_id: int) -> Optional[str]:
     Returns:
         Optional[str]: Мова користувача ('uk', 'en') або None
     """
-    with _lock:
-        with get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT language FROM users WHERE user_id = ?
-            ''', (user_id,))
-            row = cursor.fetchone()
-            return row[0] if row else None
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT language FROM users WHERE user_id = ?
+        ''', (user_id,))
+        row = cursor.fetchone()
+        return row[0] if row else None
 
 
 def get_all_user_ids():
@@ -137,11 +137,10 @@ def get_all_user_ids():
     Returns:
         list: Список ID користувачів
     """
-    with _lock:
-        with get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT user_id FROM users')
-            return [row[0] for row in cursor.fetchall()]
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT user_id FROM users')
+        return [row[0] for row in cursor.fetchall()]
 
 
 def ensure_user_exists(user_id: int, username: str = None) -> User:
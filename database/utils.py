@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from datetime import datetime, timedelta
+from models.units import from_minor_units, to_timestamp
 
 
 def get_date_range_for_period(period):
@@ -25,3 +26,101 @@ def get_date_range_for_period(period):
         end = None
     
     return start, end
+
+
+def aggregate_category_totals(groups, user_currency):
+    """
+    Агрегує суми по категоріях та валютах з конвертацією у валюту користувача.
+    
+    Суми накопичуються цілими мінімальними одиницями (як зберігаються в БД),
+    тому підсумки точні; у float вони перетворюються лише в результаті.
+    
+    Args:
+        groups: Ітерабельне з кортежів (category_name, currency, amount, count),
+                де amount - сума в оригінальній валюті в мінімальних одиницях
+        user_currency: Валюта користувача для загального підрахунку
+    
+    Returns:
+        dict: aggregated, aggregated_by_category_currency, by_currency,
+              total, count, count_by_currency
+    """
+    from utils.currency_converter import get_conversion_factors
+    
+    groups = list(groups)
+    
+    # Курс для кожної валюти шукаємо один раз на всі групи
+    factors = get_conversion_factors({group[1] for group in groups}, user_currency)
+    
+    aggregated = {}
+    aggregated_by_category_currency = {}  # {category: {currency: amount}}
+    by_currency = {}  # Розбивка по валютах (оригінальні суми)
+    count_by_currency = {}
+    total = 0
+    count = 0
+    
+    for category_name, currency, amount, group_count in groups:
+        # Не перекладаємо назви - переклад буде в formatters
+        category_name = category_name or 'Інше'
+        factor = factors[currency]
+        amount_in_user_currency = amount if factor is None else round(amount * factor)
+        
+        by_currency[currency] = by_currency.get(currency, 0) + amount
+        count_by_currency[currency] = count_by_currency.get(currency, 0) + group_count
+        
+        # Зберігаємо оригінальні суми по категоріях та валютах
+        category_currencies = aggregated_by_category_currency.setdefault(category_name, {})
+        category_currencies[currency] = category_currencies.get(currency, 0) + amount
+        
+        aggregated[category_name] = aggregated.get(category_name, 0) + amount_in_user_currency
+        total += amount_in_user_currency
+        count += group_count
+    
+    return {
+        'aggregated': _from_minor_units_dict(aggregated),
+        'aggregated_by_category_currency': {
+            category_name: _from_minor_units_dict(currencies)
+            for category_name, currencies in aggregated_by_category_currency.items()
+        },
+        'total': from_minor_units(total),
+        'currency': user_currency,
+        'by_currency': _from_minor_units_dict(by_currency),  # Оригінальні суми по валютах
+        'count': count,
+        'count_by_currency': count_by_currency,
+    }
+
+
+def _from_minor_units_dict(values: dict) -> dict:
+    """{ключ: мінімальні одиниці} -> {ключ: сума}."""
+    return {key: from_minor_units(value) for key, value in values.items()}
+
+
+def build_keyset_filter(user_id, start=None, end=None, cursor=None, backward=False):
+    """
+    Умова WHERE та ORDER BY для посторінкового читання транзакцій по ключу (add_date, id).
+    
+    Args:
+        user_id: ID користувача
+        start: Початок періоду (datetime або None - без обмеження)
+        end: Кінець періоду (datetime або None - без обмеження)
+        cursor: (add_date, id) транзакції, від якої продовжувати, або None - з початку
+            (add_date - рядок, як у моделях)
+        backward: False - старіші за cursor (від найновіших), True - новіші за cursor
+    
+    Returns:
+        Tuple: (where, order, params) для запиту з псевдонімом таблиці t
+    """
+    conditions = ['t.user_id = ?']
+    params = [user_id]
+    
+    if start is not None:
+        conditions.append('t.add_date >= ?')
+        params.append(to_timestamp(start))
+    if end is not None:
+        conditions.append('t.add_date <= ?')
+        params.append(to_timestamp(end))
+    if cursor is not None:
+        conditions.append('(t.add_date, t.id) > (?, ?)' if backward else '(t.add_date, t.id) < (?, ?)')
+        params.extend((to_timestamp(cursor[0]), cursor[1]))
+    
+    order = 't.add_date ASC, t.id ASC' if backward else 't.add_date DESC, t.id DESC'
+    return ' AND '.join(conditions), order, params
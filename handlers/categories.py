@@ -4,8 +4,8 @@
 """
 
 from typing import Optional
-from telebot import TeleBot, types
-from telebot.apihelper import ApiTelegramException
+from telebot import types
+from utils.handler_runtime import run_blocking, TELEGRAM_API_ERRORS
 from locales import get_text
 from locales.locale_manager import translate_category_name
 from keyboards.main_keyboards import (
@@ -15,23 +15,33 @@ from keyboards.main_keyboards import (
     back_button
 )
 from database import CategoryRepository
-from config.callbacks import CALLBACK_BACK_TO_SETTINGS
+from config.callbacks import (
+    CALLBACK_BACK_TO_SETTINGS,
+    CALLBACK_CATEGORY_MANAGEMENT,
+    CALLBACK_CATEGORY_ADD_TYPE_SELECT,
+    CALLBACK_CATEGORY_VIEW_TYPE_SELECT,
+    CALLBACK_CATEGORY_ADD_PREFIX,
+    CALLBACK_CATEGORY_VIEW_PREFIX,
+    CALLBACK_CATEGORY_DELETE_PREFIX,
+)
+from utils.callback_router import callback_router
 from utils.message_helpers import answer_callback
+from utils.state_store import create_state_store
 
 
-# Словник для зберігання стану додавання категорії {user_id: {'type': 'income/expense', 'step': 'name'}}
-category_creation_state = {}
+# Стан додавання категорії {user_id: {'type': 'income/expense', 'step': 'name', ...}} (utils/state_store.py)
+category_creation_state = create_state_store('category_creation')
 
 
-def category_management_menu(call: types.CallbackQuery, bot: TeleBot):
+async def category_management_menu(call: types.CallbackQuery, bot):
     """Показує меню управління категоріями."""
     user_id = call.from_user.id
     
     text = get_text('category_management_menu', user_id=user_id)
     markup = create_category_management_menu(user_id)
     
-    answer_callback(bot, call)
-    bot.edit_message_text(
+    await answer_callback(bot, call)
+    await bot.edit_message_text(
         text,
         chat_id=call.message.chat.id,
         message_id=call.message.message_id,
@@ -39,15 +49,15 @@ def category_management_menu(call: types.CallbackQuery, bot: TeleBot):
     )
 
 
-def add_category_select_type(call: types.CallbackQuery, bot: TeleBot):
+async def add_category_select_type(call: types.CallbackQuery, bot):
     """Вибір типу категорії для додавання."""
     user_id = call.from_user.id
     
     text = get_text('select_category_type_to_add', user_id=user_id)
     markup = create_category_type_selection(user_id, action='add')
     
-    answer_callback(bot, call)
-    bot.edit_message_text(
+    await answer_callback(bot, call)
+    await bot.edit_message_text(
         text,
         chat_id=call.message.chat.id,
         message_id=call.message.message_id,
@@ -55,7 +65,7 @@ def add_category_select_type(call: types.CallbackQuery, bot: TeleBot):
     )
 
 
-def add_category_start(call: types.CallbackQuery, bot: TeleBot, category_type: str):
+async def add_category_start(call: types.CallbackQuery, bot, category_type: str):
     """Початок процесу додавання категорії."""
     user_id = call.from_user.id
     
@@ -78,8 +88,8 @@ def add_category_start(call: types.CallbackQuery, bot: TeleBot, category_type: s
         )
     )
     
-    answer_callback(bot, call)
-    bot.edit_message_text(
+    await answer_callback(bot, call)
+    await bot.edit_message_text(
         text,
         chat_id=call.message.chat.id,
         message_id=call.message.message_id,
@@ -87,21 +97,18 @@ def add_category_start(call: types.CallbackQuery, bot: TeleBot, category_type: s
     )
 
 
-def handle_category_name_input(message: types.Message, bot: TeleBot):
+async def handle_category_name_input(message: types.Message, bot):
     """Обробка введення назви категорії."""
     user_id = message.from_user.id
     
-    if user_id not in category_creation_state:
-        return
-    
-    state = category_creation_state[user_id]
-    if state['step'] != 'name':
+    state = category_creation_state.get(user_id)
+    if state is None or state['step'] != 'name':
         return
     
     # Видаляємо повідомлення користувача
     try:
-        bot.delete_message(message.chat.id, message.message_id)
-    except ApiTelegramException:
+        await bot.delete_message(message.chat.id, message.message_id)
+    except TELEGRAM_API_ERRORS:
         pass
     
     category_name = message.text.strip()
@@ -116,7 +123,7 @@ def handle_category_name_input(message: types.Message, bot: TeleBot):
                 callback_data='category_add_type_select'
             )
         )
-        bot.edit_message_text(
+        await bot.edit_message_text(
             text,
             chat_id=state['chat_id'],
             message_id=state['message_id'],
@@ -134,7 +141,7 @@ def handle_category_name_input(message: types.Message, bot: TeleBot):
                 callback_data='category_add_type_select'
             )
         )
-        bot.edit_message_text(
+        await bot.edit_message_text(
             text,
             chat_id=state['chat_id'],
             message_id=state['message_id'],
@@ -143,7 +150,7 @@ def handle_category_name_input(message: types.Message, bot: TeleBot):
         return
     
     # Перевірка чи існує категорія
-    if CategoryRepository.category_exists(user_id, category_name, state['type']):
+    if await run_blocking(CategoryRepository.category_exists, user_id, category_name, state['type']):
         text = get_text('category_already_exists', user_id=user_id).format(category_name)
         markup = types.InlineKeyboardMarkup()
         markup.add(
@@ -152,7 +159,7 @@ def handle_category_name_input(message: types.Message, bot: TeleBot):
                 callback_data='category_add_type_select'
             )
         )
-        bot.edit_message_text(
+        await bot.edit_message_text(
             text,
             chat_id=state['chat_id'],
             message_id=state['message_id'],
@@ -161,15 +168,15 @@ def handle_category_name_input(message: types.Message, bot: TeleBot):
         return
     
     # Створюємо категорію
-    create_category_and_notify(user_id, category_name, state['type'], bot, state['chat_id'], state['message_id'])
+    await create_category_and_notify(user_id, category_name, state['type'], bot, state['chat_id'], state['message_id'])
 
 
 
 
 
-def create_category_and_notify(user_id: int, name: str, category_type: str, bot: TeleBot, chat_id: int, message_id: int):
+async def create_category_and_notify(user_id: int, name: str, category_type: str, bot, chat_id: int, message_id: int):
     """Створює категорію і відправляє повідомлення."""
-    cat_id = CategoryRepository.add_custom_category(user_id, name, category_type)
+    cat_id = await run_blocking(CategoryRepository.add_custom_category, user_id, name, category_type)
     
     if cat_id:
         text = get_text('category_created_success', user_id=user_id).format(name)
@@ -192,7 +199,7 @@ def create_category_and_notify(user_id: int, name: str, category_type: str, bot:
             )
         )
         
-        bot.edit_message_text(text, chat_id=chat_id, message_id=message_id, reply_markup=markup)
+        await bot.edit_message_text(text, chat_id=chat_id, message_id=message_id, reply_markup=markup)
     else:
         text = get_text('category_creation_failed', user_id=user_id)
         markup = types.InlineKeyboardMarkup()
@@ -202,22 +209,21 @@ def create_category_and_notify(user_id: int, name: str, category_type: str, bot:
                 callback_data='category_management'
             )
         )
-        bot.edit_message_text(text, chat_id=chat_id, message_id=message_id, reply_markup=markup)
+        await bot.edit_message_text(text, chat_id=chat_id, message_id=message_id, reply_markup=markup)
     
     # Очищаємо стан
-    if user_id in category_creation_state:
-        del category_creation_state[user_id]
+    category_creation_state.pop(user_id, None)
 
 
-def view_categories_select_type(call: types.CallbackQuery, bot: TeleBot):
+async def view_categories_select_type(call: types.CallbackQuery, bot):
     """Вибір типу категорії для перегляду."""
     user_id = call.from_user.id
     
     text = get_text('select_category_type_to_view', user_id=user_id)
     markup = create_category_type_selection(user_id, action='view')
     
-    answer_callback(bot, call)
-    bot.edit_message_text(
+    await answer_callback(bot, call)
+    await bot.edit_message_text(
         text,
         chat_id=call.message.chat.id,
         message_id=call.message.message_id,
@@ -225,11 +231,11 @@ def view_categories_select_type(call: types.CallbackQuery, bot: TeleBot):
     )
 
 
-def view_categories_list(call: types.CallbackQuery, bot: TeleBot, category_type: str):
+async def view_categories_list(call: types.CallbackQuery, bot, category_type: str):
     """Показує список категорій."""
     user_id = call.from_user.id
     
-    categories = CategoryRepository.get_categories_by_type(user_id, category_type)
+    categories = await run_blocking(CategoryRepository.get_categories_by_type, user_id, category_type)
     
     type_name = get_text('income_type_label' if category_type == 'income' else 'expense_type_label', user_id=user_id)
     text = get_text('categories_list_title', user_id=user_id).format(type_name) + '\n\n'
@@ -254,8 +260,8 @@ def view_categories_list(call: types.CallbackQuery, bot: TeleBot, category_type:
     
     markup = create_categories_list(user_id, custom_cats, category_type)
     
-    answer_callback(bot, call)
-    bot.edit_message_text(
+    await answer_callback(bot, call)
+    await bot.edit_message_text(
         text,
         chat_id=call.message.chat.id,
         message_id=call.message.message_id,
@@ -263,14 +269,14 @@ def view_categories_list(call: types.CallbackQuery, bot: TeleBot, category_type:
     )
 
 
-def delete_category_confirm(call: types.CallbackQuery, bot: TeleBot, category_id: int):
+async def delete_category_confirm(call: types.CallbackQuery, bot, category_id: int):
     """Підтвердження видалення категорії."""
     user_id = call.from_user.id
     
-    category = CategoryRepository.get_category_by_id(category_id)
+    category = await run_blocking(CategoryRepository.get_category_by_id, category_id)
     
     if not category or category.user_id != user_id:
-        answer_callback(bot, call, get_text('category_not_found', user_id=user_id))
+        await answer_callback(bot, call, get_text('category_not_found', user_id=user_id))
         return
     
     text = get_text('confirm_delete_category', user_id=user_id).format(category.name)
@@ -287,8 +293,8 @@ def delete_category_confirm(call: types.CallbackQuery, bot: TeleBot, category_id
         )
     )
     
-    answer_callback(bot, call)
-    bot.edit_message_text(
+    await answer_callback(bot, call)
+    await bot.edit_message_text(
         text,
         chat_id=call.message.chat.id,
         message_id=call.message.message_id,
@@ -296,65 +302,65 @@ def delete_category_confirm(call: types.CallbackQuery, bot: TeleBot, category_id
     )
 
 
-def delete_category_execute(call: types.CallbackQuery, bot: TeleBot, category_id: int):
+async def delete_category_execute(call: types.CallbackQuery, bot, category_id: int):
     """Виконує видалення категорії."""
     user_id = call.from_user.id
     
-    category = CategoryRepository.get_category_by_id(category_id)
+    category = await run_blocking(CategoryRepository.get_category_by_id, category_id)
     category_type = category.type if category else 'income'
     
-    if CategoryRepository.delete_custom_category(user_id, category_id):
-        answer_callback(bot, call, get_text('category_deleted_success', user_id=user_id))
+    if await run_blocking(CategoryRepository.delete_custom_category, user_id, category_id):
+        await answer_callback(bot, call, get_text('category_deleted_success', user_id=user_id))
     else:
-        answer_callback(bot, call, get_text('category_deletion_failed', user_id=user_id))
+        await answer_callback(bot, call, get_text('category_deletion_failed', user_id=user_id))
     
     # Повертаємось до списку категорій
-    view_categories_list(call, bot, category_type)
+    await view_categories_list(call, bot, category_type)
 
 
-def register_handlers(bot: TeleBot):
+def register_handlers(bot):
     """Реєструє всі обробники категорій."""
     
     # Головне меню управління категоріями
-    @bot.callback_query_handler(func=lambda call: call.data == 'category_management')
-    def callback_category_menu(call):
-        category_management_menu(call, bot)
+    @callback_router.exact(CALLBACK_CATEGORY_MANAGEMENT)
+    async def callback_category_menu(call):
+        await category_management_menu(call, bot)
     
     # Додавання категорії - вибір типу
-    @bot.callback_query_handler(func=lambda call: call.data == 'category_add_type_select')
-    def callback_add_type_select(call):
-        add_category_select_type(call, bot)
+    @callback_router.exact(CALLBACK_CATEGORY_ADD_TYPE_SELECT)
+    async def callback_add_type_select(call):
+        await add_category_select_type(call, bot)
     
     # Додавання категорії - початок
-    @bot.callback_query_handler(func=lambda call: call.data.startswith('category_add_'))
-    def callback_add_category(call):
+    @callback_router.prefix(CALLBACK_CATEGORY_ADD_PREFIX)
+    async def callback_add_category(call):
         category_type = call.data.replace('category_add_', '')
         if category_type in ['income', 'expense']:
-            add_category_start(call, bot, category_type)
+            await add_category_start(call, bot, category_type)
     
     # Перегляд категорій - вибір типу
-    @bot.callback_query_handler(func=lambda call: call.data == 'category_view_type_select')
-    def callback_view_type_select(call):
-        view_categories_select_type(call, bot)
+    @callback_router.exact(CALLBACK_CATEGORY_VIEW_TYPE_SELECT)
+    async def callback_view_type_select(call):
+        await view_categories_select_type(call, bot)
     
     # Перегляд категорій - список
-    @bot.callback_query_handler(func=lambda call: call.data.startswith('category_view_'))
-    def callback_view_categories(call):
+    @callback_router.prefix(CALLBACK_CATEGORY_VIEW_PREFIX)
+    async def callback_view_categories(call):
         category_type = call.data.replace('category_view_', '')
         if category_type in ['income', 'expense']:
-            view_categories_list(call, bot, category_type)
+            await view_categories_list(call, bot, category_type)
     
     # Видалення категорії - підтвердження
-    @bot.callback_query_handler(func=lambda call: call.data.startswith('category_delete_'))
-    def callback_delete_category(call):
+    @callback_router.prefix(CALLBACK_CATEGORY_DELETE_PREFIX)
+    async def callback_delete_category(call):
         if call.data.startswith('category_delete_confirmed_'):
             category_id = call.data.replace('category_delete_confirmed_', '')
-            delete_category_execute(call, bot, category_id)
+            await delete_category_execute(call, bot, category_id)
         else:
             category_id = call.data.replace('category_delete_', '')
-            delete_category_confirm(call, bot, category_id)
+            await delete_category_confirm(call, bot, category_id)
     
     # Обробка текстових повідомлень для створення категорії
-    @bot.message_handler(func=lambda message: message.from_user.id in category_creation_state and category_creation_state[message.from_user.id]['step'] == 'name')
-    def handle_name(message):
-        handle_category_name_input(message, bot)
+    @bot.message_handler(func=lambda message: category_creation_state.get(message.from_user.id, {}).get('step') == 'name')
+    async def handle_name(message):
+        await handle_category_name_input(message, bot)
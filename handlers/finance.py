@@ -1,8 +1,18 @@
 # -*- coding: utf-8 -*-
-from keyboards import finance_submenu, create_timeframe_keyboard, create_period_with_back_keyboard
-from database import get_incomes_aggregated, get_expenses_aggregated, ensure_user_exists
+from typing import Optional, Tuple
+from keyboards import finance_submenu, create_timeframe_keyboard, create_period_with_back_keyboard, create_transactions_page_keyboard
+from database import (
+    get_incomes_aggregated,
+    get_expenses_aggregated,
+    get_incomes_page,
+    get_expenses_page,
+    ensure_user_exists,
+    CategoryRepository,
+)
+from database.utils import get_date_range_for_period
+from models.units import from_timestamp, to_timestamp
 from locales import get_text
-from utils import send_main_menu, answer_callback, format_income_list, format_expense_list, format_general_finances
+from utils import send_main_menu, answer_callback, format_income_list, format_expense_list, format_general_finances, format_transactions_page
 from config.callbacks import (
     CALLBACK_MY_FINANCES,
     CALLBACK_VIEW_INCOMES,
@@ -14,50 +24,89 @@ from config.callbacks import (
     CALLBACK_BACK_TO_VIEW_INCOMES,
     CALLBACK_BACK_TO_VIEW_GENERAL,
     CALLBACK_TO_PERIOD,
+    CALLBACK_TRANSACTIONS_PAGE_PREFIX,
 )
+from utils.callback_router import callback_router
+from utils.handler_runtime import run_blocking
+
+# Коди для callback_data сторінок транзакцій (Telegram обмежує callback_data 64 байтами)
+_PAGE_TYPES = {'i': 'income', 'e': 'expense'}
+_PAGE_PERIODS = {'t': 'today', 'w': 'week', 'm': 'month', 'y': 'year'}
+_PAGE_OLDER = 'o'
+_PAGE_NEWER = 'n'
+
+
+def _page_callback(transaction_type: str, period: str, direction: str = _PAGE_OLDER, transaction=None) -> str:
+    """
+    callback_data сторінки транзакцій: 'txp:' + тип, період, напрямок та,
+    для не першої сторінки, курсор з add_date (секунди, як у БД) та id крайньої транзакції
+    (наприклад 'txp:emo:1760745600:<uuid>' - до 55 байт).
+    """
+    data = f"{CALLBACK_TRANSACTIONS_PAGE_PREFIX}{transaction_type[0]}{period[0]}{direction}"
+    if transaction is not None:
+        data += f":{to_timestamp(transaction.add_date)}:{transaction.id}"
+    return data
+
+
+def _parse_page_callback(data: str) -> Optional[Tuple[str, str, bool, Optional[Tuple[str, str]]]]:
+    """Розібрати callback_data сторінки: (тип, період, backward, cursor) або None."""
+    parts = data[len(CALLBACK_TRANSACTIONS_PAGE_PREFIX):].split(':')
+    codes = parts[0]
+    if len(codes) != 3 or codes[0] not in _PAGE_TYPES or codes[1] not in _PAGE_PERIODS \
+            or codes[2] not in (_PAGE_OLDER, _PAGE_NEWER):
+        return None
+    
+    cursor = None
+    if len(parts) == 3 and parts[1].isdigit():
+        cursor = (from_timestamp(int(parts[1])), parts[2])
+    elif len(parts) != 1:
+        return None
+    
+    return _PAGE_TYPES[codes[0]], _PAGE_PERIODS[codes[1]], codes[2] == _PAGE_NEWER, cursor
+
 
 def register_handlers(bot):
-    @bot.callback_query_handler(func=lambda call: call.data == CALLBACK_MY_FINANCES)
-    def finance_start(call):
-        answer_callback(bot, call)
+    @callback_router.exact(CALLBACK_MY_FINANCES)
+    async def finance_start(call):
+        await answer_callback(bot, call)
         user_id = call.from_user.id
-        ensure_user_exists(user_id, call.from_user.username)
-        bot.edit_message_text(get_text('finance_menu_info', user_id=user_id), chat_id=call.message.chat.id, message_id=call.message.message_id, reply_markup=finance_submenu(user_id=user_id))
+        await run_blocking(ensure_user_exists, user_id, call.from_user.username)
+        await bot.edit_message_text(get_text('finance_menu_info', user_id=user_id), chat_id=call.message.chat.id, message_id=call.message.message_id, reply_markup=finance_submenu(user_id=user_id))
     
-    @bot.callback_query_handler(func=lambda call: call.data == CALLBACK_VIEW_INCOMES)
-    def view_incomes_start(call):
-        answer_callback(bot, call)
+    @callback_router.exact(CALLBACK_VIEW_INCOMES)
+    async def view_incomes_start(call):
+        await answer_callback(bot, call)
         user_id = call.from_user.id
-        ensure_user_exists(user_id, call.from_user.username)
-        bot.edit_message_text(get_text('view_incomes_select_period', user_id=user_id), chat_id=call.message.chat.id, message_id=call.message.message_id, reply_markup=create_timeframe_keyboard(user_id=user_id, back_callback=CALLBACK_BACK_TO_FINANCES))
+        await run_blocking(ensure_user_exists, user_id, call.from_user.username)
+        await bot.edit_message_text(get_text('view_incomes_select_period', user_id=user_id), chat_id=call.message.chat.id, message_id=call.message.message_id, reply_markup=create_timeframe_keyboard(user_id=user_id, back_callback=CALLBACK_BACK_TO_FINANCES))
     
-    @bot.callback_query_handler(func=lambda call: call.data == CALLBACK_VIEW_EXPENSES)
-    def view_expenses_start(call):
-        answer_callback(bot, call)
+    @callback_router.exact(CALLBACK_VIEW_EXPENSES)
+    async def view_expenses_start(call):
+        await answer_callback(bot, call)
         user_id = call.from_user.id
-        ensure_user_exists(user_id, call.from_user.username)
-        bot.edit_message_text(get_text('view_expenses_select_period', user_id=user_id), chat_id=call.message.chat.id, message_id=call.message.message_id, reply_markup=create_timeframe_keyboard(user_id=user_id, back_callback=CALLBACK_BACK_TO_FINANCES))
+        await run_blocking(ensure_user_exists, user_id, call.from_user.username)
+        await bot.edit_message_text(get_text('view_expenses_select_period', user_id=user_id), chat_id=call.message.chat.id, message_id=call.message.message_id, reply_markup=create_timeframe_keyboard(user_id=user_id, back_callback=CALLBACK_BACK_TO_FINANCES))
     
-    @bot.callback_query_handler(func=lambda call: call.data in CALLBACK_TO_PERIOD)
-    def show_data_for_period(call):
-        answer_callback(bot, call)
+    @callback_router.exact(*CALLBACK_TO_PERIOD)
+    async def show_data_for_period(call):
+        await answer_callback(bot, call)
         period = CALLBACK_TO_PERIOD.get(call.data)
         if not period:
             return
         user_id = call.from_user.id
-        ensure_user_exists(user_id, call.from_user.username)
+        await run_blocking(ensure_user_exists, user_id, call.from_user.username)
         message_text = call.message.text
         
         # Визначаємо тип перегляду: доходи, витрати чи загальні фінанси
         if 'загальн' in message_text.lower() or 'general' in message_text.lower():
             # Загальні фінанси
-            incomes_data = get_incomes_aggregated(user_id, period)
-            expenses_data = get_expenses_aggregated(user_id, period)
+            incomes_data = await run_blocking(get_incomes_aggregated, user_id, period, include_transactions=False)
+            expenses_data = await run_blocking(get_expenses_aggregated, user_id, period, include_transactions=False)
             
             # Якщо немає жодних даних
-            if (not incomes_data or not incomes_data.get('incomes')) and \
-               (not expenses_data or not expenses_data.get('expenses')):
-                bot.edit_message_text(
+            if (not incomes_data or not incomes_data.get('count')) and \
+               (not expenses_data or not expenses_data.get('count')):
+                await bot.edit_message_text(
                     get_text('view_general_no_data', user_id=user_id),
                     chat_id=call.message.chat.id,
                     message_id=call.message.message_id,
@@ -68,12 +117,13 @@ def register_handlers(bot):
             period_name = get_text(f'period_{period}', user_id=user_id)
             msg = format_general_finances(incomes_data, expenses_data, period_name, user_id=user_id)
             back_callback = CALLBACK_BACK_TO_VIEW_GENERAL
+            transactions_callback = None
             
         elif 'дох' in message_text.lower() or 'income' in message_text.lower():
             # Доходи
-            data = get_incomes_aggregated(user_id, period)
-            if not data or not data.get('incomes'):
-                bot.edit_message_text(
+            data = await run_blocking(get_incomes_aggregated, user_id, period, include_transactions=False)
+            if not data or not data.get('count'):
+                await bot.edit_message_text(
                     get_text('view_incomes_no_data', user_id=user_id),
                     chat_id=call.message.chat.id,
                     message_id=call.message.message_id,
@@ -83,12 +133,13 @@ def register_handlers(bot):
             period_name = get_text(f'period_{period}', user_id=user_id)
             msg = format_income_list(data, period_name, user_id=user_id)
             back_callback = CALLBACK_BACK_TO_VIEW_INCOMES
+            transactions_callback = _page_callback('income', period)
             
         else:
             # Витрати
-            data = get_expenses_aggregated(user_id, period)
-            if not data or not data.get('expenses'):
-                bot.edit_message_text(
+            data = await run_blocking(get_expenses_aggregated, user_id, period, include_transactions=False)
+            if not data or not data.get('count'):
+                await bot.edit_message_text(
                     get_text('view_expenses_no_data', user_id=user_id),
                     chat_id=call.message.chat.id,
                     message_id=call.message.message_id,
@@ -98,19 +149,63 @@ def register_handlers(bot):
             period_name = get_text(f'period_{period}', user_id=user_id)
             msg = format_expense_list(data, period_name, user_id=user_id)
             back_callback = CALLBACK_BACK_TO_VIEW_EXPENSES
+            transactions_callback = _page_callback('expense', period)
             
-        bot.edit_message_text(
+        await bot.edit_message_text(
             msg,
             chat_id=call.message.chat.id,
             message_id=call.message.message_id,
-            reply_markup=create_period_with_back_keyboard(user_id=user_id, back_callback=back_callback)
+            reply_markup=create_period_with_back_keyboard(
+                user_id=user_id,
+                back_callback=back_callback,
+                transactions_callback=transactions_callback
+            )
+        )
+    
+    @callback_router.prefix(CALLBACK_TRANSACTIONS_PAGE_PREFIX)
+    async def show_transactions_page(call):
+        """Сторінка транзакцій за період з кнопками 'Новіші' / 'Старіші'."""
+        await answer_callback(bot, call)
+        parsed = _parse_page_callback(call.data)
+        if not parsed:
+            return
+        transaction_type, period, backward, cursor = parsed
+        user_id = call.from_user.id
+        await run_blocking(ensure_user_exists, user_id, call.from_user.username)
+        
+        get_page = get_incomes_page if transaction_type == 'income' else get_expenses_page
+        start, end = get_date_range_for_period(period)
+        transactions, has_more = await run_blocking(get_page, user_id, start, end, cursor, backward)
+        if not transactions and cursor is not None:
+            # Сусідні транзакції могли видалити - починаємо з першої сторінки
+            transactions, has_more = await run_blocking(get_page, user_id, start, end)
+            backward, cursor = False, None
+        
+        # В напрямку читання є ще сторінки, якщо has_more; в зворотному - якщо ми прийшли з іншої сторінки
+        has_newer = has_more if backward else cursor is not None
+        has_older = cursor is not None if backward else has_more
+        
+        category_names = await run_blocking(CategoryRepository.get_category_names, (t.category_id for t in transactions))
+        period_name = get_text(f'period_{period}', user_id=user_id)
+        back_callback = CALLBACK_BACK_TO_VIEW_INCOMES if transaction_type == 'income' else CALLBACK_BACK_TO_VIEW_EXPENSES
+        
+        await bot.edit_message_text(
+            format_transactions_page(transactions, category_names, transaction_type, period_name, user_id=user_id),
+            chat_id=call.message.chat.id,
+            message_id=call.message.message_id,
+            reply_markup=create_transactions_page_keyboard(
+                user_id=user_id,
+                newer_callback=_page_callback(transaction_type, period, _PAGE_NEWER, transactions[0]) if has_newer and transactions else None,
+                older_callback=_page_callback(transaction_type, period, _PAGE_OLDER, transactions[-1]) if has_older and transactions else None,
+                back_callback=back_callback
+            )
         )
     
-    @bot.callback_query_handler(func=lambda call: call.data == CALLBACK_ANOTHER_PERIOD)
-    def another_period(call):
-        answer_callback(bot, call)
+    @callback_router.exact(CALLBACK_ANOTHER_PERIOD)
+    async def another_period(call):
+        await answer_callback(bot, call)
         user_id = call.from_user.id
-        ensure_user_exists(user_id, call.from_user.username)
+        await run_blocking(ensure_user_exists, user_id, call.from_user.username)
         message_text = call.message.text
         
         if 'загальн' in message_text.lower() or 'general' in message_text.lower():
@@ -123,57 +218,57 @@ def register_handlers(bot):
             text = get_text('view_expenses_select_another', user_id=user_id)
             back_callback = CALLBACK_BACK_TO_FINANCES
         
-        bot.edit_message_text(
+        await bot.edit_message_text(
             text,
             chat_id=call.message.chat.id,
             message_id=call.message.message_id,
             reply_markup=create_timeframe_keyboard(user_id=user_id, back_callback=back_callback)
         )
     
-    @bot.callback_query_handler(func=lambda call: call.data == CALLBACK_BACK_TO_FINANCES)
-    def back_to_finances(call):
+    @callback_router.exact(CALLBACK_BACK_TO_FINANCES)
+    async def back_to_finances(call):
         """Повернення до меню фінансів."""
-        answer_callback(bot, call)
+        await answer_callback(bot, call)
         user_id = call.from_user.id
-        ensure_user_exists(user_id, call.from_user.username)
-        bot.edit_message_text(get_text('finance_menu_info', user_id=user_id), chat_id=call.message.chat.id, message_id=call.message.message_id, reply_markup=finance_submenu(user_id=user_id))
+        await run_blocking(ensure_user_exists, user_id, call.from_user.username)
+        await bot.edit_message_text(get_text('finance_menu_info', user_id=user_id), chat_id=call.message.chat.id, message_id=call.message.message_id, reply_markup=finance_submenu(user_id=user_id))
     
-    @bot.callback_query_handler(func=lambda call: call.data == CALLBACK_BACK_TO_VIEW_EXPENSES)
-    def back_to_view_expenses(call):
+    @callback_router.exact(CALLBACK_BACK_TO_VIEW_EXPENSES)
+    async def back_to_view_expenses(call):
         """Повернення до вибору періоду витрат."""
-        answer_callback(bot, call)
+        await answer_callback(bot, call)
         user_id = call.from_user.id
-        ensure_user_exists(user_id, call.from_user.username)
-        bot.edit_message_text(get_text('view_expenses_select_period', user_id=user_id), chat_id=call.message.chat.id, message_id=call.message.message_id, reply_markup=create_timeframe_keyboard(user_id=user_id, back_callback=CALLBACK_BACK_TO_FINANCES))
+        await run_blocking(ensure_user_exists, user_id, call.from_user.username)
+        await bot.edit_message_text(get_text('view_expenses_select_period', user_id=user_id), chat_id=call.message.chat.id, message_id=call.message.message_id, reply_markup=create_timeframe_keyboard(user_id=user_id, back_callback=CALLBACK_BACK_TO_FINANCES))
     
-    @bot.callback_query_handler(func=lambda call: call.data == CALLBACK_BACK_TO_VIEW_INCOMES)
-    def back_to_view_incomes(call):
+    @callback_router.exact(CALLBACK_BACK_TO_VIEW_INCOMES)
+    async def back_to_view_incomes(call):
         """Повернення до вибору періоду доходів."""
-        answer_callback(bot, call)
+        await answer_callback(bot, call)
         user_id = call.from_user.id
-        ensure_user_exists(user_id, call.from_user.username)
-        bot.edit_message_text(get_text('view_incomes_select_period', user_id=user_id), chat_id=call.message.chat.id, message_id=call.message.message_id, reply_markup=create_timeframe_keyboard(user_id=user_id, back_callback=CALLBACK_BACK_TO_FINANCES))
+        await run_blocking(ensure_user_exists, user_id, call.from_user.username)
+        await bot.edit_message_text(get_text('view_incomes_select_period', user_id=user_id), chat_id=call.message.chat.id, message_id=call.message.message_id, reply_markup=create_timeframe_keyboard(user_id=user_id, back_callback=CALLBACK_BACK_TO_FINANCES))
     
-    @bot.callback_query_handler(func=lambda call: call.data == CALLBACK_VIEW_GENERAL)
-    def view_general_finances(call):
+    @callback_router.exact(CALLBACK_VIEW_GENERAL)
+    async def view_general_finances(call):
         """Початок перегляду загальних фінансів."""
-        answer_callback(bot, call)
+        await answer_callback(bot, call)
         user_id = call.from_user.id
-        ensure_user_exists(user_id, call.from_user.username)
-        bot.edit_message_text(
+        await run_blocking(ensure_user_exists, user_id, call.from_user.username)
+        await bot.edit_message_text(
             get_text('view_general_select_period', user_id=user_id),
             chat_id=call.message.chat.id,
             message_id=call.message.message_id,
             reply_markup=create_timeframe_keyboard(user_id=user_id, back_callback=CALLBACK_BACK_TO_FINANCES)
         )
     
-    @bot.callback_query_handler(func=lambda call: call.data == CALLBACK_BACK_TO_VIEW_GENERAL)
-    def back_to_view_general(call):
+    @callback_router.exact(CALLBACK_BACK_TO_VIEW_GENERAL)
+    async def back_to_view_general(call):
         """Повернення до вибору періоду загальних фінансів."""
-        answer_callback(bot, call)
+        await answer_callback(bot, call)
         user_id = call.from_user.id
-        ensure_user_exists(user_id, call.from_user.username)
-        bot.edit_message_text(
+        await run_blocking(ensure_user_exists, user_id, call.from_user.username)
+        await bot.edit_message_text(
             get_text('view_general_select_period', user_id=user_id),
             chat_id=call.message.chat.id,
             message_id=call.message.message_id,
@@ -4,7 +4,7 @@ Handler для обробки доходів користувача.
 Використовує inline-клавіатури, моделі та локалізацію.
 """
 
-from telebot.apihelper import ApiTelegramException
+from utils.handler_runtime import run_blocking
 from utils import send_main_menu, answer_callback, validate_amount
 from database import add_income, ensure_user_exists, CategoryRepository, get_user
 from locales import get_text, get_current_language, translate_category_name
@@ -16,51 +16,55 @@ from config.callbacks import (
     CALLBACK_BACK_TO_ADD_INCOME,
     CALLBACK_SKIP_DESCRIPTION,
     CALLBACK_INCOME_CURRENCY_PREFIX,
+    CALLBACK_INCOME_CATEGORY_PREFIX,
 )
+from utils.callback_router import callback_router
+from utils.state_store import create_state_store
 
-user_states = {}
-user_message_history = {}
+# Стан діалогу додавання та message_id повідомлень діалогу (utils/state_store.py)
+user_states = create_state_store('income_states')
+user_message_history = create_state_store('income_message_history')
 
 
 def register_handlers(bot):
     """Реєструє обробники повідомлень для доходів."""
     
-    @bot.callback_query_handler(func=lambda call: call.data == CALLBACK_ADD_INCOME)
-    def income_start(call):
+    @callback_router.exact(CALLBACK_ADD_INCOME)
+    async def income_start(call):
         """Початок процесу додавання доходу."""
-        answer_callback(bot, call)
+        await answer_callback(bot, call)
         
         user_id = call.from_user.id
-        ensure_user_exists(user_id, call.from_user.username)
+        await run_blocking(ensure_user_exists, user_id, call.from_user.username)
         
-        if user_id not in user_message_history:
-            user_message_history[user_id] = []
+        history = user_message_history.get(user_id, [])
         
-        keyboard = create_income_types_keyboard(user_id=user_id, back_callback=CALLBACK_BACK_TO_MAIN)
-        bot.edit_message_text(
+        keyboard = await run_blocking(create_income_types_keyboard, user_id=user_id, back_callback=CALLBACK_BACK_TO_MAIN)
+        await bot.edit_message_text(
             get_text('income_select_type', user_id=user_id),
             chat_id=call.message.chat.id,
             message_id=call.message.message_id,
             reply_markup=keyboard
         )
-        user_message_history[user_id].append(call.message.message_id)
+        history.append(call.message.message_id)
+        user_message_history[user_id] = history
     
-    @bot.callback_query_handler(func=lambda call: call.data.startswith('income_cat_'))
-    def income_type_selected(call):
+    @callback_router.prefix(CALLBACK_INCOME_CATEGORY_PREFIX)
+    async def income_type_selected(call):
         """Обробка вибору типу доходу."""
-        answer_callback(bot, call)
+        await answer_callback(bot, call)
         
         user_id = call.from_user.id
-        ensure_user_exists(user_id, call.from_user.username)
+        await run_blocking(ensure_user_exists, user_id, call.from_user.username)
         
         # Отримуємо category_id з callback (тепер це UUID - текст)
         category_id = call.data.replace('income_cat_', '')
         
         # Отримуємо категорію з бази
-        category = CategoryRepository.get_category_by_id(category_id)
+        category = await run_blocking(CategoryRepository.get_category_by_id, category_id)
         
         if not category:
-            send_main_menu(bot, call.message.chat.id, 'error', call.message.message_id)
+            await send_main_menu(bot, call.message.chat.id, 'error', call.message.message_id)
             return
         
         user_states[user_id] = {
@@ -70,7 +74,7 @@ def register_handlers(bot):
         }
         
         translated_category_name = translate_category_name(category.name, user_id=user_id)
-        bot.edit_message_text(
+        await bot.edit_message_text(
             get_text('income_enter_amount', user_id=user_id).format(translated_category_name),
             chat_id=call.message.chat.id,
             message_id=call.message.message_id,
@@ -78,17 +82,17 @@ def register_handlers(bot):
         )
     
     @bot.message_handler(func=lambda message: user_states.get(message.from_user.id, {}).get('action') == 'waiting_income_amount')
-    def process_income_amount(message):
+    async def process_income_amount(message):
         """Обробка введеної суми доходу."""
         user_id = message.from_user.id
-        ensure_user_exists(user_id, message.from_user.username)
+        await run_blocking(ensure_user_exists, user_id, message.from_user.username)
         
         text = message.text.strip()
         state = user_states.get(user_id, {})
         category_id = state.get('income_category_id')
         
         if not category_id:
-            send_main_menu(bot, message.chat.id, 'error', user_id=user_id)
+            await send_main_menu(bot, message.chat.id, 'error', user_id=user_id)
             user_states.pop(user_id, None)
             return
         
@@ -97,27 +101,27 @@ def register_handlers(bot):
         if is_valid:
             # Зберігаємо суму і переходимо до запиту опису
             try:
-                bot.delete_message(message.chat.id, message.message_id)
+                await bot.delete_message(message.chat.id, message.message_id)
             except Exception:
                 pass
             
             error_msg_id = state.get('error_message_id')
             if error_msg_id:
                 try:
-                    bot.delete_message(message.chat.id, error_msg_id)
+                    await bot.delete_message(message.chat.id, error_msg_id)
                 except Exception:
                     pass
             
-            user_states[user_id]['action'] = 'waiting_income_currency'
-            user_states[user_id]['income_amount'] = amount
+            state['action'] = 'waiting_income_currency'
+            state['income_amount'] = amount
             
             # Show currency selection keyboard
-            keyboard = create_transaction_currency_keyboard(user_id, transaction_type='income', back_callback=CALLBACK_BACK_TO_ADD_INCOME)
+            keyboard = await run_blocking(create_transaction_currency_keyboard, user_id, transaction_type='income', back_callback=CALLBACK_BACK_TO_ADD_INCOME)
             
             prompt_msg_id = state.get('message_id')
             if prompt_msg_id:
                 try:
-                    bot.edit_message_text(
+                    await bot.edit_message_text(
                         get_text('select_transaction_currency', user_id=user_id),
                         chat_id=message.chat.id,
                         message_id=prompt_msg_id,
@@ -125,46 +129,48 @@ def register_handlers(bot):
                     )
                 except Exception:
                     # Якщо не вдалося редагувати, створюємо нове повідомлення
-                    msg = bot.send_message(
+                    msg = await bot.send_message(
                         message.chat.id,
                         get_text('select_transaction_currency', user_id=user_id),
                         reply_markup=keyboard
                     )
-                    user_states[user_id]['message_id'] = msg.message_id
+                    state['message_id'] = msg.message_id
             else:
-                msg = bot.send_message(
+                msg = await bot.send_message(
                     message.chat.id,
                     get_text('select_transaction_currency', user_id=user_id),
                     reply_markup=keyboard
                 )
-                user_states[user_id]['message_id'] = msg.message_id
+                state['message_id'] = msg.message_id
+            user_states[user_id] = state
         else:
             try:
-                bot.delete_message(message.chat.id, message.message_id)
+                await bot.delete_message(message.chat.id, message.message_id)
             except Exception:
                 pass
             
             error_msg_id = state.get('error_message_id')
             if error_msg_id:
                 try:
-                    bot.delete_message(message.chat.id, error_msg_id)
+                    await bot.delete_message(message.chat.id, error_msg_id)
                 except Exception:
                     pass
             
-            error_msg = bot.send_message(
+            error_msg = await bot.send_message(
                 message.chat.id,
                 get_text('income_invalid_amount', user_id=user_id),
                 reply_markup=back_button(user_id=user_id, back_callback=CALLBACK_BACK_TO_ADD_INCOME)
             )
-            user_states[user_id]['error_message_id'] = error_msg.message_id
+            state['error_message_id'] = error_msg.message_id
+            user_states[user_id] = state
     
-    @bot.callback_query_handler(func=lambda call: call.data.startswith(CALLBACK_INCOME_CURRENCY_PREFIX))
-    def process_income_currency_selection(call):
+    @callback_router.prefix(CALLBACK_INCOME_CURRENCY_PREFIX)
+    async def process_income_currency_selection(call):
         """Обробка вибору валюти для доходу."""
-        answer_callback(bot, call)
+        await answer_callback(bot, call)
         
         user_id = call.from_user.id
-        ensure_user_exists(user_id, call.from_user.username)
+        await run_blocking(ensure_user_exists, user_id, call.from_user.username)
         
         state = user_states.get(user_id, {})
         if state.get('action') != 'waiting_income_currency':
@@ -174,6 +180,7 @@ def register_handlers(bot):
         currency = call.data.replace(CALLBACK_INCOME_CURRENCY_PREFIX, '').upper()
         state['income_currency'] = currency
         state['action'] = 'waiting_income_description'
+        user_states[user_id] = state
         
         # Створюємо клавіатуру з кнопкою "Пропустити"
         from telebot import types
@@ -184,7 +191,7 @@ def register_handlers(bot):
         ))
         
         # Show conversion info if currency differs from default
-        user = get_user(user_id)
+        user = await run_blocking(get_user, user_id)
         amount = state.get('income_amount')
         conversion_text = ""
         
@@ -199,7 +206,7 @@ def register_handlers(bot):
                 )
         
         try:
-            bot.edit_message_text(
+            await bot.edit_message_text(
                 get_text('income_enter_description', user_id=user_id) + conversion_text,
                 chat_id=call.message.chat.id,
                 message_id=call.message.message_id,
@@ -209,10 +216,10 @@ def register_handlers(bot):
             pass
     
     @bot.message_handler(func=lambda message: user_states.get(message.from_user.id, {}).get('action') == 'waiting_income_description')
-    def process_income_description(message):
+    async def process_income_description(message):
         """Обробка введеного опису доходу."""
         user_id = message.from_user.id
-        ensure_user_exists(user_id, message.from_user.username)
+        await run_blocking(ensure_user_exists, user_id, message.from_user.username)
         
         state = user_states.get(user_id, {})
         category_id = state.get('income_category_id')
@@ -220,32 +227,32 @@ def register_handlers(bot):
         currency = state.get('income_currency', 'UAH')
         
         if not category_id or not amount:
-            send_main_menu(bot, message.chat.id, 'error', user_id=user_id)
+            await send_main_menu(bot, message.chat.id, 'error', user_id=user_id)
             user_states.pop(user_id, None)
             return
         
         description = message.text.strip() if message.text else None
         
         # Створюємо дохід з описом
-        income = add_income(user_id, amount, category_id, description=description, currency=currency)
+        income = await run_blocking(add_income, user_id, amount, category_id, description=description, currency=currency)
         
         # Видаляємо повідомлення
         message_ids_to_delete = user_message_history.get(user_id, [])
         for msg_id in message_ids_to_delete:
             try:
-                bot.delete_message(message.chat.id, msg_id)
+                await bot.delete_message(message.chat.id, msg_id)
             except Exception:
                 pass
         
         try:
-            bot.delete_message(message.chat.id, message.message_id)
+            await bot.delete_message(message.chat.id, message.message_id)
         except Exception:
             pass
         
         prompt_msg_id = state.get('message_id')
         if prompt_msg_id:
             try:
-                bot.delete_message(message.chat.id, prompt_msg_id)
+                await bot.delete_message(message.chat.id, prompt_msg_id)
             except Exception:
                 pass
         
@@ -253,7 +260,7 @@ def register_handlers(bot):
         user_states.pop(user_id, None)
         
         # Отримуємо категорію з бази
-        category = CategoryRepository.get_category_by_id(category_id)
+        category = await run_blocking(CategoryRepository.get_category_by_id, category_id)
         category_display = category.name if category else "Дохід"
         
         # Format amount with currency
@@ -272,15 +279,15 @@ def register_handlers(bot):
                 category_display
             )
         
-        send_main_menu(bot, message.chat.id, success_msg, user_id=user_id)
+        await send_main_menu(bot, message.chat.id, success_msg, user_id=user_id)
     
-    @bot.callback_query_handler(func=lambda call: call.data == CALLBACK_SKIP_DESCRIPTION and user_states.get(call.from_user.id, {}).get('action') == 'waiting_income_description')
-    def skip_income_description(call):
+    @callback_router.exact(CALLBACK_SKIP_DESCRIPTION, guard=lambda call: user_states.get(call.from_user.id, {}).get('action') == 'waiting_income_description')
+    async def skip_income_description(call):
         """Пропуск введення опису доходу."""
-        answer_callback(bot, call)
+        await answer_callback(bot, call)
         
         user_id = call.from_user.id
-        ensure_user_exists(user_id, call.from_user.username)
+        await run_blocking(ensure_user_exists, user_id, call.from_user.username)
         
         state = user_states.get(user_id, {})
         category_id = state.get('income_category_id')
@@ -288,23 +295,23 @@ def register_handlers(bot):
         currency = state.get('income_currency', 'UAH')
         
         if not category_id or not amount:
-            send_main_menu(bot, call.message.chat.id, 'error', call.message.message_id, user_id=user_id)
+            await send_main_menu(bot, call.message.chat.id, 'error', call.message.message_id, user_id=user_id)
             user_states.pop(user_id, None)
             return
         
         # Створюємо дохід без опису
-        income = add_income(user_id, amount, category_id, description=None, currency=currency)
+        income = await run_blocking(add_income, user_id, amount, category_id, description=None, currency=currency)
         
         # Видаляємо повідомлення
         message_ids_to_delete = user_message_history.get(user_id, [])
         for msg_id in message_ids_to_delete:
             try:
-                bot.delete_message(call.message.chat.id, msg_id)
+                await bot.delete_message(call.message.chat.id, msg_id)
             except Exception:
                 pass
         
         try:
-            bot.delete_message(call.message.chat.id, call.message.message_id)
+            await bot.delete_message(call.message.chat.id, call.message.message_id)
         except Exception:
             pass
         
@@ -312,7 +319,7 @@ def register_handlers(bot):
         user_states.pop(user_id, None)
         
         # Отримуємо категорію з бази
-        category = CategoryRepository.get_category_by_id(category_id)
+        category = await run_blocking(CategoryRepository.get_category_by_id, category_id)
         category_display = category.name if category else "Дохід"
         
         # Format amount with currency
@@ -322,19 +329,19 @@ def register_handlers(bot):
             amount_text,
             category_display
         )
-        send_main_menu(bot, call.message.chat.id, success_msg, user_id=user_id)
+        await send_main_menu(bot, call.message.chat.id, success_msg, user_id=user_id)
     
-    @bot.callback_query_handler(func=lambda call: call.data == CALLBACK_BACK_TO_ADD_INCOME)
-    def back_to_add_income(call):
+    @callback_router.exact(CALLBACK_BACK_TO_ADD_INCOME)
+    async def back_to_add_income(call):
         """Повернення до вибору типу доходу."""
-        answer_callback(bot, call)
+        await answer_callback(bot, call)
         user_id = call.from_user.id
-        ensure_user_exists(user_id, call.from_user.username)
+        await run_blocking(ensure_user_exists, user_id, call.from_user.username)
         
         user_states.pop(user_id, None)
         
-        keyboard = create_income_types_keyboard(user_id=user_id, back_callback=CALLBACK_BACK_TO_MAIN)
-        bot.edit_message_text(
+        keyboard = await run_blocking(create_income_types_keyboard, user_id=user_id, back_callback=CALLBACK_BACK_TO_MAIN)
+        await bot.edit_message_text(
             get_text('income_select_type', user_id=user_id),
             chat_id=call.message.chat.id,
             message_id=call.message.message_id,
@@ -6,32 +6,34 @@ Handler для кнопки "Назад" та інших службових call
 from utils import send_main_menu, answer_callback
 from locales import get_text
 from config.callbacks import CALLBACK_BACK_TO_MAIN, CALLBACK_REPORT
+from utils.callback_router import callback_router
 from database import ensure_user_exists
 from keyboards.main_keyboards import create_report_menu
+from utils.handler_runtime import run_blocking
 
 
 def register_handlers(bot):
     """Реєструє обробники для службових callback'ів."""
     
-    @bot.callback_query_handler(func=lambda call: call.data == CALLBACK_BACK_TO_MAIN)
-    def handle_back_to_main(call):
+    @callback_router.exact(CALLBACK_BACK_TO_MAIN)
+    async def handle_back_to_main(call):
         """Обробка натискання кнопки 'Назад до головного меню'."""
-        answer_callback(bot, call)
+        await answer_callback(bot, call)
         
         user_id = call.from_user.id
         username = call.from_user.username
-        ensure_user_exists(user_id, username)
+        await run_blocking(ensure_user_exists, user_id, username)
         
         # Видаляємо HTML звіт якщо він існує
         from handlers.report import html_report_messages
-        if user_id in html_report_messages:
+        report_message_id = html_report_messages.pop(user_id, None)
+        if report_message_id is not None:
             try:
-                bot.delete_message(call.message.chat.id, html_report_messages[user_id])
-                del html_report_messages[user_id]
+                await bot.delete_message(call.message.chat.id, report_message_id)
             except Exception as e:
                 print(f"[DEBUG] Could not delete HTML report on back to main: {e}")
         
-        send_main_menu(
+        await send_main_menu(
             bot,
             call.message.chat.id,
             text_or_key='main_menu_info',
@@ -39,16 +41,16 @@ def register_handlers(bot):
             user_id=user_id
         )
     
-    @bot.callback_query_handler(func=lambda call: call.data == CALLBACK_REPORT)
-    def handle_report(call):
+    @callback_router.exact(CALLBACK_REPORT)
+    async def handle_report(call):
         """Обробка натискання кнопки 'Звіт / Аналіз бюджету'."""
         user_id = call.from_user.id
-        ensure_user_exists(user_id, call.from_user.username)
+        await run_blocking(ensure_user_exists, user_id, call.from_user.username)
         
         text = get_text('report_menu', user_id=user_id)
         markup = create_report_menu(user_id)
-        answer_callback(bot, call)
-        bot.edit_message_text(
+        await answer_callback(bot, call)
+        await bot.edit_message_text(
             text,
             chat_id=call.message.chat.id,
             message_id=call.message.message_id,
@@ -4,44 +4,52 @@
 Підтримує детальні та швидкі звіти за різні періоди.
 """
 
-import os
-from telebot import TeleBot, types
+from telebot import types
 from locales import get_text, get_current_language
 from keyboards.main_keyboards import (
     create_report_menu,
     back_button
 )
 from database import generate_user_report
-from utils import format_detailed_report, format_compact_report, generate_html_report
+from utils import format_detailed_report, format_compact_report, render_html_report
 from config.callbacks import (
     CALLBACK_REPORT_DETAILED,
     CALLBACK_REPORT_QUICK,
     CALLBACK_BACK_TO_REPORT_MENU,
     CALLBACK_BACK_TO_MAIN,
+    CALLBACK_REPORT,
+    CALLBACK_DETAILED_REPORT_PREFIX,
+    CALLBACK_HTML_REPORT_PREFIX,
 )
+from utils.callback_router import callback_router
 from utils.message_helpers import answer_callback
+from utils.report_jobs import submit_report_job, JOB_IN_PROGRESS, JOB_QUEUE_FULL
+from utils.handler_runtime import run_blocking
+from utils.state_store import MemoryStateStore
+from config.constants import HTML_REPORT_MESSAGE_TTL
 
-# Словник для збереження message_id файлів HTML звітів {user_id: message_id}
-html_report_messages = {}
+# message_id файлів HTML звітів {user_id: message_id} (utils/state_store.py).
+# Лише в пам'яті: при старті clear_chat_history видаляє ці повідомлення, тож збережені ID застаріли б
+html_report_messages = MemoryStateStore('html_report_messages', ttl=HTML_REPORT_MESSAGE_TTL)
 
 
-def report_menu(call: types.CallbackQuery, bot: TeleBot):
+async def report_menu(call: types.CallbackQuery, bot):
     """Показує меню вибору періоду для звіту."""
     user_id = call.from_user.id
     
     # Видаляємо попереднє повідомлення з HTML файлом, якщо воно існує
-    if user_id in html_report_messages:
+    report_message_id = html_report_messages.pop(user_id, None)
+    if report_message_id is not None:
         try:
-            bot.delete_message(call.message.chat.id, html_report_messages[user_id])
-            del html_report_messages[user_id]
+            await bot.delete_message(call.message.chat.id, report_message_id)
         except Exception as e:
             print(f"[DEBUG] Could not delete HTML report in menu: {e}")
     
     text = get_text('report_select_period', user_id=user_id)
     markup = create_report_menu(user_id)
     
-    answer_callback(bot, call)
-    bot.edit_message_text(
+    await answer_callback(bot, call)
+    await bot.edit_message_text(
         text,
         chat_id=call.message.chat.id,
         message_id=call.message.message_id,
@@ -49,18 +57,18 @@ def report_menu(call: types.CallbackQuery, bot: TeleBot):
     )
 
 
-def show_detailed_report(call: types.CallbackQuery, bot: TeleBot, period: str):
+async def show_detailed_report(call: types.CallbackQuery, bot, period: str):
     """Генерує та показує детальний звіт за вказаний період."""
     user_id = call.from_user.id
     
-    # Генеруємо звіт з порівнянням
-    report_data = generate_user_report(user_id, period, include_comparison=True)
+    # Генеруємо звіт з порівнянням (для тексту достатньо сум з БД, без списку транзакцій)
+    report_data = await run_blocking(generate_user_report, user_id, period, include_comparison=True, include_transactions=False)
     
     if report_data is None:
         text = get_text('report_no_data', user_id=user_id)
         markup = back_button(user_id, back_callback=CALLBACK_BACK_TO_REPORT_MENU)
-        answer_callback(bot, call)
-        bot.edit_message_text(
+        await answer_callback(bot, call)
+        await bot.edit_message_text(
             text,
             chat_id=call.message.chat.id,
             message_id=call.message.message_id,
@@ -90,8 +98,8 @@ def show_detailed_report(call: types.CallbackQuery, bot: TeleBot, period: str):
         )
     )
     
-    answer_callback(bot, call)
-    bot.edit_message_text(
+    await answer_callback(bot, call)
+    await bot.edit_message_text(
         text,
         chat_id=call.message.chat.id,
         message_id=call.message.message_id,
@@ -100,41 +108,39 @@ def show_detailed_report(call: types.CallbackQuery, bot: TeleBot, period: str):
     )
 
 
-def show_quick_report(call: types.CallbackQuery, bot: TeleBot, period: str):
+def show_quick_report(call: types.CallbackQuery, bot, period: str):
     """Генерує та показує швидкий звіт за вказаний період (не використовується)."""
     # Функція залишена для зворотної сумісності з HTML генератором
     pass
 
 
-def back_to_report_menu(call: types.CallbackQuery, bot: TeleBot):
+async def back_to_report_menu(call: types.CallbackQuery, bot):
     """Повертає до вибору періоду звіту."""
     user_id = call.from_user.id
     
     # Видаляємо попереднє повідомлення з HTML файлом, якщо воно існує
-    if user_id in html_report_messages:
+    report_message_id = html_report_messages.pop(user_id, None)
+    if report_message_id is not None:
         try:
-            bot.delete_message(call.message.chat.id, html_report_messages[user_id])
-            del html_report_messages[user_id]
+            await bot.delete_message(call.message.chat.id, report_message_id)
         except Exception as e:
             print(f"[DEBUG] Could not delete HTML report message on back: {e}")
     
-    report_menu(call, bot)
+    await report_menu(call, bot)
 
 
-def handle_report_period_callback(call: types.CallbackQuery, bot: TeleBot):
+async def handle_report_period_callback(call: types.CallbackQuery, bot):
     """Обробляє вибір періоду для звіту."""
     callback_data = call.data
     
     # Визначаємо період (завжди детальний звіт)
     if callback_data.startswith('detailed_'):
         period = callback_data.replace('detailed_', '')
-        show_detailed_report(call, bot, period)
+        await show_detailed_report(call, bot, period)
 
 
-def generate_and_send_html_report(call: types.CallbackQuery, bot: TeleBot):
-    """Генерує HTML звіт та відправляє користувачу."""
-    from database import save_bot_message, delete_bot_message
-    
+async def generate_and_send_html_report(call: types.CallbackQuery, bot):
+    """Ставить генерацію HTML звіту в чергу (звіт буде відправлено фоновою задачею)."""
     user_id = call.from_user.id
     callback_data = call.data
     
@@ -148,35 +154,57 @@ def generate_and_send_html_report(call: types.CallbackQuery, bot: TeleBot):
     else:
         return
     
-    answer_callback(bot, call)
+    result = submit_report_job(
+        user_id, _build_and_send_html_report, bot, call.message.chat.id, user_id, period, include_comparison
+    )
+    
+    if result == JOB_IN_PROGRESS:
+        await answer_callback(bot, call, get_text('html_report_in_progress', user_id=user_id))
+    elif result == JOB_QUEUE_FULL:
+        await answer_callback(bot, call, get_text('html_report_queue_full', user_id=user_id), show_alert=True)
+    else:
+        await answer_callback(bot, call)
+
+
+async def _update_status(bot, chat_id: int, message_id: int, text: str):
+    """Оновити текст статусного повідомлення (помилки ігноруються)."""
+    try:
+        await bot.edit_message_text(text, chat_id=chat_id, message_id=message_id)
+    except Exception as e:
+        print(f"[DEBUG] Could not update HTML report status: {e}")
+
+
+async def _build_and_send_html_report(bot, chat_id: int, user_id: int, period: str, include_comparison: bool):
+    """Генерує HTML звіт та відправляє користувачу (фонова задача utils.report_jobs)."""
+    from database import save_bot_message, delete_bot_message
     
     # Видаляємо попереднє повідомлення з файлом, якщо воно існує
-    if user_id in html_report_messages:
+    report_message_id = html_report_messages.pop(user_id, None)
+    if report_message_id is not None:
         try:
-            bot.delete_message(call.message.chat.id, html_report_messages[user_id])
+            await bot.delete_message(chat_id, report_message_id)
             # Видаляємо його також з бази даних
-            delete_bot_message(user_id, html_report_messages[user_id])
-            del html_report_messages[user_id]
+            await run_blocking(delete_bot_message, user_id, report_message_id)
         except Exception as e:
             print(f"[DEBUG] Could not delete previous HTML report message: {e}")
     
     # Показуємо повідомлення про генерацію
-    status_msg = bot.send_message(
-        call.message.chat.id,
+    status_msg = await bot.send_message(
+        chat_id,
         get_text('generating_html_report', user_id=user_id)
     )
     
     # Зберігаємо message_id статусного повідомлення в БД
-    save_bot_message(user_id, status_msg.message_id)
+    await run_blocking(save_bot_message, user_id, status_msg.message_id)
     
     try:
         # Генеруємо дані звіту
-        report_data = generate_user_report(user_id, period, include_comparison=include_comparison)
+        report_data = await run_blocking(generate_user_report, user_id, period, include_comparison=include_comparison)
         
         if report_data is None:
-            bot.edit_message_text(
+            await bot.edit_message_text(
                 get_text('report_no_data', user_id=user_id),
-                chat_id=call.message.chat.id,
+                chat_id=chat_id,
                 message_id=status_msg.message_id
             )
             return
@@ -184,66 +212,62 @@ def generate_and_send_html_report(call: types.CallbackQuery, bot: TeleBot):
         # Отримуємо мову користувача
         lang = get_current_language(user_id)
         
-        # Генеруємо HTML файл
-        html_filepath = generate_html_report(report_data, user_id, lang)
+        # Генеруємо HTML в пам'яті
+        await _update_status(bot, chat_id, status_msg.message_id, get_text('html_report_stage_rendering', user_id=user_id))
+        html_buffer = await run_blocking(render_html_report, report_data, user_id, lang)
+        extension = html_buffer.name[html_buffer.name.index('.'):]  # .html або .html.gz
+        
+        # Відправляємо HTML файл прямо з буфера
+        await _update_status(bot, chat_id, status_msg.message_id, get_text('html_report_stage_uploading', user_id=user_id))
+        sent_msg = await bot.send_document(
+            chat_id,
+            html_buffer,
+            caption=get_text('online_report_generated', user_id=user_id),
+            visible_file_name=f'budget_report_{period}{extension}'
+        )
         
         # Видаляємо статусне повідомлення
-        bot.delete_message(call.message.chat.id, status_msg.message_id)
+        await bot.delete_message(chat_id, status_msg.message_id)
         # Видаляємо його також з бази даних
-        delete_bot_message(user_id, status_msg.message_id)
-        
-        # Відправляємо HTML файл
-        with open(html_filepath, 'rb') as file:
-            sent_msg = bot.send_document(
-                call.message.chat.id,
-                file,
-                caption=get_text('online_report_generated', user_id=user_id),
-                visible_file_name=f'budget_report_{period}.html'
-            )
+        await run_blocking(delete_bot_message, user_id, status_msg.message_id)
         
         # Зберігаємо message_id відправленого файлу
         html_report_messages[user_id] = sent_msg.message_id
         
         # Зберігаємо message_id в базі даних для очищення при перезапуску
-        save_bot_message(user_id, sent_msg.message_id)
-        
-        # Видаляємо файл після відправки
-        try:
-            os.remove(html_filepath)
-        except Exception as e:
-            print(f"[DEBUG] Could not remove HTML file: {e}")
+        await run_blocking(save_bot_message, user_id, sent_msg.message_id)
         
     except Exception as e:
         print(f"[ERROR] Failed to generate HTML report: {e}")
         import traceback
         traceback.print_exc()
         
-        bot.edit_message_text(
+        await bot.edit_message_text(
             get_text('report_generation_error', user_id=user_id),
-            chat_id=call.message.chat.id,
+            chat_id=chat_id,
             message_id=status_msg.message_id
         )
 
 
-def register_handlers(bot: TeleBot):
+def register_handlers(bot):
     """Реєструє всі обробники звітів."""
     
     # Головне меню звітів (показує вибір періоду)
-    @bot.callback_query_handler(func=lambda call: call.data == 'main_report')
-    def callback_report_menu(call):
-        report_menu(call, bot)
+    @callback_router.exact(CALLBACK_REPORT)
+    async def callback_report_menu(call):
+        await report_menu(call, bot)
     
     # Генерація HTML звіту (має бути перед іншими, щоб спрацював першим)
-    @bot.callback_query_handler(func=lambda call: call.data.startswith('html_'))
-    def callback_html_report(call):
-        generate_and_send_html_report(call, bot)
+    @callback_router.prefix(CALLBACK_HTML_REPORT_PREFIX)
+    async def callback_html_report(call):
+        await generate_and_send_html_report(call, bot)
     
     # Вибір періоду для звіту (тепер тільки detailed_)
-    @bot.callback_query_handler(func=lambda call: call.data.startswith('detailed_'))
-    def callback_report_period(call):
-        handle_report_period_callback(call, bot)
+    @callback_router.prefix(CALLBACK_DETAILED_REPORT_PREFIX)
+    async def callback_report_period(call):
+        await handle_report_period_callback(call, bot)
     
     # Навігація назад (більше не потрібен, але залишаємо для сумісності)
-    @bot.callback_query_handler(func=lambda call: call.data == CALLBACK_BACK_TO_REPORT_MENU)
-    def callback_back_to_menu(call):
-        back_to_report_menu(call, bot)
+    @callback_router.exact(CALLBACK_BACK_TO_REPORT_MENU)
+    async def callback_back_to_menu(call):
+        await back_to_report_menu(call, bot)
@@ -21,48 +21,50 @@ from config.callbacks import (
     CALLBACK_BACK_TO_MAIN,
     CALLBACK_BACK_TO_SETTINGS,
 )
+from utils.callback_router import callback_router
+from utils.handler_runtime import run_blocking
 
 
 def register_handlers(bot):
     """Реєструє обробники повідомлень для налаштувань."""
     
-    @bot.callback_query_handler(func=lambda call: call.data == CALLBACK_SETTINGS)
-    def settings_menu(call):
+    @callback_router.exact(CALLBACK_SETTINGS)
+    async def settings_menu(call):
         """Меню налаштувань."""
-        answer_callback(bot, call)
+        await answer_callback(bot, call)
         
         user_id = call.from_user.id
         username = call.from_user.username
-        ensure_user_exists(user_id, username)
+        await run_blocking(ensure_user_exists, user_id, username)
         
         keyboard = create_settings_keyboard(user_id=user_id)
-        bot.edit_message_text(
+        await bot.edit_message_text(
             get_text('settings_menu', user_id=user_id),
             chat_id=call.message.chat.id,
             message_id=call.message.message_id,
             reply_markup=keyboard
         )
     
-    @bot.callback_query_handler(func=lambda call: call.data == CALLBACK_SETTINGS_LANGUAGE)
-    def change_language_menu(call):
+    @callback_router.exact(CALLBACK_SETTINGS_LANGUAGE)
+    async def change_language_menu(call):
         """Меню вибору мови."""
-        answer_callback(bot, call)
+        await answer_callback(bot, call)
         
         user_id = call.from_user.id
-        ensure_user_exists(user_id, call.from_user.username)
+        await run_blocking(ensure_user_exists, user_id, call.from_user.username)
         
         keyboard = create_language_keyboard(user_id=user_id, back_callback=CALLBACK_BACK_TO_SETTINGS)
-        bot.edit_message_text(
+        await bot.edit_message_text(
             get_text('settings_select_language', user_id=user_id),
             chat_id=call.message.chat.id,
             message_id=call.message.message_id,
             reply_markup=keyboard
         )
     
-    @bot.callback_query_handler(func=lambda call: call.data in [CALLBACK_LANGUAGE_UK, CALLBACK_LANGUAGE_EN])
-    def process_language_selection(call):
+    @callback_router.exact(CALLBACK_LANGUAGE_UK, CALLBACK_LANGUAGE_EN)
+    async def process_language_selection(call):
         """Обробка вибору мови."""
-        answer_callback(bot, call)
+        await answer_callback(bot, call)
         
         user_id = call.from_user.id
         
@@ -73,11 +75,11 @@ def register_handlers(bot):
         else:
             return
         
-        update_user_language(user_id, selected_lang)
+        await run_blocking(update_user_language, user_id, selected_lang)
         set_language(user_id, selected_lang)
         
         success_msg = get_text('settings_language_changed', user_id=user_id)
-        send_main_menu(
+        await send_main_menu(
             bot,
             call.message.chat.id,
             success_msg,
@@ -85,29 +87,29 @@ def register_handlers(bot):
             user_id=user_id
         )
     
-    @bot.callback_query_handler(func=lambda call: call.data == CALLBACK_SETTINGS_CURRENCY)
-    def change_currency_menu(call):
+    @callback_router.exact(CALLBACK_SETTINGS_CURRENCY)
+    async def change_currency_menu(call):
         """Меню вибору валюти."""
-        answer_callback(bot, call)
+        await answer_callback(bot, call)
         
         user_id = call.from_user.id
-        ensure_user_exists(user_id, call.from_user.username)
+        await run_blocking(ensure_user_exists, user_id, call.from_user.username)
         
         # Отримуємо актуальні курси валют
         rate_info = get_rate_info(user_id=user_id)
         
         keyboard = create_currency_keyboard(user_id=user_id, back_callback=CALLBACK_BACK_TO_SETTINGS)
-        bot.edit_message_text(
+        await bot.edit_message_text(
             get_text('settings_select_currency', user_id=user_id).format(rate_info),
             chat_id=call.message.chat.id,
             message_id=call.message.message_id,
             reply_markup=keyboard
         )
     
-    @bot.callback_query_handler(func=lambda call: call.data in [CALLBACK_CURRENCY_UAH, CALLBACK_CURRENCY_USD, CALLBACK_CURRENCY_EUR])
-    def process_currency_selection(call):
+    @callback_router.exact(CALLBACK_CURRENCY_UAH, CALLBACK_CURRENCY_USD, CALLBACK_CURRENCY_EUR)
+    async def process_currency_selection(call):
         """Обробка вибору валюти."""
-        answer_callback(bot, call)
+        await answer_callback(bot, call)
         
         user_id = call.from_user.id
         
@@ -120,10 +122,10 @@ def register_handlers(bot):
         else:
             return
         
-        update_user_currency(user_id, selected_currency)
+        await run_blocking(update_user_currency, user_id, selected_currency)
         
         success_msg = get_text('settings_currency_changed', user_id=user_id).format(selected_currency)
-        send_main_menu(
+        await send_main_menu(
             bot,
             call.message.chat.id,
             success_msg,
@@ -131,15 +133,15 @@ def register_handlers(bot):
             user_id=user_id
         )
     
-    @bot.callback_query_handler(func=lambda call: call.data == CALLBACK_BACK_TO_SETTINGS)
-    def back_to_settings(call):
+    @callback_router.exact(CALLBACK_BACK_TO_SETTINGS)
+    async def back_to_settings(call):
         """Повернення до меню налаштувань."""
-        answer_callback(bot, call)
+        await answer_callback(bot, call)
         user_id = call.from_user.id
-        ensure_user_exists(user_id, call.from_user.username)
+        await run_blocking(ensure_user_exists, user_id, call.from_user.username)
         
         keyboard = create_settings_keyboard(user_id=user_id, back_callback=CALLBACK_BACK_TO_MAIN)
-        bot.edit_message_text(
+        await bot.edit_message_text(
             get_text('settings_menu', user_id=user_id),
             chat_id=call.message.chat.id,
             message_id=call.message.message_id,
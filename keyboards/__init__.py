@@ -12,6 +12,7 @@ from .main_keyboards import (
     create_income_types_keyboard,
     create_expense_types_keyboard,
     create_period_with_back_keyboard,
+    create_transactions_page_keyboard,
     create_language_keyboard,
     create_settings_keyboard,
     create_currency_keyboard,
@@ -26,6 +27,7 @@ __all__ = [
     'create_income_types_keyboard',
     'create_expense_types_keyboard',
     'create_period_with_back_keyboard',
+    'create_transactions_page_keyboard',
     'create_language_keyboard',
     'create_settings_keyboard',
     'create_currency_keyboard',
@@ -273,9 +273,16 @@ def create_expense_types_keyboard(user_id=None, back_callback=CALLBACK_BACK_TO_M
     return markup
 
 
-def create_period_with_back_keyboard(user_id=None, back_callback=CALLBACK_BACK_TO_MAIN):
-    """Клавіатура періоду з кнопкою 'Інший період' та 'Назад'."""
+def create_period_with_back_keyboard(user_id=None, back_callback=CALLBACK_BACK_TO_MAIN, transactions_callback=None):
+    """Клавіатура періоду з кнопкою 'Інший період' та 'Назад' (і 'Транзакції', якщо задано transactions_callback)."""
     markup = types.InlineKeyboardMarkup(row_width=2)
+    if transactions_callback:
+        markup.add(
+            types.InlineKeyboardButton(
+                get_text('menu_view_transactions', user_id=user_id),
+                callback_data=transactions_callback
+            )
+        )
     markup.add(
         types.InlineKeyboardButton(
             get_text('menu_another_period', user_id=user_id),
@@ -303,6 +310,39 @@ def create_period_with_back_keyboard(user_id=None, back_callback=CALLBACK_BACK_T
     return markup
 
 
+def create_transactions_page_keyboard(user_id=None, newer_callback=None, older_callback=None, back_callback=CALLBACK_BACK_TO_MAIN):
+    """Клавіатура сторінки транзакцій: 'Новіші' / 'Старіші' (якщо є куди гортати) та навігація."""
+    markup = types.InlineKeyboardMarkup(row_width=2)
+    page_buttons = []
+    if newer_callback:
+        page_buttons.append(
+            types.InlineKeyboardButton(
+                get_text('menu_page_newer', user_id=user_id),
+                callback_data=newer_callback
+            )
+        )
+    if older_callback:
+        page_buttons.append(
+            types.InlineKeyboardButton(
+                get_text('menu_page_older', user_id=user_id),
+                callback_data=older_callback
+            )
+        )
+    if page_buttons:
+        markup.row(*page_buttons)
+    markup.row(
+        types.InlineKeyboardButton(
+            get_text('menu_main', user_id=user_id),
+            callback_data=CALLBACK_BACK_TO_MAIN
+        ),
+        types.InlineKeyboardButton(
+            get_text('menu_back', user_id=user_id),
+            callback_data=back_callback
+        )
+    )
+    return markup
+
+
 def create_language_keyboard(user_id=None, back_callback=CALLBACK_BACK_TO_MAIN):
     """Клавіатура вибору мови."""
     markup = types.InlineKeyboardMarkup(row_width=2)
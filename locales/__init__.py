@@ -5,6 +5,7 @@
 
 from .locale_manager import (
     get_text,
+    load_user_language,
     set_language,
     get_available_languages,
     get_income_types,
@@ -20,6 +21,7 @@ from .locale_manager import (
 
 __all__ = [
     'get_text',
+    'load_user_language',
     'set_language',
     'get_available_languages',
     'get_income_types',
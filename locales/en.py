@@ -22,6 +22,9 @@ TEXTS_EN = {
     'menu_view_incomes': '💰 View Incomes',
     'menu_view_general_finances': '📊 View General Finances',
     'menu_another_period': '📅 Another Period',
+    'menu_view_transactions': '📋 Transactions',
+    'menu_page_newer': '◀️ Newer',
+    'menu_page_older': 'Older ▶️',
     
     # Time periods
     'period_today': '📅 Today',
@@ -57,6 +60,7 @@ TEXTS_EN = {
     'view_incomes_title': "📈 Incomes for period '{}':\n\n",
     'view_incomes_total': '\n🔹 Total income: {}',
     'view_incomes_select_another': 'Select period to view incomes:',
+    'view_incomes_transactions_title': "📋 Incomes for period '{}':\n\n",
     
     # Expenses
     'expense_select_type': '💸 Adding Expense\n\n📋 Select the category your expense belongs to:\n\n💡 This will help you track where your money goes.',
@@ -75,6 +79,8 @@ TEXTS_EN = {
     'view_expenses_title': "💸 Expenses for period '{}':\n\n",
     'view_expenses_total': '\n🔹 Total expenses: {}',
     'view_expenses_select_another': 'Select period to view expenses:',
+    'view_expenses_transactions_title': "📋 Expenses for period '{}':\n\n",
+    'view_transactions_page_empty': '💡 There are no more transactions on this page.',
     
     # Finances
     'finance_select_option': 'Please select what you want to view 📊:',
@@ -99,6 +105,10 @@ TEXTS_EN = {
     'report_export': '📁 Export Data',
     'report_select_period': '📈 Budget Analysis\n\n📅 Select period for detailed report:\n\n💡 You will get:\n• Income and expenses by categories\n• Financial balance\n• Transaction statistics\n• Comparison with previous period\n• Interactive HTML report with charts',
     'generating_html_report': '⏳ Generating HTML report with charts...',
+    'html_report_stage_rendering': '⏳ Building charts and tables...',
+    'html_report_stage_uploading': '📤 Sending the report...',
+    'html_report_in_progress': '⏳ Your report is already being generated, please wait...',
+    'html_report_queue_full': '⚠️ Too many reports are being generated right now. Please try again in a minute.',
     
     'report_title': '📊 Detailed Report "{}"\n',
     'report_period': '📅 Period: {} — {}\n',
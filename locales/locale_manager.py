@@ -41,10 +41,7 @@ def get_text(key, lang=None, user_id=None):
     elif user_id:
         # Якщо мови немає в пам'яті, завантажуємо з БД
         if user_id not in USER_LANGUAGES:
-            from database import get_user_language
-            db_lang = get_user_language(user_id)
-            if db_lang:
-                USER_LANGUAGES[user_id] = db_lang
+            load_user_language(user_id)
         language = USER_LANGUAGES.get(user_id, DEFAULT_LANGUAGE)
     else:
         language = DEFAULT_LANGUAGE
@@ -53,6 +50,18 @@ def get_text(key, lang=None, user_id=None):
     return texts.get(key, key)
 
 
+def load_user_language(user_id):
+    """
+    Завантажити мову користувача з БД в пам'ять (якщо вона там є).
+    У середовищі asyncio викликається в пулі потоків до обробника,
+    щоб get_text не звертався до SQLite з циклу подій.
+    """
+    from database import get_user_language
+    db_lang = get_user_language(user_id)
+    if db_lang:
+        USER_LANGUAGES[user_id] = db_lang
+
+
 def set_language(user_id, lang):
     """Встановити мову для конкретного користувача."""
     if lang in LANGUAGES:
@@ -22,6 +22,9 @@ TEXTS_UK = {
     'menu_view_incomes': '💰 Переглянути доходи',
     'menu_view_general_finances': '📊 Переглянути загальні фінанси за період',
     'menu_another_period': '📅 Інший період',
+    'menu_view_transactions': '📋 Транзакції',
+    'menu_page_newer': '◀️ Новіші',
+    'menu_page_older': 'Старіші ▶️',
     
     # Періоди часу
     'period_today': '📅 За сьогодні',
@@ -57,6 +60,7 @@ TEXTS_UK = {
     'view_incomes_title': "📈 Доходи за період '{}':\n\n",
     'view_incomes_total': '\n🔹 Загальна сума доходів: {}',
     'view_incomes_select_another': 'Оберіть період для перегляду доходів:',
+    'view_incomes_transactions_title': "📋 Доходи за період '{}':\n\n",
     
     # Витрати
     'expense_select_type': '💸 Додавання витрати\n\n📋 Оберіть категорію, до якої відноситься ваша витрата:\n\n💡 Це допоможе вам контролювати на що йдуть гроші.',
@@ -75,6 +79,8 @@ TEXTS_UK = {
     'view_expenses_title': "💸 Витрати за період '{}':\n\n",
     'view_expenses_total': '\n🔹 Загальна сума витрат: {}',
     'view_expenses_select_another': 'Оберіть період для перегляду витрат:',
+    'view_expenses_transactions_title': "📋 Витрати за період '{}':\n\n",
+    'view_transactions_page_empty': '💡 На цій сторінці транзакцій більше немає.',
     
     # Фінанси
     'finance_select_option': 'Будь ласка, оберіть, що ви хочете переглянути 📊:',
@@ -99,6 +105,10 @@ TEXTS_UK = {
     'report_export': '📁 Експорт даних',
     'report_select_period': '📈 Аналіз бюджету\n\n📅 Оберіть період для детального звіту:\n\n💡 Ви отримаєте:\n• Доходи та витрати по категоріях\n• Фінансовий баланс\n• Статистику транзакцій\n• Порівняння з попереднім періодом\n• Інтерактивний HTML звіт з графіками',
     'generating_html_report': '⏳ Генерую HTML звіт з графіками...',
+    'html_report_stage_rendering': '⏳ Будую графіки та таблиці...',
+    'html_report_stage_uploading': '📤 Надсилаю звіт...',
+    'html_report_in_progress': '⏳ Звіт уже генерується, зачекайте...',
+    'html_report_queue_full': '⚠️ Зараз генерується забагато звітів. Спробуйте за хвилину.',
     
     'report_title': '📊 Детальний звіт "{}"\n',
     'report_period': '📅 Період: {} — {}\n',
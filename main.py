@@ -10,33 +10,43 @@ if sys.platform == 'win32':
 
 os.environ['PYTHONUNBUFFERED'] = '1'
 
-from database import init_db, get_all_user_ids, get_user_bot_messages, clear_user_bot_messages
-from bot import bot, init_bot
+from database import init_db, close_all_connections, get_all_user_ids, get_user_bot_messages, clear_user_bot_messages
+from database.report_cache import get_report_cache_stats
+from bot import bot, handler_bot, init_bot
+from config.config import (
+    BOT_MODE, WEBHOOK_URL, WEBHOOK_LISTEN, WEBHOOK_PORT, WEBHOOK_PATH, WEBHOOK_SECRET,
+    BOT_RUNTIME, ASYNC_BLOCKING_WORKERS,
+)
+from utils.currency_converter import start_rate_refresher, stop_rate_refresher, get_rate_refresh_stats
+from utils.report_jobs import shutdown_report_jobs, get_report_jobs_stats
+from utils.html_report_generator import get_report_generator
+from utils.handler_runtime import run_blocking, run_coroutine
+from utils.state_store import load_state_stores, shutdown_state_writer
 
 
-def clear_chat_history():
+async def clear_chat_history():
     """Очищує історію чату для всіх користувачів."""
     try:
         print("[*] Clearing chat history for all users...", flush=True)
-        user_ids = get_all_user_ids()
+        user_ids = await run_blocking(get_all_user_ids)
         
         for user_id in user_ids:
             try:
                 # Отримуємо всі збережені message_id для цього користувача
-                message_ids = get_user_bot_messages(user_id)
+                message_ids = await run_blocking(get_user_bot_messages, user_id)
                 
                 # Видаляємо всі повідомлення
                 deleted_count = 0
                 for msg_id in message_ids:
                     try:
-                        bot.delete_message(user_id, msg_id)
+                        await handler_bot.delete_message(user_id, msg_id)
                         deleted_count += 1
                     except Exception:
                         # Ігноруємо помилки (повідомлення вже видалено або недоступно)
                         pass
                 
                 # Очищаємо список збережених повідомлень
-                clear_user_bot_messages(user_id)
+                await run_blocking(clear_user_bot_messages, user_id)
                 
                 if deleted_count > 0:
                     print(f"[OK] Deleted {deleted_count} messages for user {user_id}", flush=True)
@@ -54,20 +64,42 @@ def main():
         print("[*] Initializing database...", flush=True)
         init_db()
         
+        if BOT_RUNTIME == 'threaded':
+            # У режимі asyncio курси оновлює задача в циклі подій (utils/async_runtime.py)
+            print("[*] Starting exchange rates refresher...", flush=True)
+            start_rate_refresher()
+        
         print("[*] Initializing bot and registering handlers...", flush=True)
         init_bot()
         
+        # Незавершені діалоги - з БД одразу, а не при першому оновленні (у asyncio - в циклі подій)
+        load_state_stores()
+        
+        # Компілюємо шаблон HTML звіту заздалегідь, щоб перший звіт не чекав
+        get_report_generator().warm_up()
+        
         # Очищаємо історію чату та відправляємо /start всім користувачам
-        clear_chat_history()
+        # (у режимі asyncio - в циклі подій, перед отриманням оновлень)
+        if BOT_RUNTIME == 'threaded':
+            run_coroutine(clear_chat_history())
         
-        print("[*] Bot is running...", flush=True)
+        print(f"[*] Bot is running ({BOT_MODE}, {BOT_RUNTIME})...", flush=True)
         print("[*] Press Ctrl+C to stop", flush=True)
         print("[*] Waiting for messages...", flush=True)
         
         import telebot
         telebot.logger.setLevel('DEBUG')
         
-        bot.infinity_polling(timeout=10, long_polling_timeout=5)
+        if BOT_RUNTIME == 'asyncio':
+            from utils.async_runtime import run_async
+            run_async(bot, ASYNC_BLOCKING_WORKERS, on_startup=clear_chat_history)
+        elif BOT_MODE == 'webhook':
+            from utils.webhook import run_webhook
+            run_webhook(bot, WEBHOOK_LISTEN, WEBHOOK_PORT, WEBHOOK_PATH, WEBHOOK_URL, WEBHOOK_SECRET)
+        else:
+            # Поки встановлено webhook, getUpdates повертає 409 - знімаємо його
+            bot.remove_webhook()
+            bot.infinity_polling(timeout=10, long_polling_timeout=5)
         
     except KeyboardInterrupt:
         print("\n[*] Bot stopped by user", flush=True)
@@ -75,6 +107,25 @@ def main():
         print(f"[ERROR] Failed to start bot: {e}", flush=True)
         import traceback
         traceback.print_exc()
+    finally:
+        if BOT_RUNTIME == 'threaded':
+            bot.stop_workers()
+        stats = bot.get_dispatch_stats()
+        print(f"[*] Handlers: {stats['processed']} processed, {stats['failed']} failed, "
+              f"max queue depth {stats['max_queue_depth']}, max wait {stats['max_wait']:.2f}s", flush=True)
+        stop_rate_refresher()
+        rates = get_rate_refresh_stats()
+        print(f"[*] Exchange rates: {rates['refresh_count']} refreshes, {rates['failure_count']} failed, "
+              f"last source {rates['last_source'] or '-'}", flush=True)
+        shutdown_report_jobs()
+        shutdown_state_writer()
+        jobs = get_report_jobs_stats()
+        print(f"[*] HTML report jobs: {jobs['completed']} completed, {jobs['failed']} failed, "
+              f"{jobs['deduplicated']} deduplicated, {jobs['rejected']} rejected", flush=True)
+        cache = get_report_cache_stats()
+        print(f"[*] Report cache: {cache['hits']} hits, {cache['misses']} misses, "
+              f"{cache['evictions']} evictions", flush=True)
+        close_all_connections()
 
 
 if __name__ == '__main__':
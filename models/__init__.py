@@ -7,6 +7,8 @@ from .user import User
 from .income import Income
 from .expense import Expense
 from .category import Category
+from .transaction import TransactionRecord
+from .transaction_columns import TransactionColumns
 from .report import ReportData, PeriodComparison
 
-__all__ = ['User', 'Income', 'Expense', 'Category', 'ReportData', 'PeriodComparison']
+__all__ = ['User', 'Income', 'Expense', 'Category', 'TransactionRecord', 'TransactionColumns', 'ReportData', 'PeriodComparison']
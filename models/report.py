@@ -3,10 +3,12 @@
 Report models для представлення даних звітів та аналізу бюджету.
 """
 
-from dataclasses import dataclass
-from typing import List, Dict, Optional
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Tuple, Union
 from .income import Income
 from .expense import Expense
+from .transaction import TransactionRecord
+from .transaction_columns import TransactionColumns
 
 
 @dataclass
@@ -19,8 +21,8 @@ class ReportData:
         period_name: Назва періоду (За місяць, За тиждень, тощо)
         start_date: Початок періоду
         end_date: Кінець періоду
-        incomes: Список об'єктів Income
-        expenses: Список об'єктів Expense
+        incomes: Список доходів (TransactionRecord з БД або Income)
+        expenses: Список витрат (TransactionRecord з БД або Expense)
         total_income: Загальна сума доходів
         total_expense: Загальна сума витрат
         net_balance: Чистий баланс (доходи - витрати)
@@ -31,6 +33,9 @@ class ReportData:
         income_count: Кількість записів доходів
         expense_count: Кількість записів витрат
         transaction_count: Загальна кількість транзакцій
+        income_count_by_currency: Кількість доходів по валютах
+        expense_count_by_currency: Кількість витрат по валютах
+        daily_totals: Денні суми [(day, kind, currency, amount)] для графіка динаміки (опціонально)
         previous_period: Порівняння з попереднім періодом (опціонально)
     """
     user_id: int
@@ -38,8 +43,8 @@ class ReportData:
     start_date: str
     end_date: str
     
-    incomes: List[Income]
-    expenses: List[Expense]
+    incomes: List[Union[TransactionRecord, Income]]
+    expenses: List[Union[TransactionRecord, Expense]]
     
     total_income: float
     total_expense: float
@@ -59,7 +64,21 @@ class ReportData:
     expense_by_currency: Optional[Dict[str, float]] = None  # Розбивка витрат по валютах
     income_by_category_currency: Optional[Dict[str, Dict[str, float]]] = None  # {category: {currency: amount}}
     expense_by_category_currency: Optional[Dict[str, Dict[str, float]]] = None  # {category: {currency: amount}}
+    income_count_by_currency: Optional[Dict[str, int]] = None  # {currency: count}
+    expense_count_by_currency: Optional[Dict[str, int]] = None  # {currency: count}
+    daily_totals: Optional[List[Tuple[str, str, str, float]]] = None  # [(day, 'income'/'expense', currency, amount)]
     previous_period: Optional['PeriodComparison'] = None
+    _columns: Optional[TransactionColumns] = field(default=None, init=False, repr=False, compare=False)
+    
+    def get_columns(self) -> TransactionColumns:
+        """
+        Колонкове представлення транзакцій звіту: спочатку доходи, потім витрати.
+        Будується один раз і зберігається разом зі звітом (в т.ч. в кеші звітів).
+        Доходи - columns.slice(0, len(incomes)), витрати - решта.
+        """
+        if self._columns is None:
+            self._columns = TransactionColumns(list(self.incomes) + list(self.expenses))
+        return self._columns
     
     def to_dict(self) -> dict:
         """Конвертує модель у словник."""
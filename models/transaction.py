@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+TransactionRecord - компактна модель для читання доходів/витрат з БД.
+"""
+
+from sys import intern
+from typing import Optional, Tuple
+
+from .units import from_minor_units, from_timestamp
+
+
+def _shared(value):
+    """Інтернований рядок (один об'єкт на всі однакові значення); інші типи - як є."""
+    return intern(value) if type(value) is str else value
+
+
+class TransactionRecord:
+    """
+    Запис доходу або витрати, завантажений з БД (read model для звітів та переглядів).
+
+    На відміну від Income/Expense не обчислює дати за замовчуванням
+    (вони завжди є в рядку БД) і через __slots__ не має __dict__ на
+    кожен екземпляр, тому звіти з десятками тисяч транзакцій займають
+    помітно менше пам'яті. Атрибути збігаються з Income/Expense.
+
+    Attributes:
+        id: Унікальний ідентифікатор запису
+        user_id: ID користувача
+        amount: Сума
+        category_id: ID категорії
+        description: Опис (може бути None)
+        currency: Валюта (UAH, USD, EUR)
+        add_date: Дата додавання запису
+        update_date: Дата останнього оновлення
+    """
+
+    __slots__ = ('id', 'user_id', 'amount', 'category_id', 'description', 'currency', 'add_date', 'update_date')
+
+    def __init__(
+        self,
+        id: str,
+        user_id: int,
+        amount: float,
+        category_id: str,
+        description: Optional[str],
+        currency: str,
+        add_date: str,
+        update_date: Optional[str] = None
+    ):
+        self.id = id
+        self.user_id = user_id
+        self.amount = amount
+        self.category_id = category_id
+        self.description = description
+        self.currency = currency
+        self.add_date = add_date
+        self.update_date = update_date
+
+    @classmethod
+    def from_row(cls, row: Tuple) -> 'TransactionRecord':
+        """
+        Створює запис з рядка БД.
+
+        Args:
+            row: (id, user_id, amount, category_id, description, currency, add_date, update_date, ...)
+                 в одиницях БД (мінімальні одиниці, секунди), зайві стовпці в кінці ігноруються
+        """
+        add_date = from_timestamp(row[6])
+        # Категорій і валют у користувача небагато, а SQLite на кожен рядок повертає новий рядок -
+        # інтернуємо їх, а незмінену update_date посилаємо на той самий об'єкт, що й add_date
+        return cls(
+            row[0], row[1], from_minor_units(row[2]),
+            _shared(row[3]),
+            row[4],
+            _shared(row[5]),
+            add_date,
+            add_date if row[7] == row[6] else from_timestamp(row[7])
+        )
+
+    def to_dict(self) -> dict:
+        """Конвертує запис у словник (формат Income/Expense.to_dict)."""
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TransactionRecord):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return (f"TransactionRecord(id={self.id}, user_id={self.user_id}, "
+                f"amount={self.amount}, description='{self.description}', "
+                f"currency={self.currency}, add_date={self.add_date})")
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+TransactionColumns - колонкове представлення транзакцій звіту.
+
+Суми, коди валют, коди категорій та дні зберігаються окремими масивами,
+тому групування і суми рахуються без проходу по об'єктах транзакцій.
+Якщо встановлено NumPy - операції векторизовані, інакше використовуються
+масиви модуля array та звичайні цикли (результати ті самі).
+"""
+
+from array import array
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy - опціональна залежність
+    np = None
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_NUMPY_TYPES = {'d': 'float64', 'H': 'uint16', 'I': 'uint32', 'i': 'int32'}
+
+
+def _column(typecode: str, values):
+    """Колонка з заданим типом елементів: numpy.ndarray або array.array."""
+    if np is not None:
+        return np.array(values, dtype=_NUMPY_TYPES[typecode])
+    return array(typecode, values)
+
+
+class TransactionColumns:
+    """
+    Колонки транзакцій (доходів та/або витрат) у порядку вихідного списку.
+
+    Attributes:
+        records: Вихідні записи (TransactionRecord, Income або Expense)
+        amounts: Суми в оригінальних валютах
+        currency_codes: Індекс валюти в currencies для кожної транзакції
+        currencies: Валюти в порядку першої появи
+        category_codes: Індекс категорії в category_ids для кожної транзакції
+        category_ids: ID категорій в порядку першої появи
+        days: День транзакції (кількість днів від 1970-01-01)
+    """
+
+    __slots__ = ('records', 'amounts', 'currency_codes', 'currencies', 'category_codes', 'category_ids', 'days')
+
+    def __init__(self, records: Sequence):
+        """
+        Побудувати колонки зі списку транзакцій.
+
+        Args:
+            records: Транзакції з атрибутами amount, currency, category_id, add_date
+        """
+        currencies = {}
+        category_ids = {}
+        day_numbers = {}
+
+        def day_number(add_date: str) -> int:
+            # Дат у звіті небагато - кожну розбираємо один раз
+            day = add_date[:10]
+            number = day_numbers.get(day)
+            if number is None:
+                number = day_numbers[day] = date.fromisoformat(day).toordinal() - _EPOCH_ORDINAL
+            return number
+
+        self.records = records
+        self.amounts = _column('d', [record.amount for record in records])
+        self.currency_codes = _column('H', [currencies.setdefault(record.currency, len(currencies)) for record in records])
+        self.category_codes = _column('I', [category_ids.setdefault(record.category_id, len(category_ids)) for record in records])
+        self.days = _column('i', [day_number(record.add_date) for record in records])
+        self.currencies = list(currencies)
+        self.category_ids = list(category_ids)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def slice(self, start: int, stop: int) -> 'TransactionColumns':
+        """Колонки частини транзакцій [start, stop) зі спільними довідниками валют і категорій."""
+        part = TransactionColumns.__new__(TransactionColumns)
+        part.records = self.records[start:stop]
+        part.amounts = self.amounts[start:stop]
+        part.currency_codes = self.currency_codes[start:stop]
+        part.category_codes = self.category_codes[start:stop]
+        part.days = self.days[start:stop]
+        part.currencies = self.currencies
+        part.category_ids = self.category_ids
+        return part
+
+    def converted(self, to_currency: str, rates: Optional[Dict[str, Dict]] = None):
+        """
+        Суми, сконвертовані в одну валюту (з округленням до копійок, як convert_currency).
+
+        Args:
+            to_currency: Цільова валюта
+            rates: Знімок курсів (опціонально)
+
+        Returns:
+            Колонка сконвертованих сум у порядку транзакцій
+        """
+        from utils.currency_converter import get_conversion_factors
+
+        factors = get_conversion_factors(self.currencies, to_currency, rates)
+        code_factors = [factors[currency] for currency in self.currencies]
+
+        if np is not None:
+            factor_column = np.array([1.0 if factor is None else factor for factor in code_factors])
+            needs_conversion = np.array([factor is not None for factor in code_factors], dtype=bool)
+            if not len(self.amounts) or not needs_conversion.any():
+                return self.amounts.copy()
+            mask = needs_conversion[self.currency_codes]
+            result = self.amounts.copy()
+            products = self.amounts[mask] * factor_column[self.currency_codes[mask]]
+            # np.round округлює інакше за round() на межі півкопійки - округлюємо як convert_currency
+            result[mask] = [round(product, 2) for product in products.tolist()]
+            return result
+
+        return array('d', [
+            amount if code_factors[code] is None else round(amount * code_factors[code], 2)
+            for amount, code in zip(self.amounts, self.currency_codes)
+        ])
+
+    def categories_in_order(self) -> List[int]:
+        """Коди категорій, що зустрічаються в колонках, в порядку першої появи."""
+        if np is not None:
+            codes, first_positions = np.unique(self.category_codes, return_index=True)
+            return codes[np.argsort(first_positions)].tolist()
+        return list(dict.fromkeys(self.category_codes))
+
+    def sum_by_category(self, values=None) -> List[float]:
+        """
+        Суми по категоріях.
+
+        Args:
+            values: Колонка сум (за замовчуванням - amounts)
+
+        Returns:
+            List[float]: Сума для кожного коду категорії (індекс - код)
+        """
+        values = self.amounts if values is None else values
+        if np is not None:
+            return np.bincount(self.category_codes, weights=values, minlength=len(self.category_ids)).tolist()
+
+        sums = [0.0] * len(self.category_ids)
+        for code, value in zip(self.category_codes, values):
+            sums[code] += value
+        return sums
+
+    def sum_by_day_currency(self) -> Dict[Tuple[int, str], float]:
+        """
+        Суми в оригінальних валютах по днях.
+
+        Returns:
+            Dict: {(день, валюта): сума}, впорядкований за днем, потім за кодом валюти
+        """
+        if not len(self.records):
+            return {}
+
+        currency_count = len(self.currencies)
+        if np is not None:
+            first_day = int(self.days.min())
+            keys = (self.days - first_day).astype('int64') * currency_count + self.currency_codes
+            counts = np.bincount(keys)
+            sums = np.bincount(keys, weights=self.amounts)
+            present = np.nonzero(counts)[0]
+            return {
+                (first_day + key // currency_count, self.currencies[key % currency_count]): amount
+                for key, amount in zip(present.tolist(), sums[present].tolist())
+            }
+
+        sums = {}
+        for day, code, amount in zip(self.days, self.currency_codes, self.amounts):
+            key = (day, code)
+            sums[key] = sums.get(key, 0.0) + amount
+        return {(day, self.currencies[code]): sums[(day, code)] for day, code in sorted(sums)}
+
+    def order_desc(self, values) -> List[int]:
+        """
+        Позиції транзакцій за спаданням values (рівні значення - в початковому порядку).
+
+        Args:
+            values: Колонка значень тієї ж довжини
+
+        Returns:
+            List[int]: Позиції транзакцій
+        """
+        if np is not None:
+            return np.argsort(-np.asarray(values), kind='stable').tolist()
+        return sorted(range(len(values)), key=values.__getitem__, reverse=True)
+
+    @staticmethod
+    def day_to_str(day: int) -> str:
+        """День (від 1970-01-01) у форматі 'YYYY-MM-DD'."""
+        return date.fromordinal(day + _EPOCH_ORDINAL).isoformat()
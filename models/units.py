@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Перетворення між одиницями моделей та одиницями зберігання в БД.
+
+Моделі працюють із сумами у float та датами-рядками 'YYYY-MM-DD HH:MM:SS',
+а таблиці incomes/expenses/daily_totals зберігають цілі числа:
+- суми - в мінімальних одиницях валюти (копійках/центах), тому SUM точний;
+- дати - секунди від 1970-01-01, дні - дні від 1970-01-01.
+Дати в моделях - локальний час без зони, тому епоха рахується як для UTC
+(без зсувів DST), а перетворення в обидва боки взаємно обернені.
+"""
+
+import calendar
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
+from typing import Optional, Union
+
+from config.constants import AMOUNT_MINOR_UNITS
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+SECONDS_PER_DAY = 86400
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_MINOR_UNITS_DECIMAL = Decimal(AMOUNT_MINOR_UNITS)
+
+# Готові частини часу для from_timestamp: ' HH:' та 'MM:SS' (звіти перетворюють десятки тисяч дат)
+_HOUR_PARTS = [f' {hours:02d}:' for hours in range(24)]
+_MINUTE_SECOND_PARTS = [f'{minutes:02d}:{seconds:02d}' for minutes in range(60) for seconds in range(60)]
+
+
+def to_minor_units(amount: Optional[float]) -> Optional[int]:
+    """Сума -> ціла кількість мінімальних одиниць (округлення половини від нуля, як у введенні)."""
+    if amount is None:
+        return None
+    # Через str: 1.005 -> '1.005' -> 101, а не 100 через двійкове представлення
+    return int((Decimal(str(amount)) * _MINOR_UNITS_DECIMAL).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_minor_units(units: Optional[int]) -> Optional[float]:
+    """Мінімальні одиниці -> сума (найближчий float, як і збережене раніше REAL значення)."""
+    if units is None:
+        return None
+    return units / AMOUNT_MINOR_UNITS
+
+
+def to_timestamp(value: Union[str, datetime, None]) -> Optional[int]:
+    """Дата ('YYYY-MM-DD HH:MM:SS' або datetime) -> секунди від 1970-01-01."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.strptime(value, DATE_FORMAT)
+    return calendar.timegm(value.timetuple())
+
+
+def from_timestamp(timestamp: Optional[int]) -> Optional[str]:
+    """Секунди від 1970-01-01 -> дата 'YYYY-MM-DD HH:MM:SS'."""
+    if timestamp is None:
+        return None
+    day, seconds = divmod(timestamp, SECONDS_PER_DAY)
+    hours, seconds = divmod(seconds, 3600)
+    return from_day_number(day) + _HOUR_PARTS[hours] + _MINUTE_SECOND_PARTS[seconds]
+
+
+def to_day_number(value: Union[str, date]) -> int:
+    """День ('YYYY-MM-DD...' або date/datetime) -> кількість днів від 1970-01-01."""
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    return value.toordinal() - _EPOCH_ORDINAL
+
+
+@lru_cache(maxsize=4096)
+def from_day_number(day: int) -> str:
+    """Кількість днів від 1970-01-01 -> 'YYYY-MM-DD' (дні повторюються, тому кешуємо)."""
+    return date.fromordinal(day + _EPOCH_ORDINAL).isoformat()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Обробники-корутини (utils/handler_runtime.py): виконання в TeleBot через
+ThreadedBotApi і виконання блокуючих викликів у пулі для asyncio.
+
+Запуск: python -m unittest tests.test_handler_runtime
+"""
+
+import asyncio
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from telebot import TeleBot, types
+
+from utils.handler_runtime import ThreadedBotApi, in_async_runtime, run_blocking, use_blocking_executor
+
+
+def _message_update(text: str) -> types.Update:
+    return types.Update.de_json({
+        'update_id': 1,
+        'message': {
+            'message_id': 1,
+            'date': 0,
+            'chat': {'id': 42, 'type': 'private'},
+            'from': {'id': 42, 'is_bot': False, 'first_name': 'Test'},
+            'text': text,
+        },
+    })
+
+
+class ThreadedBotApiTest(unittest.TestCase):
+
+    def test_coroutine_handler_runs_in_telebot(self):
+        bot = TeleBot('123456:TEST', threaded=False)
+        sent = []
+        bot.send_message = lambda chat_id, text, **kwargs: sent.append((chat_id, text))
+        handler_bot = ThreadedBotApi(bot)
+        threads = []
+
+        @handler_bot.message_handler(func=lambda message: True)
+        async def echo(message):
+            # Без пулу блокуючий виклик виконується в потоці обробника
+            threads.append(await run_blocking(threading.current_thread))
+            await handler_bot.send_message(message.chat.id, message.text)
+
+        bot.process_new_updates([_message_update('ping')])
+
+        self.assertEqual(sent, [(42, 'ping')])
+        self.assertEqual(threads, [threading.current_thread()])
+
+
+class RunBlockingTest(unittest.TestCase):
+
+    def tearDown(self):
+        use_blocking_executor(None)
+
+    def test_runs_in_executor_in_async_runtime(self):
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='test-blocking')
+        self.addCleanup(executor.shutdown)
+        use_blocking_executor(executor)
+
+        self.assertTrue(in_async_runtime())
+        thread = asyncio.run(run_blocking(threading.current_thread))
+        self.assertTrue(thread.name.startswith('test-blocking'))
+
+    def test_passes_arguments(self):
+        self.assertFalse(in_async_runtime())
+        result = asyncio.run(run_blocking(divmod, 7, 2))
+        self.assertEqual(result, (3, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
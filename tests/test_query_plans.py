@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Плани запитів звітів і сторінок транзакцій: пошук по індексу (user_id, add_date, id), без SCAN таблиці.
+
+Запуск: python -m unittest tests.test_query_plans
+"""
+
+import os
+import re
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+os.environ.setdefault('TELEGRAM_TOKEN', '123456:TEST_TOKEN_FOR_UNIT_TESTS')
+
+from database import db_manager, init_db, get_connection, create_user, add_income, add_expense, CategoryRepository
+from database.income_repository import scan_incomes_window, get_incomes_page
+from database.expense_repository import scan_expenses_window, get_expenses_page
+from database.daily_totals import scan_daily_window, get_daily_totals
+
+USER_ID = 1
+
+
+class QueryPlanTest(unittest.TestCase):
+
+    def setUp(self):
+        # Окрема БД у пам'яті з усіма міграціями
+        patcher = mock.patch.object(db_manager, 'DB_FILE', ':memory:')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        db_manager.close_all_connections()
+        self.addCleanup(db_manager.close_all_connections)
+        init_db()
+
+        create_user(USER_ID)
+        add_income(USER_ID, 100, CategoryRepository.get_categories_by_type(USER_ID, 'income')[0].id)
+        add_expense(USER_ID, 50, CategoryRepository.get_categories_by_type(USER_ID, 'expense')[0].id)
+        self.end = datetime.now() + timedelta(days=1)
+        self.start = self.end - timedelta(days=30)
+
+    def _query_plans(self, call, table):
+        """Виконати call і повернути [(sql, [рядки плану])] для кожного SELECT з таблиці table."""
+        conn = get_connection()
+        statements = []
+        conn.set_trace_callback(statements.append)
+        try:
+            call()
+        finally:
+            conn.set_trace_callback(None)
+
+        plans = []
+        for sql in statements:
+            if sql.lstrip().upper().startswith('SELECT') and re.search(rf'\bFROM {table}\b', sql):
+                plans.append((sql, [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql)]))
+        self.assertTrue(plans)
+        return plans
+
+    def _assert_uses_index(self, call, table, index):
+        for sql, plan in self._query_plans(call, table):
+            with self.subTest(sql=' '.join(sql.split())):
+                self.assertFalse([line for line in plan if line.startswith('SCAN')], plan)
+                self.assertTrue([line for line in plan
+                                 if re.search(rf'USING (COVERING )?INDEX {index}\b', line)], plan)
+
+    def test_scan_window_uses_keyset_index(self):
+        for table, scan_window in (('incomes', scan_incomes_window), ('expenses', scan_expenses_window)):
+            for include_transactions in (True, False):
+                # Вікно з попереднім періодом, як у звіті з порівнянням
+                self._assert_uses_index(
+                    lambda: scan_window(USER_ID, self.start - timedelta(days=30), self.end,
+                                        split=self.start, include_transactions=include_transactions),
+                    table, f'idx_{table}_user_date_id')
+
+    def test_pages_use_keyset_index(self):
+        for table, get_page in (('incomes', get_incomes_page), ('expenses', get_expenses_page)):
+            def read_pages():
+                page, _ = get_page(USER_ID, self.start, self.end)
+                cursor = (page[0].add_date, page[0].id)
+                get_page(USER_ID, self.start, self.end, cursor=cursor)
+                get_page(USER_ID, cursor=cursor, backward=True)
+
+            self._assert_uses_index(read_pages, table, f'idx_{table}_user_date_id')
+
+    def test_daily_window_uses_primary_key(self):
+        window_start = self.start - timedelta(days=30)
+        for kind in ('income', 'expense'):
+            self._assert_uses_index(
+                lambda: scan_daily_window(USER_ID, kind, window_start, self.end, self.start),
+                'daily_totals', 'sqlite_autoindex_daily_totals_1')
+            # Неповні крайні дні вікна дочитуються з таблиці транзакцій
+            self._assert_uses_index(
+                lambda: scan_daily_window(USER_ID, kind, window_start, self.end, self.start),
+                f'{kind}s', f'idx_{kind}s_user_date_id')
+        self._assert_uses_index(lambda: get_daily_totals(USER_ID, self.start, self.end),
+                                'daily_totals', 'sqlite_autoindex_daily_totals_1')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Кеш звітів: HTML звіт після детального не перебудовує суми.
+
+Запуск: python -m unittest tests.test_report_cache
+"""
+
+import os
+import unittest
+from unittest import mock
+
+os.environ.setdefault('TELEGRAM_TOKEN', '123456:TEST_TOKEN_FOR_UNIT_TESTS')
+
+from database import db_manager, init_db, add_income, add_expense, create_user, CategoryRepository
+from database import report_repository
+from database.report_cache import clear_report_cache
+
+USER_ID = 1
+
+
+class DetailedThenHtmlReportTest(unittest.TestCase):
+
+    def setUp(self):
+        # Окрема БД у пам'яті: з'єднання пулу відкриються заново вже до неї
+        patcher = mock.patch.object(db_manager, 'DB_FILE', ':memory:')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        db_manager.close_all_connections()
+        self.addCleanup(db_manager.close_all_connections)
+        clear_report_cache()
+        self.addCleanup(clear_report_cache)
+        init_db()
+
+        create_user(USER_ID)
+        income_category = CategoryRepository.get_categories_by_type(USER_ID, 'income')[0]
+        expense_category = CategoryRepository.get_categories_by_type(USER_ID, 'expense')[0]
+        add_income(USER_ID, 1000, income_category.id)
+        add_income(USER_ID, 250.5, income_category.id)
+        add_expense(USER_ID, 300, expense_category.id)
+
+        # Без завантажених курсів звіти не кешуються
+        patcher = mock.patch('utils.currency_converter.has_loaded_rates', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _detailed_then_html(self, period):
+        with mock.patch.object(report_repository, '_build_user_report',
+                               wraps=report_repository._build_user_report) as build:
+            detailed = report_repository.generate_user_report(
+                USER_ID, period, include_comparison=True, include_transactions=False)
+            html = report_repository.generate_user_report(
+                USER_ID, period, include_comparison=True)
+            again = report_repository.generate_user_report(
+                USER_ID, period, include_comparison=True)
+        self.assertEqual(build.call_count, 1)
+        self.assertIs(again, html)
+        return detailed, html
+
+    def _assert_same_totals(self, detailed, html):
+        self.assertEqual(html.total_income, detailed.total_income)
+        self.assertEqual(html.total_expense, detailed.total_expense)
+        self.assertEqual(html.income_by_category, detailed.income_by_category)
+        self.assertEqual(html.previous_period, detailed.previous_period)
+        self.assertEqual(len(html.incomes), 2)
+        self.assertEqual(len(html.expenses), 1)
+        self.assertEqual(detailed.incomes, [])
+
+    def test_html_report_reuses_detailed_totals(self):
+        detailed, html = self._detailed_then_html('week')
+        self._assert_same_totals(detailed, html)
+        self.assertEqual(html.total_income, 1250.5)
+
+    def test_rollup_period_loads_daily_totals(self):
+        detailed, html = self._detailed_then_html('year')
+        self._assert_same_totals(detailed, html)
+        self.assertIsNone(detailed.daily_totals)
+        self.assertTrue(html.daily_totals)
+
+
+if __name__ == '__main__':
+    unittest.main()
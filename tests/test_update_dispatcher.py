@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Порядок оновлень користувача: ShardedTeleBot у режимі polling на локальному
+фейковому Bot API (utils/webhook.py) і RuntimeAsyncTeleBot (BOT_RUNTIME=asyncio).
+
+Запуск: python -m unittest tests.test_update_dispatcher
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+from collections import Counter
+
+from telebot import apihelper, types
+
+from utils.update_dispatcher import ShardedTeleBot
+from utils.webhook import _FakeBotApi, _fake_update
+
+try:
+    from utils.async_runtime import RuntimeAsyncTeleBot
+except ImportError:  # aiohttp не встановлено
+    RuntimeAsyncTeleBot = None
+
+LONG_POLLING_TIMEOUT = 1
+HANDLER_DELAY = 1.5  # Довше за long polling: getUpdates повторюється, поки обробники ще працюють
+
+
+class ShardedPollingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.api = _FakeBotApi()
+        threading.Thread(target=self.api.serve_forever, daemon=True).start()
+        self.api_url = apihelper.API_URL
+        apihelper.API_URL = f'http://127.0.0.1:{self.api.server_address[1]}/bot{{0}}/{{1}}'
+        self.bot = ShardedTeleBot('123456:TEST', workers=4)
+
+    def tearDown(self):
+        self.bot.stop_polling()
+        self.bot.stop_workers(wait=False)
+        self.api.shutdown()
+        self.api.server_close()
+        apihelper.API_URL = self.api_url
+
+    def test_slow_handlers_process_each_update_once(self):
+        # Три користувачі, у першого - два оновлення поспіль
+        user_ids = [1, 2, 1, 3]
+        handled = Counter()
+        lock = threading.Lock()
+
+        @self.bot.message_handler(func=lambda message: True)
+        def on_message(message):
+            time.sleep(HANDLER_DELAY)
+            with lock:
+                handled[message.message_id] += 1
+
+        threading.Thread(target=self.bot.infinity_polling, daemon=True,
+                         kwargs={'timeout': 5, 'long_polling_timeout': LONG_POLLING_TIMEOUT}).start()
+        time.sleep(0.3)
+
+        for update_id, user_id in enumerate(user_ids, start=1):
+            update = _fake_update(update_id)
+            update['message']['chat']['id'] = update['message']['from']['id'] = user_id
+            self.api.push(update)
+
+        # Два оновлення першого користувача обробляються по черзі, далі - ще кілька циклів getUpdates
+        time.sleep(2 * HANDLER_DELAY + 2 * LONG_POLLING_TIMEOUT + 1)
+
+        self.assertEqual(dict(handled), {update_id: 1 for update_id in range(1, len(user_ids) + 1)})
+        self.assertEqual(self.bot.last_update_id, len(user_ids))
+
+
+def _user_update(update_id: int, user_id: int) -> types.Update:
+    update = _fake_update(update_id)
+    update['message']['chat']['id'] = update['message']['from']['id'] = user_id
+    return types.Update.de_json(update)
+
+
+@unittest.skipIf(RuntimeAsyncTeleBot is None, 'aiohttp is not installed')
+class AsyncOrderingTest(unittest.TestCase):
+
+    def setUp(self):
+        from locales.locale_manager import USER_LANGUAGES
+
+        # Мова вже в пам'яті - бот не звертається до SQLite
+        USER_LANGUAGES.update({1: 'uk', 2: 'uk'})
+        self.bot = RuntimeAsyncTeleBot('123456:TEST')
+
+    def test_updates_of_one_user_run_in_order(self):
+        events = []
+
+        @self.bot.message_handler(func=lambda message: True)
+        async def on_message(message):
+            events.append(('start', message.from_user.id, message.message_id))
+            # Перше оновлення користувача 1 - найдовше
+            await asyncio.sleep(0.05 if message.message_id == 1 else 0.01)
+            events.append(('end', message.from_user.id, message.message_id))
+
+        async def run():
+            # Два пакети, як два цикли getUpdates
+            await self.bot.process_new_updates([_user_update(1, 1), _user_update(2, 2)])
+            await self.bot.process_new_updates([_user_update(3, 1)])
+            await self.bot.wait_updates()
+
+        asyncio.run(run())
+
+        user_events = [event for event in events if event[1] == 1]
+        self.assertEqual(user_events, [('start', 1, 1), ('end', 1, 1), ('start', 1, 3), ('end', 1, 3)])
+        # Користувач 2 не чекає на користувача 1
+        self.assertLess(events.index(('end', 2, 2)), events.index(('end', 1, 1)))
+        stats = self.bot.get_dispatch_stats()
+        self.assertEqual((stats['dispatched'], stats['processed'], stats['queued']), (3, 3, 0))
+        self.assertEqual(stats['max_queue_depth'], 2)
+
+    def test_failed_handler_does_not_block_next_update(self):
+        handled = []
+
+        @self.bot.message_handler(func=lambda message: True)
+        async def on_message(message):
+            if message.message_id == 1:
+                raise RuntimeError('handler failed')
+            handled.append(message.message_id)
+
+        async def run():
+            await self.bot.process_new_updates([_user_update(1, 1), _user_update(2, 1)])
+            await self.bot.wait_updates()
+
+        asyncio.run(run())
+
+        self.assertEqual(handled, [2])
+        stats = self.bot.get_dispatch_stats()
+        self.assertEqual((stats['processed'], stats['failed']), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+Webhook сервер (utils/webhook.py): відповіді на некоректні запити.
+
+Запуск: python -m unittest tests.test_webhook
+"""
+
+import socket
+import unittest
+
+from utils.webhook import start_webhook_server, SECRET_TOKEN_HEADER
+
+
+class WebhookRequestTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = start_webhook_server(None, '127.0.0.1', 0, '/webhook', 'secret')
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _post(self, content_length: str) -> bytes:
+        """Надіслати POST без тіла і прочитати все до закриття з'єднання сервером."""
+        with socket.create_connection(('127.0.0.1', self.server.port), timeout=5) as sock:
+            sock.sendall((f'POST /webhook HTTP/1.1\r\nHost: localhost\r\n'
+                          f'{SECRET_TOKEN_HEADER}: secret\r\n'
+                          f'Content-Length: {content_length}\r\n\r\n').encode('ascii'))
+            response = b''
+            while True:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    return response
+                response += chunk
+
+    def test_negative_content_length_is_rejected(self):
+        response = self._post('-5')
+        self.assertTrue(response.startswith(b'HTTP/1.1 400'), response)
+        self.assertIn(b'Connection: close', response)
+
+    def test_invalid_content_length_is_rejected(self):
+        response = self._post('abc')
+        self.assertTrue(response.startswith(b'HTTP/1.1 411'), response)
+
+
+if __name__ == '__main__':
+    unittest.main()
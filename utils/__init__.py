@@ -24,6 +24,7 @@ from .formatters import (
     format_income_model,
     format_expense_model,
     format_general_finances,
+    format_transactions_page,
 )
 from .report_formatters import (
     format_detailed_report,
@@ -33,7 +34,8 @@ from .report_formatters import (
     format_period_comparison,
 )
 from .html_report_generator import (
-    generate_html_report,
+    render_html_report,
+    get_report_generator,
     HTMLReportGenerator,
 )
 
@@ -58,6 +60,7 @@ __all__ = [
     'format_income_model',
     'format_expense_model',
     'format_general_finances',
+    'format_transactions_page',
     
     # Report Formatters
     'format_detailed_report',
@@ -67,7 +70,8 @@ __all__ = [
     'format_period_comparison',
     
     # HTML Report Generator
-    'generate_html_report',
+    'render_html_report',
+    'get_report_generator',
     'HTMLReportGenerator',
 ]
 
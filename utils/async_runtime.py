@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""
+Середовище виконання asyncio (BOT_RUNTIME=asyncio).
+
+AsyncTeleBot отримує оновлення (long polling через aiohttp) і виконує
+обробники-корутини з handlers/ в циклі подій: поки обробник чекає відповіді
+Bot API, цикл обробляє інші оновлення, тому кількість одночасних користувачів
+не обмежена кількістю потоків. Блокуючі виклики обробників (SQLite, рендеринг
+звітів) йдуть через run_blocking у пул з ASYNC_BLOCKING_WORKERS потоків.
+Курси валют оновлюються асинхронною задачею через aiohttp.
+
+Порівняння з threaded на локальному фейковому Bot API:
+    python -m utils.async_runtime
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, List, Optional
+
+try:
+    from telebot import types
+    from telebot.async_telebot import AsyncTeleBot, ExceptionHandler
+except ImportError as e:  # AsyncTeleBot потребує aiohttp
+    raise ImportError("[ERROR] BOT_RUNTIME=asyncio requires aiohttp (pip install aiohttp)") from e
+
+from utils.handler_runtime import run_blocking, use_blocking_executor
+from utils.update_dispatcher import get_update_user_id
+
+
+def _load_language(user_id: int):
+    from locales import load_user_language
+
+    load_user_language(user_id)
+
+
+class _ReraiseHandlerErrors(ExceptionHandler):
+    """Передає помилку обробника далі (AsyncTeleBot лише логує її) - для лічильника failed."""
+
+    def handle(self, exception):
+        raise exception
+
+
+class RuntimeAsyncTeleBot(AsyncTeleBot):
+    """
+    AsyncTeleBot, що обробляє оновлення одного користувача строго по черзі.
+
+    Кожне оновлення - окрема задача, що чекає на попередню задачу того самого
+    користувача (get_update_user_id), тому різні користувачі обробляються
+    паралельно, а стан одного користувача не змінюють два обробники одночасно.
+    Перед обробником мова нового користувача завантажується в пулі потоків:
+    get_text тоді бере її з пам'яті, а не з SQLite в циклі подій.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('exception_handler', _ReraiseHandlerErrors())
+        super().__init__(*args, **kwargs)
+        # Остання задача і кількість незавершених оновлень кожного користувача
+        self._user_tails: Dict[int, asyncio.Task] = {}
+        self._user_pending: Dict[int, int] = {}
+        self._stats = {
+            'dispatched': 0, 'processed': 0, 'failed': 0,
+            'max_queue_depth': 0, 'wait_total': 0.0, 'max_wait': 0.0,
+        }
+
+    async def process_new_updates(self, updates: List[types.Update]):
+        """Створити задачі оновлень (без await до постановки: порядок пакетів зберігається)."""
+        enqueued_at = time.monotonic()
+        for update in updates:
+            user_id = get_update_user_id(update)
+            previous = self._user_tails.get(user_id)
+            task = asyncio.create_task(self._process_in_order(update, user_id, previous, enqueued_at))
+            self._user_tails[user_id] = task
+            depth = self._user_pending.get(user_id, 0) + 1
+            self._user_pending[user_id] = depth
+            if depth > self._stats['max_queue_depth']:
+                self._stats['max_queue_depth'] = depth
+        self._stats['dispatched'] += len(updates)
+
+    async def _process_in_order(self, update: types.Update, user_id: int,
+                                previous: Optional[asyncio.Task], enqueued_at: float):
+        from locales.locale_manager import USER_LANGUAGES
+
+        try:
+            if previous is not None:
+                # asyncio.wait не передає помилку попереднього оновлення
+                await asyncio.wait([previous])
+            wait = time.monotonic() - enqueued_at
+            try:
+                if user_id not in USER_LANGUAGES:
+                    await run_blocking(_load_language, user_id)
+                await super().process_new_updates([update])
+                succeeded = True
+            except Exception as e:
+                print(f"[ERROR] Failed to process update {update.update_id}: {e}", flush=True)
+                succeeded = False
+
+            self._stats['processed' if succeeded else 'failed'] += 1
+            self._stats['wait_total'] += wait
+            if wait > self._stats['max_wait']:
+                self._stats['max_wait'] = wait
+        finally:
+            self._user_pending[user_id] -= 1
+            if not self._user_pending[user_id]:
+                del self._user_pending[user_id]
+                del self._user_tails[user_id]
+
+    async def wait_updates(self):
+        """Дочекатися обробки вже отриманих оновлень (при зупинці бота)."""
+        if self._user_tails:
+            await asyncio.wait(list(self._user_tails.values()))
+
+    def get_dispatch_stats(self) -> Dict:
+        """
+        Метрики обробки оновлень (ті самі ключі, що й ShardedTeleBot.get_dispatch_stats).
+
+        Returns:
+            Dict: dispatched, processed, failed, queued (незавершених оновлень зараз),
+            max_queue_depth (найбільше незавершених оновлень одного користувача),
+            avg_wait / max_wait (час очікування попередніх оновлень користувача, сек)
+        """
+        stats = dict(self._stats)
+        finished = stats['processed'] + stats['failed']
+        stats['avg_wait'] = stats.pop('wait_total') / finished if finished else 0.0
+        stats['queued'] = sum(self._user_pending.values())
+        return stats
+
+
+def create_async_bot(token: str) -> RuntimeAsyncTeleBot:
+    """Створити AsyncTeleBot для BOT_RUNTIME=asyncio (з'єднання перевіряється в run_async)."""
+    return RuntimeAsyncTeleBot(token, parse_mode='HTML')
+
+
+async def _serve(bot: RuntimeAsyncTeleBot, workers: int, on_startup: Optional[Callable[[], Awaitable]]):
+    from utils.currency_converter import run_rate_refresher_async
+    from utils.report_jobs import wait_report_tasks
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bot-blocking')
+    use_blocking_executor(executor)
+    refresher = asyncio.create_task(run_rate_refresher_async())
+    try:
+        bot_info = await bot.get_me()
+        print(f"[OK] Connected to Telegram API: @{bot_info.username}", flush=True)
+        # Поки встановлено webhook, getUpdates повертає 409 - знімаємо його
+        await bot.delete_webhook()
+        if on_startup is not None:
+            await on_startup()
+        await bot.infinity_polling(timeout=10)
+    finally:
+        refresher.cancel()
+        # Обробити вже отримані оновлення та надіслати звіти, що генеруються (потрібні сесія aiohttp та пул)
+        await bot.wait_updates()
+        await wait_report_tasks()
+        await bot.close_session()
+        use_blocking_executor(None)
+        executor.shutdown(wait=True)
+
+
+def run_async(bot: RuntimeAsyncTeleBot, workers: int, on_startup: Optional[Callable[[], Awaitable]] = None):
+    """
+    Отримувати та обробляти оновлення в циклі asyncio (блокує до KeyboardInterrupt, як infinity_polling).
+
+    Args:
+        bot: AsyncTeleBot із зареєстрованими обробниками (init_bot)
+        workers: Потоків для блокуючих викликів обробників (run_blocking)
+        on_startup: Корутинна функція, що виконується перед отриманням оновлень (опціонально)
+    """
+    print(f"[*] asyncio runtime: {workers} threads for blocking calls", flush=True)
+    asyncio.run(_serve(bot, workers, on_startup))
+
+
+def _benchmark(users: int = 1000, api_delay: float = 0.05, db_delay: float = 0.002):
+    """
+    Час обробки повідомлень від users користувачів одночасно. Обробник -
+    той самий корутинний обробник для обох середовищ: блокуючий виклик
+    (db_delay, як запит SQLite) і sendMessage, відповідь на який фейковий
+    Bot API затримує на api_delay.
+    """
+    import threading
+    from telebot import TeleBot, apihelper, asyncio_helper
+    from config.constants import DEFAULT_ASYNC_BLOCKING_WORKERS, DEFAULT_HANDLER_WORKERS
+    from locales.locale_manager import USER_LANGUAGES
+    from utils.handler_runtime import ThreadedBotApi
+    from utils.update_dispatcher import ShardedTeleBot
+    from utils.webhook import _FakeBotApi, _fake_update
+
+    api = _FakeBotApi(method_delay=api_delay)
+    threading.Thread(target=api.serve_forever, daemon=True).start()
+    apihelper.API_URL = asyncio_helper.API_URL = f'http://127.0.0.1:{api.server_address[1]}/bot{{0}}/{{1}}'
+
+    done = threading.Event()
+
+    def register(handler_bot):
+        handled = []
+
+        @handler_bot.message_handler(func=lambda message: True)
+        async def on_message(message):
+            await run_blocking(time.sleep, db_delay)
+            await handler_bot.send_message(message.chat.id, 'pong')
+            handled.append(message.message_id)
+            if len(handled) == users:
+                done.set()
+
+    def measure(label, start_runtime, stop_runtime):
+        done.clear()
+        start_runtime()
+        time.sleep(0.5)
+        started = time.perf_counter()
+        for user_id in range(1, users + 1):
+            update = _fake_update(user_id)
+            update['message']['chat']['id'] = update['message']['from']['id'] = user_id
+            api.push(update)
+        finished = done.wait(300)
+        elapsed = time.perf_counter() - started
+        stop_runtime()
+        print(f"{label:>24}: {users} users in {elapsed:6.2f} s ({users / elapsed:6.0f} updates/s)"
+              f"{'' if finished else ' - TIMEOUT'}", flush=True)
+
+    # TeleBot за замовчуванням (пул з 2 потоків)
+    bot = TeleBot('123456:BENCHMARK', parse_mode='HTML')
+    register(ThreadedBotApi(bot))
+    measure('TeleBot (2 threads)',
+            lambda: threading.Thread(target=bot.infinity_polling, kwargs={'timeout': 10}, daemon=True).start(),
+            bot.stop_polling)
+
+    # threaded: пул шардів, як у bot_instance.py
+    bot = ShardedTeleBot('123456:BENCHMARK', workers=DEFAULT_HANDLER_WORKERS, parse_mode='HTML')
+    register(ThreadedBotApi(bot))
+    measure(f'threaded ({DEFAULT_HANDLER_WORKERS} workers)',
+            lambda: threading.Thread(target=bot.infinity_polling, kwargs={'timeout': 10}, daemon=True).start(),
+            bot.stop_polling)
+    bot.stop_workers()
+
+    # asyncio: обробники в циклі подій, блокуючі виклики в пулі DEFAULT_ASYNC_BLOCKING_WORKERS.
+    # Мова користувачів уже в пам'яті - бот не звертається до SQLite
+    USER_LANGUAGES.update(dict.fromkeys(range(1, users + 1), 'uk'))
+    async_bot = create_async_bot('123456:BENCHMARK')
+    register(async_bot)
+    loop = asyncio.new_event_loop()
+    executor = ThreadPoolExecutor(DEFAULT_ASYNC_BLOCKING_WORKERS)
+    use_blocking_executor(executor)
+    measure(f'asyncio ({DEFAULT_ASYNC_BLOCKING_WORKERS} threads)',
+            lambda: threading.Thread(target=loop.run_until_complete,
+                                     args=(async_bot.infinity_polling(timeout=10),), daemon=True).start(),
+            lambda: setattr(async_bot, '_polling', False))
+    use_blocking_executor(None)
+    executor.shutdown(wait=False)
+    api.shutdown()
+
+
+if __name__ == '__main__':
+    _benchmark()
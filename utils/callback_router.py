@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Маршрутизатор callback_query: пошук обробника за callback_data без перебору предикатів.
+
+pyTelegramBotAPI перевіряє func кожного callback_query_handler по черзі, тому
+вартість кожного натискання кнопки росте з кількістю обробників. Тут точні
+значення шукаються в словнику, а префікси - в префіксному дереві (trie) за
+O(довжини callback_data). Порядок реєстрації зберігається: якщо підходить
+кілька маршрутів (точний і префікс або кілька з guard), спрацьовує перший
+зареєстрований, як і в telebot. Обробники - корутини (utils/handler_runtime.py).
+
+Порівняння з лінійним перебором: python -m utils.callback_router
+"""
+
+import itertools
+from typing import Callable, Dict, List, Optional, Tuple
+
+# (порядок реєстрації, guard, обробник)
+Route = Tuple[int, Optional[Callable], Callable]
+
+
+class _PrefixNode:
+    """Вузол префіксного дерева: дочірні вузли за символом і маршрути префікса, що закінчується тут."""
+
+    __slots__ = ('children', 'routes')
+
+    def __init__(self):
+        self.children: Dict[str, '_PrefixNode'] = {}
+        self.routes: List[Route] = []
+
+
+class CallbackRouter:
+    """
+    Реєстр обробників callback_query за точним callback_data та за префіксом.
+
+    Обробники реєструються декораторами exact()/prefix() в register_handlers
+    модулів, а attach(bot) підключає маршрутизатор до бота одним обробником.
+    """
+
+    def __init__(self):
+        self._exact: Dict[str, List[Route]] = {}
+        self._root = _PrefixNode()
+        self._counter = itertools.count()
+
+    def exact(self, *values: str, guard: Optional[Callable] = None):
+        """
+        Декоратор: обробник для callback_data, рівного одному з values.
+
+        Args:
+            values: Значення callback_data
+            guard: Додаткова умова guard(call) (опціонально), перевіряється після збігу
+        """
+        def decorator(handler):
+            order = next(self._counter)
+            for value in values:
+                self._exact.setdefault(value, []).append((order, guard, handler))
+            return handler
+        return decorator
+
+    def prefix(self, prefix: str, guard: Optional[Callable] = None):
+        """
+        Декоратор: обробник для callback_data, що починається з prefix.
+
+        Args:
+            prefix: Префікс callback_data
+            guard: Додаткова умова guard(call) (опціонально), перевіряється після збігу
+        """
+        def decorator(handler):
+            node = self._root
+            for char in prefix:
+                node = node.children.setdefault(char, _PrefixNode())
+            node.routes.append((next(self._counter), guard, handler))
+            return handler
+        return decorator
+
+    def resolve(self, call) -> Optional[Callable]:
+        """
+        Знайти обробник для callback_query.
+
+        Args:
+            call: CallbackQuery
+
+        Returns:
+            Перший за порядком реєстрації обробник, чий маршрут і guard підходять, або None
+        """
+        data = call.data or ''
+        routes = self._exact.get(data)
+        candidates = [routes] if routes else []
+
+        node = self._root
+        if node.routes:
+            candidates.append(node.routes)
+        for char in data:
+            node = node.children.get(char)
+            if node is None:
+                break
+            if node.routes:
+                candidates.append(node.routes)
+
+        if not candidates:
+            return None
+        if len(candidates) == 1:
+            routes = candidates[0]
+        else:
+            routes = sorted(itertools.chain.from_iterable(candidates), key=lambda route: route[0])
+
+        for _, guard, handler in routes:
+            if guard is None or guard(call):
+                return handler
+        return None
+
+    async def dispatch(self, call) -> bool:
+        """
+        Викликати обробник для callback_query.
+
+        Returns:
+            bool: True якщо обробник знайдено
+        """
+        handler = self.resolve(call)
+        if handler is None:
+            return False
+        await handler(call)
+        return True
+
+    def attach(self, bot):
+        """Зареєструвати маршрутизатор в боті (AsyncTeleBot або ThreadedBotApi) як єдиний обробник callback_query."""
+        bot.register_callback_query_handler(self.dispatch, func=lambda call: True)
+
+    def __len__(self) -> int:
+        """Кількість зареєстрованих маршрутів."""
+        count = sum(len(routes) for routes in self._exact.values())
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            count += len(node.routes)
+            stack.extend(node.children.values())
+        return count
+
+
+# Спільний маршрутизатор бота (підключається в bot.init_bot)
+callback_router = CallbackRouter()
+
+
+def _benchmark(handler_counts=(10, 40, 160, 640), iterations: int = 20000):
+    """Середній час вибору обробника: лінійний перебір предикатів (як у telebot) vs CallbackRouter."""
+    import time
+    from types import SimpleNamespace
+
+    def handler(call):
+        pass
+
+    print(f"{'handlers':>8} {'linear, us':>11} {'router, us':>11}", flush=True)
+    for count in handler_counts:
+        router = CallbackRouter()
+        predicates = []
+        # Половина - точні значення, половина - префікси, як у handlers/
+        for index in range(count // 2):
+            value = f'action_{index}'
+            prefix = f'item_{index}_'
+            router.exact(value)(handler)
+            router.prefix(prefix)(handler)
+            predicates.append(lambda call, value=value: call.data == value)
+            predicates.append(lambda call, prefix=prefix: call.data.startswith(prefix))
+
+        calls = [SimpleNamespace(data=f'action_{index}') for index in range(0, count // 2, 3)]
+        calls += [SimpleNamespace(data=f'item_{index}_{index * 7}') for index in range(0, count // 2, 3)]
+
+        start = time.perf_counter()
+        for _ in range(iterations // len(calls) + 1):
+            for call in calls:
+                next(predicate for predicate in predicates if predicate(call))
+        linear = (time.perf_counter() - start) / ((iterations // len(calls) + 1) * len(calls))
+
+        start = time.perf_counter()
+        for _ in range(iterations // len(calls) + 1):
+            for call in calls:
+                router.resolve(call)
+        routed = (time.perf_counter() - start) / ((iterations // len(calls) + 1) * len(calls))
+
+        print(f"{count:>8} {linear * 1e6:>11.2f} {routed * 1e6:>11.2f}", flush=True)
+
+
+if __name__ == '__main__':
+    _benchmark()
@@ -4,10 +4,12 @@ Currency conversion utilities with caching and multiple sources.
 Supports UAH, USD, EUR conversions.
 """
 
+import threading
+import time
 import requests
 from datetime import datetime, timedelta
-from threading import Lock
-from typing import Dict, Optional
+from threading import Event, Lock
+from typing import Dict, Iterable, Optional
 from locales.locale_manager import get_text
 
 # Cache для курсів валют
@@ -15,6 +17,24 @@ _rate_cache: Dict[str, Dict] = {}
 _cache_lock = Lock()
 _cache_duration = timedelta(hours=1)
 
+# Фонове оновлення: курси оновлюються заздалегідь, до закінчення кешу,
+# а обробники ніколи не чекають на мережу (stale-while-revalidate)
+_refresh_ahead = timedelta(minutes=10)
+_refresh_retry_interval = timedelta(minutes=5)
+_refresh_lock = Lock()
+_refresher_stop = Event()
+_refresher_thread: Optional[threading.Thread] = None
+
+_refresh_stats = {
+    'refresh_count': 0,
+    'failure_count': 0,
+    'consecutive_failures': 0,
+    'last_source': None,
+    'last_latency': None,
+    'last_attempt_at': None,
+    'last_success_at': None,
+}
+
 # Фіксовані курси як fallback (оновлено 2025-11-30)
 FALLBACK_RATES = {
     'UAH': {
@@ -35,16 +55,6 @@ FALLBACK_RATES = {
 }
 
 
-def _get_cached_rates() -> Optional[Dict[str, Dict]]:
-    """Отримати курси з кешу, якщо вони не застаріли."""
-    with _cache_lock:
-        if _rate_cache.get('timestamp'):
-            cache_time = _rate_cache['timestamp']
-            if datetime.now() - cache_time < _cache_duration:
-                return _rate_cache.get('rates')
-    return None
-
-
 def _set_cached_rates(rates: Dict[str, Dict]):
     """Зберегти курси в кеш."""
     with _cache_lock:
@@ -52,52 +62,87 @@ def _set_cached_rates(rates: Dict[str, Dict]):
         _rate_cache['timestamp'] = datetime.now()
 
 
+NBU_RATES_URL = 'https://bank.gov.ua/NBUStatService/v1/statdirectory/exchange?json'
+EXCHANGERATE_API_URL = 'https://api.exchangerate-api.com/v4/latest/USD'
+RATES_FETCH_TIMEOUT = 5
+
+
+def _rates_from_nbu_data(data) -> Optional[Dict[str, Dict]]:
+    """Курси відносно UAH з відповіді API НБУ (None, якщо немає USD чи EUR)."""
+    usd_rate = None
+    eur_rate = None
+    
+    for item in data:
+        if item['cc'] == 'USD':
+            usd_rate = float(item['rate'])
+        elif item['cc'] == 'EUR':
+            eur_rate = float(item['rate'])
+    
+    if usd_rate and eur_rate:
+        return {
+            'UAH': {
+                'UAH': 1.0,
+                'USD': 1.0 / usd_rate,
+                'EUR': 1.0 / eur_rate,
+            },
+            'USD': {
+                'UAH': usd_rate,
+                'USD': 1.0,
+                'EUR': usd_rate / eur_rate,
+            },
+            'EUR': {
+                'UAH': eur_rate,
+                'USD': eur_rate / usd_rate,
+                'EUR': 1.0,
+            }
+        }
+    return None
+
+
 def _fetch_rates_from_nbu() -> Optional[Dict[str, Dict]]:
     """
     Отримати курси з API НБУ (Національний банк України).
     Повертає курси відносно UAH.
     """
     try:
-        url = 'https://bank.gov.ua/NBUStatService/v1/statdirectory/exchange?json'
-        response = requests.get(url, timeout=5)
+        response = requests.get(NBU_RATES_URL, timeout=RATES_FETCH_TIMEOUT)
         
         if response.status_code == 200:
-            data = response.json()
-            
-            usd_rate = None
-            eur_rate = None
-            
-            for item in data:
-                if item['cc'] == 'USD':
-                    usd_rate = float(item['rate'])
-                elif item['cc'] == 'EUR':
-                    eur_rate = float(item['rate'])
-            
-            if usd_rate and eur_rate:
-                rates = {
-                    'UAH': {
-                        'UAH': 1.0,
-                        'USD': 1.0 / usd_rate,
-                        'EUR': 1.0 / eur_rate,
-                    },
-                    'USD': {
-                        'UAH': usd_rate,
-                        'USD': 1.0,
-                        'EUR': usd_rate / eur_rate,
-                    },
-                    'EUR': {
-                        'UAH': eur_rate,
-                        'USD': eur_rate / usd_rate,
-                        'EUR': 1.0,
-                    }
-                }
-                return rates
+            return _rates_from_nbu_data(response.json())
     except Exception as e:
         print(f"[!] Error fetching rates from NBU: {e}")
     
     return None
 
 
+def _rates_from_exchangerate_data(data) -> Optional[Dict[str, Dict]]:
+    """Курси з відповіді ExchangeRate-API (база USD; None, якщо немає UAH чи EUR)."""
+    rates_usd = data.get('rates', {})
+    
+    uah_rate = rates_usd.get('UAH')
+    eur_rate = rates_usd.get('EUR')
+    
+    if uah_rate and eur_rate:
+        return {
+            'UAH': {
+                'UAH': 1.0,
+                'USD': 1.0 / uah_rate,
+                'EUR': eur_rate / uah_rate,
+            },
+            'USD': {
+                'UAH': uah_rate,
+                'USD': 1.0,
+                'EUR': eur_rate,
+            },
+            'EUR': {
+                'UAH': uah_rate / eur_rate,
+                'USD': 1.0 / eur_rate,
+                'EUR': 1.0,
+            }
+        }
+    return None
+
+
 def _fetch_rates_from_exchangerate_api() -> Optional[Dict[str, Dict]]:
     """
     Отримати курси з ExchangeRate-API.
@@ -105,75 +150,291 @@ def _fetch_rates_from_exchangerate_api() -> Optional[Dict[str, Dict]]:
     """
     try:
         # Використовуємо USD як базову валюту
-        url = 'https://api.exchangerate-api.com/v4/latest/USD'
-        response = requests.get(url, timeout=5)
+        response = requests.get(EXCHANGERATE_API_URL, timeout=RATES_FETCH_TIMEOUT)
         
         if response.status_code == 200:
-            data = response.json()
-            rates_usd = data.get('rates', {})
-            
-            uah_rate = rates_usd.get('UAH')
-            eur_rate = rates_usd.get('EUR')
-            
-            if uah_rate and eur_rate:
-                rates = {
-                    'UAH': {
-                        'UAH': 1.0,
-                        'USD': 1.0 / uah_rate,
-                        'EUR': eur_rate / uah_rate,
-                    },
-                    'USD': {
-                        'UAH': uah_rate,
-                        'USD': 1.0,
-                        'EUR': eur_rate,
-                    },
-                    'EUR': {
-                        'UAH': uah_rate / eur_rate,
-                        'USD': 1.0 / eur_rate,
-                        'EUR': 1.0,
-                    }
-                }
-                return rates
+            return _rates_from_exchangerate_data(response.json())
     except Exception as e:
         print(f"[!] Error fetching rates from ExchangeRate-API: {e}")
     
     return None
 
 
-def get_exchange_rates() -> Dict[str, Dict]:
+def _get_cache_age() -> Optional[timedelta]:
+    """Вік курсів у кеші або None, якщо кеш порожній."""
+    with _cache_lock:
+        cache_time = _rate_cache.get('timestamp')
+    if cache_time is None:
+        return None
+    return datetime.now() - cache_time
+
+
+def _persist_rates(rates: Dict[str, Dict], source: str):
+    """Зберегти курси в таблицю exchange_rates (для старту бота без мережі)."""
+    from database import save_exchange_rates
+    
+    try:
+        save_exchange_rates(rates, source)
+    except Exception as e:
+        print(f"[!] Could not persist exchange rates: {e}", flush=True)
+
+
+def load_rates_from_db() -> bool:
     """
-    Отримати актуальні курси валют з кешу або API.
-    Спочатку перевіряє кеш, потім NBU, потім ExchangeRate-API,
-    якщо всі джерела недоступні - повертає фіксовані курси.
+    Заповнити кеш останніми збереженими курсами (при старті бота),
+    щоб не чекати першого завантаження з мережі. Час кешу - час збереження
+    курсів, тому застарілі курси будуть оновлені фоновим потоком.
     
     Returns:
-        Dict з курсами у форматі: {'UAH': {'USD': rate, 'EUR': rate, ...}, ...}
+        True якщо курси завантажено
     """
-    # Спробувати отримати з кешу
-    cached = _get_cached_rates()
-    if cached:
-        return cached
+    from database import get_latest_exchange_rates
+    
+    try:
+        latest = get_latest_exchange_rates()
+    except Exception as e:
+        print(f"[!] Could not load exchange rates from DB: {e}", flush=True)
+        return False
+    
+    if latest is None:
+        return False
+    
+    rates, saved_at = latest
+    with _cache_lock:
+        if _rate_cache.get('rates'):
+            return False
+        _rate_cache['rates'] = rates
+        _rate_cache['timestamp'] = saved_at
+    
+    print(f"[OK] Exchange rates loaded from DB (saved {saved_at:%Y-%m-%d %H:%M})", flush=True)
+    return True
+
+
+def _record_refresh(rates: Optional[Dict[str, Dict]], source: Optional[str], latency: float):
+    """Оновити метрики, кеш та таблицю exchange_rates за результатом завантаження курсів."""
+    now = datetime.now()
+    
+    with _cache_lock:
+        _refresh_stats['last_attempt_at'] = now
+        _refresh_stats['last_latency'] = latency
+        if rates:
+            _refresh_stats['refresh_count'] += 1
+            _refresh_stats['consecutive_failures'] = 0
+            _refresh_stats['last_source'] = source
+            _refresh_stats['last_success_at'] = now
+        else:
+            _refresh_stats['failure_count'] += 1
+            _refresh_stats['consecutive_failures'] += 1
     
-    # Спробувати отримати з НБУ
-    rates = _fetch_rates_from_nbu()
     if rates:
         _set_cached_rates(rates)
-        print("[OK] Exchange rates fetched from NBU")
+        _persist_rates(rates, source)
+        print(f"[OK] Exchange rates fetched from {source} in {latency:.2f}s", flush=True)
+    else:
+        print(f"[!] Exchange rates refresh failed after {latency:.2f}s", flush=True)
+
+
+def refresh_exchange_rates() -> Optional[Dict[str, Dict]]:
+    """
+    Синхронно завантажити курси (NBU, потім ExchangeRate-API) та оновити кеш.
+    Одночасно виконується лише одне оновлення.
+    
+    Returns:
+        Нові курси або None, якщо оновлення вже йде чи всі джерела недоступні
+    """
+    if not _refresh_lock.acquire(blocking=False):
+        return None
+    
+    try:
+        started = time.monotonic()
+        source = None
+        
+        rates = _fetch_rates_from_nbu()
+        if rates:
+            source = 'NBU'
+        else:
+            rates = _fetch_rates_from_exchangerate_api()
+            if rates:
+                source = 'ExchangeRate-API'
+        
+        _record_refresh(rates, source, time.monotonic() - started)
         return rates
+    finally:
+        _refresh_lock.release()
+
+
+async def _fetch_rates_async(session, name: str, url: str, parse) -> Optional[Dict[str, Dict]]:
+    """Завантажити та розібрати курси одного джерела через aiohttp."""
+    import aiohttp
     
-    # Спробувати отримати з ExchangeRate-API
-    rates = _fetch_rates_from_exchangerate_api()
-    if rates:
-        _set_cached_rates(rates)
-        print("[OK] Exchange rates fetched from ExchangeRate-API")
+    try:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=RATES_FETCH_TIMEOUT)) as response:
+            if response.status == 200:
+                return parse(await response.json(content_type=None))
+    except Exception as e:
+        print(f"[!] Error fetching rates from {name}: {e}")
+    
+    return None
+
+
+async def refresh_exchange_rates_async(session) -> Optional[Dict[str, Dict]]:
+    """
+    Асинхронний варіант refresh_exchange_rates для BOT_RUNTIME=asyncio.
+    Обидва джерела запитуються одночасно (пріоритет - НБУ), тому недоступне
+    НБУ не додає свій тайм-аут до часу оновлення. Запис у БД - в пулі потоків.
+    
+    Args:
+        session: aiohttp.ClientSession
+    
+    Returns:
+        Нові курси або None, якщо оновлення вже йде чи всі джерела недоступні
+    """
+    import asyncio
+    
+    if not _refresh_lock.acquire(blocking=False):
+        return None
+    
+    try:
+        started = time.monotonic()
+        nbu_rates, exchangerate_rates = await asyncio.gather(
+            _fetch_rates_async(session, 'NBU', NBU_RATES_URL, _rates_from_nbu_data),
+            _fetch_rates_async(session, 'ExchangeRate-API', EXCHANGERATE_API_URL, _rates_from_exchangerate_data),
+        )
+        if nbu_rates:
+            rates, source = nbu_rates, 'NBU'
+        elif exchangerate_rates:
+            rates, source = exchangerate_rates, 'ExchangeRate-API'
+        else:
+            rates, source = None, None
+        
+        await asyncio.get_running_loop().run_in_executor(
+            None, _record_refresh, rates, source, time.monotonic() - started
+        )
         return rates
+    finally:
+        _refresh_lock.release()
+
+
+def _trigger_background_refresh():
+    """Запустити одноразове оновлення курсів у фоні, якщо воно ще не йде."""
+    if _refresh_lock.locked():
+        return
+    
+    # Після невдалого оновлення не смикаємо джерела частіше за інтервал повтору
+    with _cache_lock:
+        last_attempt = _refresh_stats['last_attempt_at']
+        failing = _refresh_stats['consecutive_failures'] > 0
+    if failing and datetime.now() - last_attempt < _refresh_retry_interval:
+        return
+    
+    threading.Thread(target=refresh_exchange_rates, name='rates-refresh', daemon=True).start()
+
+
+def _refresher_loop():
+    """Цикл фонового оновлення: оновлює курси до закінчення кешу."""
+    while not _refresher_stop.is_set():
+        age = _get_cache_age()
+        refresh_at = _cache_duration - _refresh_ahead
+        
+        if age is None or age >= refresh_at:
+            if refresh_exchange_rates() is None:
+                # Джерела недоступні (або оновлення вже йде) - повторюємо раніше
+                _refresher_stop.wait(_refresh_retry_interval.total_seconds())
+                continue
+            age = timedelta(0)
+        
+        _refresher_stop.wait(max((refresh_at - age).total_seconds(), 1.0))
+
+
+def start_rate_refresher():
+    """Запустити фоновий потік оновлення курсів (при старті бота)."""
+    global _refresher_thread
+    
+    if _refresher_thread is not None and _refresher_thread.is_alive():
+        return
+    
+    load_rates_from_db()
+    _refresher_stop.clear()
+    _refresher_thread = threading.Thread(target=_refresher_loop, name='rates-refresher', daemon=True)
+    _refresher_thread.start()
+
+
+def stop_rate_refresher():
+    """Зупинити фоновий потік оновлення курсів."""
+    _refresher_stop.set()
+
+
+async def run_rate_refresher_async():
+    """
+    Цикл фонового оновлення курсів для BOT_RUNTIME=asyncio (замість потоку
+    start_rate_refresher). Зупиняється скасуванням задачі.
+    """
+    import asyncio
+    import aiohttp
+    
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, load_rates_from_db)
+    
+    async with aiohttp.ClientSession() as session:
+        while True:
+            age = _get_cache_age()
+            refresh_at = _cache_duration - _refresh_ahead
+            
+            if age is None or age >= refresh_at:
+                if await refresh_exchange_rates_async(session) is None:
+                    await asyncio.sleep(_refresh_retry_interval.total_seconds())
+                    continue
+                age = timedelta(0)
+            
+            await asyncio.sleep(max((refresh_at - age).total_seconds(), 1.0))
+
+
+def get_rate_refresh_stats() -> Dict:
+    """
+    Метрики фонового оновлення курсів.
+    
+    Returns:
+        Dict: refresh_count, failure_count, consecutive_failures, last_source,
+        last_latency (сек), last_attempt_at, last_success_at,
+        staleness (вік курсів у кеші, сек; None якщо кеш порожній)
+    """
+    age = _get_cache_age()
+    with _cache_lock:
+        stats = dict(_refresh_stats)
+    stats['staleness'] = age.total_seconds() if age is not None else None
+    return stats
+
+
+def has_loaded_rates() -> bool:
+    """Чи є в кеші завантажені курси (False - get_exchange_rates() віддає FALLBACK_RATES)."""
+    with _cache_lock:
+        return bool(_rate_cache.get('rates'))
+
+
+def get_exchange_rates() -> Dict[str, Dict]:
+    """
+    Отримати курси валют без очікування мережі.
+    Повертає курси з кешу, навіть застарілі (stale-while-revalidate), і запускає
+    фонове оновлення, якщо кеш наближається до закінчення. Якщо кеш порожній -
+    повертає фіксовані курси, поки фонове оновлення не завантажить актуальні.
+    
+    Returns:
+        Dict з курсами у форматі: {'UAH': {'USD': rate, 'EUR': rate, ...}, ...}
+    """
+    with _cache_lock:
+        cached = _rate_cache.get('rates')
+        cache_time = _rate_cache.get('timestamp')
+    
+    if cached:
+        if datetime.now() - cache_time >= _cache_duration - _refresh_ahead:
+            _trigger_background_refresh()
+        return cached
     
-    # Використати фіксовані курси
-    print("[!] Using fallback exchange rates")
+    _trigger_background_refresh()
     return FALLBACK_RATES
 
 
-def convert_currency(amount: float, from_currency: str, to_currency: str) -> float:
+def convert_currency(amount: float, from_currency: str, to_currency: str, rates: Optional[Dict[str, Dict]] = None) -> float:
     """
     Конвертувати суму з однієї валюти в іншу.
     
@@ -181,6 +442,7 @@ def convert_currency(amount: float, from_currency: str, to_currency: str) -> flo
         amount: Сума для конвертації
         from_currency: Валюта джерела ('UAH', 'USD', 'EUR')
         to_currency: Цільова валюта ('UAH', 'USD', 'EUR')
+        rates: Знімок курсів (опціонально, за замовчуванням - get_exchange_rates())
     
     Returns:
         Сконвертована сума
@@ -192,7 +454,8 @@ def convert_currency(amount: float, from_currency: str, to_currency: str) -> flo
     if from_currency == to_currency:
         return amount
     
-    rates = get_exchange_rates()
+    if rates is None:
+        rates = get_exchange_rates()
     
     try:
         rate = rates[from_currency][to_currency]
@@ -202,6 +465,58 @@ def convert_currency(amount: float, from_currency: str, to_currency: str) -> flo
         return amount
 
 
+def get_conversion_factors(
+    currencies: Iterable[str],
+    to_currency: str,
+    rates: Optional[Dict[str, Dict]] = None
+) -> Dict[str, Optional[float]]:
+    """
+    Знайти курс у цільову валюту для кожної валюти з набору (один знімок курсів).
+    
+    Args:
+        currencies: Валюти джерела (можуть повторюватись)
+        to_currency: Цільова валюта
+        rates: Знімок курсів (опціонально, за замовчуванням - get_exchange_rates())
+    
+    Returns:
+        Dict[str, Optional[float]]: {валюта: курс}; None - конвертація не потрібна
+                                    (та сама валюта) або курс невідомий
+    
+    Example:
+        >>> get_conversion_factors(['USD', 'UAH', 'USD'], 'UAH')
+        {'UAH': None, 'USD': 41.5}
+    """
+    factors = {to_currency: None}
+    
+    for currency in currencies:
+        if currency not in factors:
+            if rates is None:
+                rates = get_exchange_rates()
+            try:
+                factors[currency] = rates[currency][to_currency]
+            except KeyError:
+                print(f"[!] Currency conversion error: {currency} -> {to_currency}")
+                factors[currency] = None
+    
+    return factors
+
+
+def get_rates_snapshot(currencies, to_currency: str) -> Optional[Dict[str, Dict]]:
+    """
+    Отримати один знімок курсів для серії конвертацій.
+    
+    Args:
+        currencies: Валюти, з яких буде конвертація
+        to_currency: Цільова валюта
+    
+    Returns:
+        Курси або None, якщо всі валюти вже збігаються з цільовою
+    """
+    if any(currency != to_currency for currency in currencies):
+        return get_exchange_rates()
+    return None
+
+
 def get_currency_symbol(currency: str) -> str:
     """
     Отримати символ валюти.
@@ -273,6 +588,7 @@ def get_rate_info(user_id: int = None) -> str:
 if __name__ == '__main__':
     print("Testing currency converter...")
     
+    refresh_exchange_rates()
     rates = get_exchange_rates()
     print("\nCurrent rates:")
     for from_curr, to_rates in rates.items():
@@ -4,7 +4,9 @@
 Працюють з моделями Income та Expense.
 """
 
+import html
 from typing import Dict, List
+from config.constants import TRANSACTION_DESCRIPTION_PREVIEW
 from locales import get_text, translate_category_name
 from models import Income, Expense
 
@@ -21,7 +23,7 @@ def format_income_list(data: dict, period_name: str, user_id: int = None) -> str
     Returns:
         str: Відформатований текст
     """
-    from utils.currency_converter import get_currency_symbol, convert_currency
+    from utils.currency_converter import get_currency_symbol, convert_currency, get_rates_snapshot
     
     msg = get_text('view_incomes_title', user_id=user_id).format(period_name)
     
@@ -30,6 +32,7 @@ def format_income_list(data: dict, period_name: str, user_id: int = None) -> str
     currency = data.get('currency', 'UAH')
     currency_symbol = get_currency_symbol(currency)
     by_currency = data.get('by_currency', {})
+    rates = get_rates_snapshot(by_currency, currency)
     
     # Показуємо категорії з оригінальними валютами
     for category_name, currencies in aggregated_by_category_currency.items():
@@ -41,7 +44,7 @@ def format_income_list(data: dict, period_name: str, user_id: int = None) -> str
             for curr, amount in sorted(currencies.items()):
                 curr_symbol = get_currency_symbol(curr)
                 if curr != currency:
-                    converted = convert_currency(amount, curr, currency)
+                    converted = convert_currency(amount, curr, currency, rates=rates)
                     msg += f"  • {amount:.2f} {curr_symbol} <i>(≈ {converted:.2f} {currency_symbol})</i>\n"
                 else:
                     msg += f"  • {amount:.2f} {curr_symbol}\n"
@@ -75,7 +78,7 @@ def format_expense_list(data: dict, period_name: str, user_id: int = None) -> st
     Returns:
         str: Відформатований текст
     """
-    from utils.currency_converter import get_currency_symbol, convert_currency
+    from utils.currency_converter import get_currency_symbol, convert_currency, get_rates_snapshot
     
     msg = get_text('view_expenses_title', user_id=user_id).format(period_name)
     
@@ -84,6 +87,7 @@ def format_expense_list(data: dict, period_name: str, user_id: int = None) -> st
     currency = data.get('currency', 'UAH')
     currency_symbol = get_currency_symbol(currency)
     by_currency = data.get('by_currency', {})
+    rates = get_rates_snapshot(by_currency, currency)
     
     # Показуємо категорії з оригінальними валютами
     for category_name, currencies in aggregated_by_category_currency.items():
@@ -95,7 +99,7 @@ def format_expense_list(data: dict, period_name: str, user_id: int = None) -> st
             for curr, amount in sorted(currencies.items()):
                 curr_symbol = get_currency_symbol(curr)
                 if curr != currency:
-                    converted = convert_currency(amount, curr, currency)
+                    converted = convert_currency(amount, curr, currency, rates=rates)
                     msg += f"  • {amount:.2f} {curr_symbol} <i>(≈ {converted:.2f} {currency_symbol})</i>\n"
                 else:
                     msg += f"  • {amount:.2f} {curr_symbol}\n"
@@ -117,6 +121,42 @@ def format_expense_list(data: dict, period_name: str, user_id: int = None) -> st
     return msg
 
 
+def format_transactions_page(transactions: List, category_names: Dict[str, str], transaction_type: str,
+                             period_name: str, user_id: int = None) -> str:
+    """
+    Форматує сторінку транзакцій (доходів або витрат) для відображення.
+    
+    Args:
+        transactions: Записи TransactionRecord однієї сторінки (get_incomes_page / get_expenses_page)
+        category_names: Словник {category_id: name}
+        transaction_type: 'income' або 'expense'
+        period_name: Назва періоду для відображення
+        user_id: ID користувача для локалізації
+    
+    Returns:
+        str: Відформатований текст
+    """
+    from utils.currency_converter import get_currency_symbol
+    
+    msg = get_text(f'view_{transaction_type}s_transactions_title', user_id=user_id).format(period_name)
+    if not transactions:
+        return msg + get_text('view_transactions_page_empty', user_id=user_id)
+    
+    emoji = '💰' if transaction_type == 'income' else '💸'
+    for transaction in transactions:
+        category_name = category_names.get(transaction.category_id) or get_text('unknown_category', user_id=user_id)
+        category_display = html.escape(translate_category_name(category_name, user_id=user_id))
+        msg += (f"{emoji} {transaction.add_date[:16]} • {category_display}: "
+                f"<b>{transaction.amount:.2f} {get_currency_symbol(transaction.currency)}</b>\n")
+        if transaction.description:
+            description = transaction.description
+            if len(description) > TRANSACTION_DESCRIPTION_PREVIEW:
+                description = description[:TRANSACTION_DESCRIPTION_PREVIEW].rstrip() + '…'
+            msg += f"    <i>{html.escape(description)}</i>\n"
+    
+    return msg
+
+
 def format_amount(amount: float, currency: str = 'UAH') -> str:
     """
     Форматує суму з валютою.
@@ -184,7 +224,7 @@ def _format_currency_amounts(by_currency: dict) -> str:
     return " + ".join(parts)
 
 
-def _calculate_balance_with_conversion(income_by_currency: dict, expense_by_currency: dict, user_currency: str) -> tuple:
+def _calculate_balance_with_conversion(income_by_currency: dict, expense_by_currency: dict, user_currency: str, rates: dict = None) -> tuple:
     """
     Розраховує баланс по кожній валюті та загальний конвертований баланс.
     
@@ -207,7 +247,7 @@ def _calculate_balance_with_conversion(income_by_currency: dict, expense_by_curr
         balance_parts.append(f"{sign}{balance_in_curr:.2f} {curr_symbol}")
         
         # Конвертуємо для орієнтовного підрахунку
-        converted = convert_currency(balance_in_curr, curr, user_currency) if curr != user_currency else balance_in_curr
+        converted = convert_currency(balance_in_curr, curr, user_currency, rates=rates) if curr != user_currency else balance_in_curr
         total_balance_converted += converted
     
     return " ".join(balance_parts), total_balance_converted
@@ -226,7 +266,7 @@ def format_general_finances(incomes_data: dict, expenses_data: dict, period_name
     Returns:
         str: Відформатований текст
     """
-    from utils.currency_converter import get_currency_symbol, convert_currency
+    from utils.currency_converter import get_currency_symbol, convert_currency, get_rates_snapshot
     
     # Розбивка по валютах (оригінальні суми)
     income_by_currency = incomes_data.get('by_currency', {})
@@ -241,6 +281,7 @@ def format_general_finances(incomes_data: dict, expenses_data: dict, period_name
     # Перевіряємо чи є кілька валют
     all_currencies = set(list(income_by_currency.keys()) + list(expense_by_currency.keys()))
     has_multiple_currencies = len(all_currencies) > 1 or (len(all_currencies) == 1 and user_currency not in all_currencies)
+    rates = get_rates_snapshot(all_currencies, user_currency)
     
     # Доходи
     if has_multiple_currencies and income_by_currency:
@@ -249,7 +290,7 @@ def format_general_finances(incomes_data: dict, expenses_data: dict, period_name
             amount = income_by_currency[curr]
             curr_symbol = get_currency_symbol(curr)
             if curr != user_currency:
-                converted = convert_currency(amount, curr, user_currency)
+                converted = convert_currency(amount, curr, user_currency, rates=rates)
                 msg += f"  • {amount:.2f} {curr_symbol} <i>(≈ {converted:.2f} {user_currency_symbol})</i>\n"
             else:
                 msg += f"  • {amount:.2f} {curr_symbol}\n"
@@ -267,7 +308,7 @@ def format_general_finances(incomes_data: dict, expenses_data: dict, period_name
             amount = expense_by_currency[curr]
             curr_symbol = get_currency_symbol(curr)
             if curr != user_currency:
-                converted = convert_currency(amount, curr, user_currency)
+                converted = convert_currency(amount, curr, user_currency, rates=rates)
                 msg += f"  • {amount:.2f} {curr_symbol} <i>(≈ {converted:.2f} {user_currency_symbol})</i>\n"
             else:
                 msg += f"  • {amount:.2f} {curr_symbol}\n"
@@ -281,7 +322,7 @@ def format_general_finances(incomes_data: dict, expenses_data: dict, period_name
     # Баланс по кожній валюті окремо
     if all_currencies:
         balance_text, total_balance_converted = _calculate_balance_with_conversion(
-            income_by_currency, expense_by_currency, user_currency
+            income_by_currency, expense_by_currency, user_currency, rates=rates
         )
         
         if has_multiple_currencies:
@@ -295,7 +336,7 @@ def format_general_finances(incomes_data: dict, expenses_data: dict, period_name
                 sign = "+" if balance_in_curr >= 0 else ""
                 
                 if curr != user_currency:
-                    converted = convert_currency(balance_in_curr, curr, user_currency)
+                    converted = convert_currency(balance_in_curr, curr, user_currency, rates=rates)
                     msg += f"  • {sign}{balance_in_curr:.2f} {curr_symbol} <i>(≈ {converted:+.2f} {user_currency_symbol})</i>\n"
                 else:
                     msg += f"  • {sign}{balance_in_curr:.2f} {curr_symbol}\n"
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Спільна основа обробників для обох середовищ виконання (BOT_RUNTIME).
+
+Обробники в handlers/ - корутини: Bot API викликається через await bot.<метод>,
+а блокуючі виклики (SQLite, рендеринг Jinja) - через await run_blocking(...).
+
+- asyncio: bot - AsyncTeleBot (aiohttp), обробники виконуються в циклі подій,
+  run_blocking передає функцію в пул потоків (utils/async_runtime.py).
+- threaded: bot - ThreadedBotApi над синхронним TeleBot. Корутина обробника
+  виконується до кінця в потоці TeleBot (run_coroutine), а run_blocking
+  викликає функцію напряму.
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import Executor
+from typing import Callable, Optional
+
+from telebot import apihelper
+
+_blocking_executor: Optional[Executor] = None
+_thread_local = threading.local()
+
+
+def _telegram_api_errors() -> tuple:
+    errors = [apihelper.ApiTelegramException]
+    try:
+        # AsyncTeleBot кидає власний ApiTelegramException (модуль потребує aiohttp)
+        from telebot import asyncio_helper
+        errors.append(asyncio_helper.ApiTelegramException)
+    except ImportError:
+        pass
+    return tuple(errors)
+
+
+# Помилки Bot API обох середовищ: except TELEGRAM_API_ERRORS
+TELEGRAM_API_ERRORS = _telegram_api_errors()
+
+
+def use_blocking_executor(executor: Optional[Executor]):
+    """Встановити пул для run_blocking (None - виконувати блокуючі виклики напряму)."""
+    global _blocking_executor
+    _blocking_executor = executor
+
+
+def in_async_runtime() -> bool:
+    """Чи працюють обробники в циклі подій asyncio (BOT_RUNTIME=asyncio)."""
+    return _blocking_executor is not None
+
+
+async def run_blocking(func: Callable, *args, **kwargs):
+    """
+    Виконати блокуючу функцію (SQLite, рендеринг) з обробника.
+
+    У середовищі asyncio функція виконується в пулі потоків, тому цикл подій
+    не чекає на неї; у threaded - викликається напряму в потоці обробника.
+    """
+    if _blocking_executor is None:
+        return func(*args, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_blocking_executor, functools.partial(func, *args, **kwargs))
+
+
+def run_coroutine(coroutine):
+    """Виконати корутину до кінця в поточному потоці (власний цикл подій потоку)."""
+    loop = getattr(_thread_local, 'loop', None)
+    if loop is None:
+        loop = _thread_local.loop = asyncio.new_event_loop()
+    return loop.run_until_complete(coroutine)
+
+
+def _sync_handler(handler: Callable) -> Callable:
+    """Синхронна обгортка обробника-корутини для TeleBot."""
+    @functools.wraps(handler)
+    def wrapper(update):
+        return run_coroutine(handler(update))
+    return wrapper
+
+
+class ThreadedBotApi:
+    """
+    Інтерфейс AsyncTeleBot для обробників над синхронним TeleBot (BOT_RUNTIME=threaded).
+
+    Методи Bot API виконуються синхронно в потоці обробника, а обробники-корутини
+    реєструються в TeleBot через синхронні обгортки.
+
+    Attributes:
+        bot: TeleBot, що отримує оновлення
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    def message_handler(self, **kwargs):
+        """Декоратор як TeleBot.message_handler для обробника-корутини."""
+        def decorator(handler):
+            self.bot.register_message_handler(_sync_handler(handler), **kwargs)
+            return handler
+        return decorator
+
+    def register_callback_query_handler(self, callback: Callable, **kwargs):
+        """Як TeleBot.register_callback_query_handler для обробника-корутини."""
+        self.bot.register_callback_query_handler(_sync_handler(callback), **kwargs)
+
+    async def send_message(self, *args, **kwargs):
+        return self.bot.send_message(*args, **kwargs)
+
+    async def edit_message_text(self, *args, **kwargs):
+        return self.bot.edit_message_text(*args, **kwargs)
+
+    async def delete_message(self, *args, **kwargs):
+        return self.bot.delete_message(*args, **kwargs)
+
+    async def answer_callback_query(self, *args, **kwargs):
+        return self.bot.answer_callback_query(*args, **kwargs)
+
+    async def send_document(self, *args, **kwargs):
+        return self.bot.send_document(*args, **kwargs)
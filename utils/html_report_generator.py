@@ -4,14 +4,19 @@ HTML Report Generator - генерація інтерактивних HTML зв
 """
 
 import os
+import io
+import gzip
 import json
 from datetime import datetime
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
-from typing import Dict, List, Optional
-from models import ReportData
+from threading import Lock
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+from typing import Dict, List, Optional, Tuple
+from config.constants import HTML_REPORT_GZIP_THRESHOLD
+from models import ReportData, TransactionColumns
 from locales import get_text, translate_category_name
 from utils.currency_converter import get_currency_symbol
+from utils.template_builder import ensure_report_template
 
 
 class HTMLReportGenerator:
@@ -25,43 +30,54 @@ class HTMLReportGenerator:
             template_dir: Директорія з шаблонами Jinja2
         """
         self.template_dir = Path(template_dir)
-        self.env = Environment(loader=FileSystemLoader(str(self.template_dir)))
-        self.output_dir = Path('reports')
-        self.output_dir.mkdir(exist_ok=True)
+        # Скомпільований байткод шаблонів зберігається між перезапусками (у тимчасовій директорії)
+        self.env = Environment(
+            loader=FileSystemLoader(str(self.template_dir)),
+            bytecode_cache=FileSystemBytecodeCache()
+        )
+        # Мінімізований шаблон (utils.template_builder) збирається один раз, а не на кожен звіт
+        self.template_name = ensure_report_template(str(self.template_dir))
+    
+    def warm_up(self):
+        """Завантажити та скомпілювати шаблон заздалегідь (при старті бота)."""
+        self.env.get_template(self.template_name)
     
-    def generate_report(
+    def render_report(
         self,
         report_data: ReportData,
         user_id: int,
-        lang: str = 'uk'
-    ) -> str:
+        lang: str = 'uk',
+        gzip_threshold: Optional[int] = None
+    ) -> io.BytesIO:
         """
-        Генерує HTML звіт.
+        Генерує HTML звіт у пам'яті (без файлів на диску).
         
         Args:
             report_data: Дані звіту
             user_id: ID користувача
             lang: Мова звіту
+            gzip_threshold: Якщо HTML більший за цей розмір (байт) - стиснути gzip
         
         Returns:
-            str: Шлях до згенерованого HTML файлу
+            io.BytesIO: HTML в UTF-8 (або gzip, тоді атрибут name закінчується на .html.gz),
+                        позиція на початку буфера
         """
         # Підготовка даних для шаблону
         template_data = self._prepare_template_data(report_data, user_id, lang)
         
-        # Рендеринг шаблону
-        template = self.env.get_template('report.html')
-        html_content = template.render(**template_data)
+        # Рендеринг шаблону частинами одразу в буфер, без проміжного рядка всього звіту
+        template = self.env.get_template(self.template_name)
+        buffer = io.BytesIO()
+        for chunk in template.generate(**template_data):
+            buffer.write(chunk.encode('utf-8'))
+        buffer.name = 'report.html'
         
-        # Збереження файлу
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'report_{user_id}_{timestamp}.html'
-        filepath = self.output_dir / filename
+        if gzip_threshold is not None and buffer.tell() > gzip_threshold:
+            buffer = io.BytesIO(gzip.compress(buffer.getvalue(), compresslevel=6))
+            buffer.name = 'report.html.gz'
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        return str(filepath)
+        buffer.seek(0)
+        return buffer
     
     def _prepare_template_data(
         self,
@@ -127,23 +143,31 @@ class HTMLReportGenerator:
             user_id
         )
         
+        # Колонки транзакцій: конвертація та назви категорій рахуються один раз для всіх розділів
+        columns = report.get_columns()
+        converted = columns.converted(report.currency)
+        category_labels = self._get_category_labels(columns, user_id)
+        income_count = len(report.incomes)
+        
         # Детальні дані категорій (з описами)
         data['income_data_detailed'] = self._prepare_detailed_category_data(
-            report.incomes,
-            report.total_income,
-            user_id,
-            report.currency
+            columns.slice(0, income_count),
+            converted[:income_count],
+            category_labels,
+            report.total_income
         )
         
         data['expense_data_detailed'] = self._prepare_detailed_category_data(
-            report.expenses,
-            report.total_expense,
-            user_id,
-            report.currency
+            columns.slice(income_count, len(columns)),
+            converted[income_count:],
+            category_labels,
+            report.total_expense
         )
         
         # Транзакції
-        data['transactions'] = self._prepare_transactions(report, user_id)
+        transactions, transaction_categories = self._prepare_transactions(
+            columns, converted, category_labels, income_count
+        )
         
         # Денна динаміка
         daily_dynamics = self._prepare_daily_dynamics(report)
@@ -173,8 +197,13 @@ class HTMLReportGenerator:
             'start_date': report.start_date,
             'end_date': report.end_date,
             'daily_dynamics': daily_dynamics,
+            'transactions': transactions,
+            'transaction_categories': transaction_categories,
         }
-        data['report_data_json'] = json.dumps(report_data_json, ensure_ascii=False)
+        # Компактний JSON; '<' екранується, щоб опис на кшталт '</script>' не закрив тег скрипта
+        data['report_data_json'] = json.dumps(
+            report_data_json, ensure_ascii=False, separators=(',', ':')
+        ).replace('<', '\\u003c')
         
         return data
     
@@ -277,58 +306,61 @@ class HTMLReportGenerator:
         
         return result
     
+    def _get_category_labels(self, columns: TransactionColumns, user_id: int) -> List[str]:
+        """
+        Перекладені назви категорій для кожного коду категорії колонок.
+        
+        Args:
+            columns: Колонки транзакцій звіту
+            user_id: ID користувача
+        
+        Returns:
+            list: Назва для кожного коду (індекс - код категорії)
+        """
+        from database import CategoryRepository
+        
+        # Назви всіх категорій одним запитом
+        category_names = CategoryRepository.get_category_names(columns.category_ids)
+        unknown_category = get_text('unknown_category', user_id=user_id)
+        return [
+            translate_category_name(category_names.get(category_id) or unknown_category, user_id=user_id)
+            for category_id in columns.category_ids
+        ]
+    
     def _prepare_detailed_category_data(
         self,
-        transactions: List,
-        total: float,
-        user_id: int,
-        report_currency: str = 'UAH'
+        columns: TransactionColumns,
+        converted,
+        category_labels: List[str],
+        total: float
     ) -> Dict[str, Dict]:
         """
         Підготовка детальних даних категорій (з описами транзакцій).
         
         Args:
-            transactions: Список транзакцій (Income або Expense)
+            columns: Колонки доходів або витрат
+            converted: Суми цих транзакцій у валюті звіту
+            category_labels: Перекладені назви категорій за кодом
             total: Загальна сума
-            user_id: ID користувача
-            report_currency: Валюта звіту для конвертації
         
         Returns:
             dict: Детальні дані з описами транзакцій, відсортовані по процентах
         """
-        from database import CategoryRepository
-        from collections import defaultdict
-        from utils.currency_converter import convert_currency
-        
-        # Групуємо транзакції по категоріях
-        grouped = defaultdict(lambda: {'amount': 0.0, 'items': []})
+        # Суми по категоріях рахуються по колонках; категорії з однаковою назвою об'єднуються
+        grouped = {}
+        category_sums = columns.sum_by_category(converted)
+        for code in columns.categories_in_order():
+            group = grouped.setdefault(category_labels[code], {'amount': 0.0, 'items': []})
+            group['amount'] += category_sums[code]
         
-        for transaction in transactions:
-            # Отримуємо назву категорії
-            category = CategoryRepository.get_category_by_id(transaction.category_id)
-            category_name = category.name if category else get_text('unknown_category', user_id=user_id)
-            
-            # Перекладаємо назву категорії
-            translated_category_name = translate_category_name(category_name, user_id=user_id)
-            
-            # Конвертуємо суму у валюту звіту
-            transaction_currency = getattr(transaction, 'currency', 'UAH')
-            converted_amount = convert_currency(
-                transaction.amount,
-                transaction_currency,
-                report_currency
-            )
-            
-            # Додаємо суму (конвертовану)
-            grouped[translated_category_name]['amount'] += converted_amount
-            
-            # Додаємо опис транзакції (якщо є)
+        # Описи транзакцій (оригінальна сума, валюта та повна дата з часом)
+        for transaction, code in zip(columns.records, columns.category_codes.tolist()):
             if transaction.description:
-                grouped[translated_category_name]['items'].append({
+                grouped[category_labels[code]]['items'].append({
                     'description': transaction.description,
-                    'amount': transaction.amount,  # Оригінальна сума
-                    'currency': transaction_currency,  # Оригінальна валюта
-                    'add_date': transaction.add_date  # Повна дата з часом
+                    'amount': transaction.amount,
+                    'currency': transaction.currency,
+                    'add_date': transaction.add_date
                 })
         
         # Підготовка результату з процентами та описами
@@ -350,79 +382,55 @@ class HTMLReportGenerator:
     
     def _prepare_transactions(
         self,
-        report: ReportData,
-        user_id: int
-    ) -> List[Dict]:
+        columns: TransactionColumns,
+        converted,
+        category_labels: List[str],
+        income_count: int
+    ) -> Tuple[List[list], List[str]]:
         """
-        Підготовка списку транзакцій.
+        Підготовка компактного списку транзакцій для таблиці (рендериться в браузері).
         
         Args:
-            report: Дані звіту
-            user_id: ID користувача
+            columns: Колонки транзакцій звіту (спочатку доходи, потім витрати)
+            converted: Суми транзакцій у валюті звіту (для сортування)
+            category_labels: Перекладені назви категорій за кодом
+            income_count: Кількість доходів на початку колонок
         
         Returns:
-            list: Список транзакцій
+            Tuple: (транзакції, назви категорій), де транзакція - список
+                   [дата, 1 для доходу / 0 для витрати, індекс категорії, опис, сума, символ валюти],
+                   відсортований за сумою у валюті звіту (найбільші зверху)
         """
-        from utils.currency_converter import convert_currency
-        transactions = []
-        
-        # Доходи
-        for income in report.incomes:
-            # Отримуємо назву категорії з бази
-            from database import CategoryRepository
-            category = CategoryRepository.get_category_by_id(income.category_id)
-            category_name = category.name if category else get_text('unknown_category', user_id=user_id)
-            
-            # Перекладаємо назву категорії
-            translated_category_name = translate_category_name(category_name, user_id=user_id)
-            
-            # Зберігаємо оригінальну валюту та суму
-            income_currency = getattr(income, 'currency', 'UAH')
-            currency_symbol = self._get_currency_symbol(income_currency)
-            
-            # Конвертуємо для сортування
-            converted_amount = convert_currency(income.amount, income_currency, report.currency)
-            
-            transactions.append({
-                'date': income.add_date.split()[0] if ' ' in income.add_date else income.add_date,
-                'type': 'income',
-                'category': translated_category_name,
-                'description': income.description if income.description else '',
-                'amount': f"{income.amount:.2f}",
-                'currency': currency_symbol,
-                'amount_value': converted_amount  # Числове значення для сортування
-            })
-        
-        # Витрати
-        for expense in report.expenses:
-            # Отримуємо назву категорії
-            category = CategoryRepository.get_category_by_id(expense.category_id)
-            category_name = category.name if category else get_text('unknown_category', user_id=user_id)
-            
-            # Перекладаємо назву категорії
-            translated_category_name = translate_category_name(category_name, user_id=user_id)
-            
-            # Зберігаємо оригінальну валюту та суму
-            expense_currency = getattr(expense, 'currency', 'UAH')
-            currency_symbol = self._get_currency_symbol(expense_currency)
-            
-            # Конвертуємо для сортування
-            converted_amount = convert_currency(expense.amount, expense_currency, report.currency)
-            
-            transactions.append({
-                'date': expense.add_date.split()[0] if ' ' in expense.add_date else expense.add_date,
-                'type': 'expense',
-                'category': translated_category_name,
-                'description': expense.description if expense.description else '',
-                'amount': f"{expense.amount:.2f}",
-                'currency': currency_symbol,
-                'amount_value': converted_amount  # Числове значення для сортування
-            })
+        # Кожна перекладена назва категорії передається один раз, транзакції посилаються на індекс
+        categories = []
+        label_indexes = {}
+        code_indexes = []
+        for label in category_labels:
+            if label not in label_indexes:
+                label_indexes[label] = len(categories)
+                categories.append(label)
+            code_indexes.append(label_indexes[label])
+        
+        currency_symbols = [self._get_currency_symbol(currency) for currency in columns.currencies]
+        records = columns.records
+        category_codes = columns.category_codes.tolist()
+        currency_codes = columns.currency_codes.tolist()
+        rows = []
         
         # Сортування за сумою (найбільші зверху)
-        transactions.sort(key=lambda x: x.get('amount_value', 0), reverse=True)
-        
-        return transactions
+        for position in columns.order_desc(converted):
+            transaction = records[position]
+            add_date = transaction.add_date
+            rows.append([
+                add_date.split()[0] if ' ' in add_date else add_date,
+                1 if position < income_count else 0,
+                code_indexes[category_codes[position]],
+                transaction.description or '',
+                f"{transaction.amount:.2f}",
+                currency_symbols[currency_codes[position]]
+            ])
+        
+        return rows, categories
     
     def _prepare_daily_dynamics(self, report: ReportData) -> List[Dict]:
         """
@@ -445,19 +453,21 @@ class HTMLReportGenerator:
             'expense_by_currency': defaultdict(float)
         })
         
-        # Доходи по днях
-        for income in report.incomes:
-            date_str = income.add_date.split()[0] if ' ' in income.add_date else income.add_date
-            currency = getattr(income, 'currency', 'UAH')
-            daily_data[date_str]['income'] += income.amount
-            daily_data[date_str]['income_by_currency'][currency] += income.amount
-        
-        # Витрати по днях
-        for expense in report.expenses:
-            date_str = expense.add_date.split()[0] if ' ' in expense.add_date else expense.add_date
-            currency = getattr(expense, 'currency', 'UAH')
-            daily_data[date_str]['expense'] += expense.amount
-            daily_data[date_str]['expense_by_currency'][currency] += expense.amount
+        if report.daily_totals is not None:
+            # Денні підсумки вже пораховані в БД (довгі періоди)
+            for date_str, kind, currency, amount in report.daily_totals:
+                daily_data[date_str][kind] += amount
+                daily_data[date_str][f'{kind}_by_currency'][currency] += amount
+        else:
+            # Суми по днях і валютах рахуються по колонках транзакцій
+            columns = report.get_columns()
+            income_count = len(report.incomes)
+            parts = (('income', columns.slice(0, income_count)), ('expense', columns.slice(income_count, len(columns))))
+            for kind, part in parts:
+                for (day, currency), amount in part.sum_by_day_currency().items():
+                    date_str = TransactionColumns.day_to_str(day)
+                    daily_data[date_str][kind] += amount
+                    daily_data[date_str][f'{kind}_by_currency'][currency] += amount
         
         # Конвертуємо в список та сортуємо по даті
         result = []
@@ -487,13 +497,30 @@ class HTMLReportGenerator:
         return result
 
 
-def generate_html_report(
+# Спільний генератор: Environment кешує скомпільовані шаблони між звітами
+_default_generator: Optional[HTMLReportGenerator] = None
+_generator_lock = Lock()
+
+
+def get_report_generator() -> HTMLReportGenerator:
+    """Отримати спільний генератор HTML звітів (створюється один раз)."""
+    global _default_generator
+    
+    if _default_generator is None:
+        with _generator_lock:
+            if _default_generator is None:
+                _default_generator = HTMLReportGenerator()
+    return _default_generator
+
+
+def render_html_report(
     report_data: ReportData,
     user_id: int,
     lang: str = 'uk'
-) -> str:
+) -> io.BytesIO:
     """
-    Функція-обгортка для швидкої генерації HTML звіту.
+    Функція-обгортка для генерації HTML звіту в пам'яті для відправки.
+    Великі звіти (HTML_REPORT_GZIP_THRESHOLD) стискаються gzip.
     
     Args:
         report_data: Дані звіту
@@ -501,7 +528,58 @@ def generate_html_report(
         lang: Мова звіту
     
     Returns:
-        str: Шлях до згенерованого файлу
+        io.BytesIO: Вміст звіту (ім'я файлу - в атрибуті name)
     """
-    generator = HTMLReportGenerator()
-    return generator.generate_report(report_data, user_id, lang)
+    return get_report_generator().render_report(
+        report_data, user_id, lang, gzip_threshold=HTML_REPORT_GZIP_THRESHOLD
+    )
+
+
+# Мікробенчмарк рендерингу: python -m utils.html_report_generator
+if __name__ == '__main__':
+    import time
+    from models import Income, Expense
+    from database import init_db
+    
+    init_db()
+    
+    def build_report(transaction_count: int) -> ReportData:
+        incomes = [Income(user_id=0, amount=100.0 + i, category_id=None, description=f'income {i}')
+                   for i in range(transaction_count // 2)]
+        expenses = [Expense(user_id=0, amount=10.0 + i, category_id=None, description=f'expense {i}')
+                    for i in range(transaction_count // 2)]
+        total_income = sum(t.amount for t in incomes)
+        total_expense = sum(t.amount for t in expenses)
+        return ReportData(
+            user_id=0, period_name='benchmark', start_date='01.01.2025', end_date='31.01.2025',
+            incomes=incomes, expenses=expenses,
+            total_income=total_income, total_expense=total_expense,
+            net_balance=total_income - total_expense,
+            income_by_category={'Інше': total_income}, expense_by_category={'Інше': total_expense},
+            avg_income=0.0, avg_expense=0.0,
+            income_count=len(incomes), expense_count=len(expenses),
+            transaction_count=len(incomes) + len(expenses),
+        )
+    
+    def measure(label: str, func, repeat: int = 5):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        print(f"{label}: {(time.perf_counter() - started) / repeat * 1000:.1f} ms")
+    
+    template_dir = str(get_report_generator().template_dir)
+    measure('compile template (no cache)',
+            lambda: Environment(loader=FileSystemLoader(template_dir)).get_template('report.html'))
+    measure('compile template (bytecode cache)',
+            lambda: HTMLReportGenerator().env.get_template('report.html'))
+    
+    generator = get_report_generator()
+    generator.warm_up()
+    measure('shared generator: get_template', lambda: generator.env.get_template(generator.template_name), repeat=100)
+    
+    for count in (0, 500, 5000):
+        report = build_report(count)
+        template_data = generator._prepare_template_data(report, 0, 'uk')
+        print(f"\n{count} transactions:")
+        measure('prepare data', lambda: generator._prepare_template_data(report, 0, 'uk'))
+        measure('render', lambda: generator.env.get_template(generator.template_name).render(**template_data))
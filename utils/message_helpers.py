@@ -1,11 +1,12 @@
 # -*- coding: utf-8 -*-
 """
 Helper функції для роботи з повідомленнями та inline-клавіатурами.
+Функції, що звертаються до Bot API, - корутини (викликаються через await).
 """
 
 import logging
 from telebot import types
-from telebot.apihelper import ApiTelegramException
+from utils.handler_runtime import TELEGRAM_API_ERRORS
 from keyboards import main_menu, back_button
 from locales import get_text
 
@@ -15,12 +16,12 @@ logger = logging.getLogger(__name__)
 MESSAGE_NOT_MODIFIED = "message is not modified"
 
 
-def send_main_menu(bot, chat_id, text_or_key='back_to_main', message_id=None, user_id=None):
+async def send_main_menu(bot, chat_id, text_or_key='back_to_main', message_id=None, user_id=None):
     """
     Відправити головне меню.
     
     Args:
-        bot: TeleBot instance
+        bot: AsyncTeleBot або ThreadedBotApi (utils/handler_runtime.py)
         chat_id: ID чату
         text_or_key: Текст або ключ локалізації
         message_id: ID повідомлення для редагування (опціонально)
@@ -35,26 +36,26 @@ def send_main_menu(bot, chat_id, text_or_key='back_to_main', message_id=None, us
     
     if message_id:
         try:
-            bot.edit_message_text(
+            await bot.edit_message_text(
                 text,
                 chat_id=chat_id,
                 message_id=message_id,
                 reply_markup=markup
             )
-        except ApiTelegramException as e:
+        except TELEGRAM_API_ERRORS as e:
             if MESSAGE_NOT_MODIFIED not in str(e).lower():
                 logger.warning(f"Failed to edit message in send_main_menu: {e}")
-            bot.send_message(chat_id, text, reply_markup=markup)
+            await bot.send_message(chat_id, text, reply_markup=markup)
     else:
-        bot.send_message(chat_id, text, reply_markup=markup)
+        await bot.send_message(chat_id, text, reply_markup=markup)
 
 
-def send_back_button(bot, chat_id, text, message_id=None):
+async def send_back_button(bot, chat_id, text, message_id=None):
     """
     Відправити повідомлення з кнопкою назад.
     
     Args:
-        bot: TeleBot instance
+        bot: AsyncTeleBot або ThreadedBotApi (utils/handler_runtime.py)
         chat_id: ID чату
         text: Текст повідомлення
         message_id: ID повідомлення для редагування (опціонально)
@@ -63,26 +64,26 @@ def send_back_button(bot, chat_id, text, message_id=None):
     
     if message_id:
         try:
-            bot.edit_message_text(
+            await bot.edit_message_text(
                 text,
                 chat_id=chat_id,
                 message_id=message_id,
                 reply_markup=markup
             )
-        except ApiTelegramException as e:
+        except TELEGRAM_API_ERRORS as e:
             if MESSAGE_NOT_MODIFIED not in str(e).lower():
                 logger.warning(f"Failed to edit message in send_back_button: {e}")
-            bot.send_message(chat_id, text, reply_markup=markup)
+            await bot.send_message(chat_id, text, reply_markup=markup)
     else:
-        bot.send_message(chat_id, text, reply_markup=markup)
+        await bot.send_message(chat_id, text, reply_markup=markup)
 
 
-def send_with_keyboard(bot, chat_id, text, keyboard, message_id=None):
+async def send_with_keyboard(bot, chat_id, text, keyboard, message_id=None):
     """
     Відправити повідомлення з кастомною клавіатурою.
     
     Args:
-        bot: TeleBot instance
+        bot: AsyncTeleBot або ThreadedBotApi (utils/handler_runtime.py)
         chat_id: ID чату
         text: Текст повідомлення
         keyboard: InlineKeyboardMarkup
@@ -90,32 +91,32 @@ def send_with_keyboard(bot, chat_id, text, keyboard, message_id=None):
     """
     if message_id:
         try:
-            bot.edit_message_text(
+            await bot.edit_message_text(
                 text,
                 chat_id=chat_id,
                 message_id=message_id,
                 reply_markup=keyboard
             )
-        except ApiTelegramException as e:
+        except TELEGRAM_API_ERRORS as e:
             if MESSAGE_NOT_MODIFIED not in str(e).lower():
                 logger.warning(f"Failed to edit message: {e}")
-            bot.send_message(chat_id, text, reply_markup=keyboard)
+            await bot.send_message(chat_id, text, reply_markup=keyboard)
     else:
-        bot.send_message(chat_id, text, reply_markup=keyboard)
+        await bot.send_message(chat_id, text, reply_markup=keyboard)
 
 
-def answer_callback(bot, callback_query, text=None, show_alert=False):
+async def answer_callback(bot, callback_query, text=None, show_alert=False):
     """
     Відповісти на callback query.
     
     Args:
-        bot: TeleBot instance
+        bot: AsyncTeleBot або ThreadedBotApi (utils/handler_runtime.py)
         callback_query: CallbackQuery object
         text: Текст відповіді (опціонально)
         show_alert: Показати як alert (True) чи toast (False)
     """
     try:
-        bot.answer_callback_query(
+        await bot.answer_callback_query(
             callback_query.id,
             text=text,
             show_alert=show_alert
@@ -161,25 +162,25 @@ def create_inline_keyboard_from_dict(items_dict, row_width=2, add_back=True):
     return markup
 
 
-def edit_or_send_message(bot, chat_id, message_id, text, reply_markup=None):
+async def edit_or_send_message(bot, chat_id, message_id, text, reply_markup=None):
     """
     Редагувати існуюче повідомлення або відправити нове.
     
     Args:
-        bot: TeleBot instance
+        bot: AsyncTeleBot або ThreadedBotApi (utils/handler_runtime.py)
         chat_id: ID чату
         message_id: ID повідомлення для редагування
         text: Текст повідомлення
         reply_markup: Клавіатура (опціонально)
     """
     try:
-        bot.edit_message_text(
+        await bot.edit_message_text(
             text,
             chat_id=chat_id,
             message_id=message_id,
             reply_markup=reply_markup
         )
-    except ApiTelegramException as e:
+    except TELEGRAM_API_ERRORS as e:
         if MESSAGE_NOT_MODIFIED not in str(e).lower():
             logger.warning(f"Failed to edit message in edit_or_send_message: {e}")
-        bot.send_message(chat_id, text, reply_markup=reply_markup)
+        await bot.send_message(chat_id, text, reply_markup=reply_markup)
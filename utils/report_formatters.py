@@ -3,11 +3,19 @@
 Форматери для звітів та аналізу бюджету.
 """
 
-from typing import Dict
+from typing import Dict, Optional
 from locales import get_text, translate_category_name
 from models import ReportData, PeriodComparison
 
 
+def _get_report_rates(report: ReportData) -> Optional[Dict[str, Dict]]:
+    """Один знімок курсів на весь звіт (None, якщо конвертація не потрібна)."""
+    from utils.currency_converter import get_rates_snapshot
+    
+    currencies = set(report.income_by_currency or {}) | set(report.expense_by_currency or {})
+    return get_rates_snapshot(currencies, report.currency)
+
+
 def format_detailed_report(report: ReportData, user_id: int = None) -> str:
     """
     Форматує детальний звіт для Telegram.
@@ -19,9 +27,10 @@ def format_detailed_report(report: ReportData, user_id: int = None) -> str:
     Returns:
         str: Відформатований текст звіту
     """
-    from utils.currency_converter import get_currency_symbol
+    from utils.currency_converter import get_currency_symbol, convert_currency
     
     currency_symbol = get_currency_symbol(report.currency)
+    rates = _get_report_rates(report)
     
     msg = get_text('report_title', user_id=user_id).format(report.period_name)
     msg += get_text('report_period', user_id=user_id).format(report.start_date, report.end_date)
@@ -45,8 +54,7 @@ def format_detailed_report(report: ReportData, user_id: int = None) -> str:
             if curr == report.currency:
                 msg += f"    • {amount:.2f} {curr_symbol}\n"
             else:
-                from utils.currency_converter import convert_currency
-                converted = convert_currency(amount, curr, report.currency)
+                converted = convert_currency(amount, curr, report.currency, rates=rates)
                 msg += f"    • {amount:.2f} {curr_symbol} <i>(≈ {converted:.2f} {currency_symbol})</i>\n"
     
     # Витрати
@@ -57,8 +65,7 @@ def format_detailed_report(report: ReportData, user_id: int = None) -> str:
             if curr == report.currency:
                 msg += f"    • {amount:.2f} {curr_symbol}\n"
             else:
-                from utils.currency_converter import convert_currency
-                converted = convert_currency(amount, curr, report.currency)
+                converted = convert_currency(amount, curr, report.currency, rates=rates)
                 msg += f"    • {amount:.2f} {curr_symbol} <i>(≈ {converted:.2f} {currency_symbol})</i>\n"
     
     # Баланс з індикатором та розбивкою
@@ -83,8 +90,7 @@ def format_detailed_report(report: ReportData, user_id: int = None) -> str:
                     if curr == report.currency:
                         msg += f"    • {balance_sign_curr}{balance_amt:.2f} {curr_symbol}\n"
                     else:
-                        from utils.currency_converter import convert_currency
-                        converted = convert_currency(abs(balance_amt), curr, report.currency)
+                        converted = convert_currency(abs(balance_amt), curr, report.currency, rates=rates)
                         converted_signed = converted if balance_amt > 0 else -converted
                         msg += f"    • {balance_sign_curr}{balance_amt:.2f} {curr_symbol} <i>(≈ {'+' if converted_signed > 0 else ''}{converted_signed:.2f} {currency_symbol})</i>\n"
     
@@ -118,9 +124,10 @@ def format_category_breakdown(report: ReportData, user_id: int = None, top_n: in
     Returns:
         str: Відформатований текст розбивки
     """
-    from utils.currency_converter import get_currency_symbol
+    from utils.currency_converter import get_currency_symbol, convert_currency
     
     currency_symbol = get_currency_symbol(report.currency)
+    rates = _get_report_rates(report)
     msg = get_text('report_category_breakdown', user_id=user_id) + '\n\n'
     
     # Доходи по категоріях
@@ -152,8 +159,7 @@ def format_category_breakdown(report: ReportData, user_id: int = None, top_n: in
                         for curr, amount in sorted(currencies.items()):
                             curr_symbol = get_currency_symbol(curr)
                             if curr != report.currency:
-                                from utils.currency_converter import convert_currency
-                                converted = convert_currency(amount, curr, report.currency)
+                                converted = convert_currency(amount, curr, report.currency, rates=rates)
                                 msg += f"    ◦ {amount:.2f} {curr_symbol} <i>(≈ {converted:.2f} {currency_symbol})</i>\n"
                             else:
                                 msg += f"    ◦ {amount:.2f} {curr_symbol}\n"
@@ -221,8 +227,7 @@ def format_category_breakdown(report: ReportData, user_id: int = None, top_n: in
                         for curr, amount in sorted(currencies.items()):
                             curr_symbol = get_currency_symbol(curr)
                             if curr != report.currency:
-                                from utils.currency_converter import convert_currency
-                                converted = convert_currency(amount, curr, report.currency)
+                                converted = convert_currency(amount, curr, report.currency, rates=rates)
                                 msg += f"    ◦ {amount:.2f} {curr_symbol} <i>(≈ {converted:.2f} {currency_symbol})</i>\n"
                             else:
                                 msg += f"    ◦ {amount:.2f} {curr_symbol}\n"
@@ -275,9 +280,10 @@ def format_statistics(report: ReportData, user_id: int = None) -> str:
     Returns:
         str: Відформатована статистика
     """
-    from utils.currency_converter import get_currency_symbol
+    from utils.currency_converter import get_currency_symbol, convert_currency
     
     currency_symbol = get_currency_symbol(report.currency)
+    rates = _get_report_rates(report)
     
     msg = get_text('report_statistics', user_id=user_id) + '\n'
     msg += f"📊 {get_text('report_transaction_count', user_id=user_id)}: <b>{report.transaction_count}</b>\n"
@@ -291,7 +297,10 @@ def format_statistics(report: ReportData, user_id: int = None) -> str:
         if report.income_by_currency and len(report.income_by_currency) > 0:
             for curr, total_amount in report.income_by_currency.items():
                 # Рахуємо кількість доходів в цій валюті
-                income_count_in_currency = sum(1 for inc in report.incomes if getattr(inc, 'currency', 'UAH') == curr)
+                if report.income_count_by_currency is not None:
+                    income_count_in_currency = report.income_count_by_currency.get(curr, 0)
+                else:
+                    income_count_in_currency = sum(1 for inc in report.incomes if getattr(inc, 'currency', 'UAH') == curr)
                 if income_count_in_currency > 0:
                     avg_amount = total_amount / income_count_in_currency
                     curr_symbol = get_currency_symbol(curr)
@@ -299,8 +308,7 @@ def format_statistics(report: ReportData, user_id: int = None) -> str:
                     if curr == report.currency:
                         msg += f"    • {avg_amount:.2f} {curr_symbol}\n"
                     else:
-                        from utils.currency_converter import convert_currency
-                        converted = convert_currency(avg_amount, curr, report.currency)
+                        converted = convert_currency(avg_amount, curr, report.currency, rates=rates)
                         msg += f"    • {avg_amount:.2f} {curr_symbol} <i>(≈ {converted:.2f} {currency_symbol})</i>\n"
     
     # Середня витрата з розбивкою по валютах
@@ -310,7 +318,10 @@ def format_statistics(report: ReportData, user_id: int = None) -> str:
         if report.expense_by_currency and len(report.expense_by_currency) > 0:
             for curr, total_amount in report.expense_by_currency.items():
                 # Рахуємо кількість витрат в цій валюті
-                expense_count_in_currency = sum(1 for exp in report.expenses if getattr(exp, 'currency', 'UAH') == curr)
+                if report.expense_count_by_currency is not None:
+                    expense_count_in_currency = report.expense_count_by_currency.get(curr, 0)
+                else:
+                    expense_count_in_currency = sum(1 for exp in report.expenses if getattr(exp, 'currency', 'UAH') == curr)
                 if expense_count_in_currency > 0:
                     avg_amount = total_amount / expense_count_in_currency
                     curr_symbol = get_currency_symbol(curr)
@@ -318,8 +329,7 @@ def format_statistics(report: ReportData, user_id: int = None) -> str:
                     if curr == report.currency:
                         msg += f"    • {avg_amount:.2f} {curr_symbol}\n"
                     else:
-                        from utils.currency_converter import convert_currency
-                        converted = convert_currency(avg_amount, curr, report.currency)
+                        converted = convert_currency(avg_amount, curr, report.currency, rates=rates)
                         msg += f"    • {avg_amount:.2f} {curr_symbol} <i>(≈ {converted:.2f} {currency_symbol})</i>\n"
     
     msg += '\n'
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Черга фонових задач генерації HTML звітів.
+Задача - корутина. У середовищі threaded задачі виконуються в обмеженому пулі
+потоків (HTML_REPORT_WORKERS), в asyncio - задачами циклу подій, з яких
+одночасно працює не більше HTML_REPORT_WORKERS. Обробники Telegram не чекають
+на рендеринг та відправку файлу.
+Одночасно для користувача виконується не більше однієї задачі.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Callable, Dict, Optional
+from config.config import HTML_REPORT_WORKERS
+from config.constants import HTML_REPORT_MAX_PENDING
+from utils.handler_runtime import in_async_runtime, run_coroutine
+
+_executor: Optional[ThreadPoolExecutor] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+_in_flight: Dict[int, object] = {}  # {user_id: Future або asyncio.Task}
+_jobs_lock = Lock()
+_jobs_stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'deduplicated': 0, 'rejected': 0}
+
+# Результати submit_report_job
+JOB_SUBMITTED = 'submitted'
+JOB_IN_PROGRESS = 'in_progress'
+JOB_QUEUE_FULL = 'queue_full'
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=HTML_REPORT_WORKERS, thread_name_prefix='html-report')
+    return _executor
+
+
+async def _run_job(user_id: int, job: Callable, args: tuple):
+    try:
+        await job(*args)
+        succeeded = True
+    except Exception as e:
+        print(f"[ERROR] HTML report job failed for user {user_id}: {e}", flush=True)
+        import traceback
+        traceback.print_exc()
+        succeeded = False
+    finally:
+        with _jobs_lock:
+            _in_flight.pop(user_id, None)
+    
+    with _jobs_lock:
+        _jobs_stats['completed' if succeeded else 'failed'] += 1
+
+
+async def _run_limited_job(user_id: int, job: Callable, args: tuple):
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(HTML_REPORT_WORKERS)
+    async with _semaphore:
+        await _run_job(user_id, job, args)
+
+
+def submit_report_job(user_id: int, job: Callable, *args) -> str:
+    """
+    Поставити задачу генерації звіту в чергу.
+    
+    Args:
+        user_id: ID користувача (не більше однієї задачі на користувача)
+        job: Корутинна функція, що виконує генерацію та відправку
+        *args: Аргументи для job
+    
+    Returns:
+        str: JOB_SUBMITTED, JOB_IN_PROGRESS (у користувача вже є задача)
+             або JOB_QUEUE_FULL (черга переповнена)
+    """
+    with _jobs_lock:
+        if user_id in _in_flight:
+            _jobs_stats['deduplicated'] += 1
+            return JOB_IN_PROGRESS
+        
+        if len(_in_flight) >= HTML_REPORT_MAX_PENDING:
+            _jobs_stats['rejected'] += 1
+            return JOB_QUEUE_FULL
+        
+        _jobs_stats['submitted'] += 1
+        if in_async_runtime():
+            _in_flight[user_id] = asyncio.get_running_loop().create_task(_run_limited_job(user_id, job, args))
+        else:
+            _in_flight[user_id] = _get_executor().submit(run_coroutine, _run_job(user_id, job, args))
+    
+    return JOB_SUBMITTED
+
+
+def get_report_jobs_stats() -> Dict:
+    """
+    Метрики черги звітів.
+    
+    Returns:
+        Dict: submitted, completed, failed, deduplicated, rejected,
+              in_flight (задачі в черзі та в роботі), workers
+    """
+    with _jobs_lock:
+        stats = dict(_jobs_stats)
+        stats['in_flight'] = len(_in_flight)
+    stats['workers'] = HTML_REPORT_WORKERS
+    return stats
+
+
+async def wait_report_tasks():
+    """Дочекатися задач циклу подій (BOT_RUNTIME=asyncio, перед зупинкою циклу)."""
+    with _jobs_lock:
+        tasks = [task for task in _in_flight.values() if isinstance(task, asyncio.Task)]
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def shutdown_report_jobs(wait: bool = True):
+    """Зупинити пул (при зупинці бота), дочекавшись поточних задач."""
+    global _executor
+    
+    with _jobs_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+Сховища стану багатокрокових діалогів {user_id: значення}.
+
+MemoryStateStore - словник в пам'яті з TTL (покинутий діалог забувається)
+та обмеженням кількості записів (витісняються найдавніше використані).
+SQLiteStateStore - те саме, але кожна зміна записується в таблицю
+conversation_states, а при першому зверненні стан завантажується з неї,
+тому перезапуск бота не обриває незавершені діалоги. Читання в обох
+сховищах - з пам'яті, без звернень до БД. У середовищі asyncio стан
+завантажується при старті (load_state_stores), а записи виконуються в
+окремому потоці, тож цикл подій не чекає на SQLite.
+
+Значення повертаються без копіювання: після зміни значення його потрібно
+записати назад (store[user_id] = state), інакше зміна не потрапить у БД.
+Для SQLiteStateStore значення мають серіалізуватись у JSON.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+from config.constants import (
+    CONVERSATION_STATE_TTL,
+    CONVERSATION_STATE_MAX_ENTRIES,
+    CONVERSATION_STATE_SWEEP_INTERVAL,
+)
+
+_MISSING = object()
+
+# Створені SQLite сховища (для load_state_stores) і потік записів для asyncio
+_sqlite_stores: List['SQLiteStateStore'] = []
+_writer: Optional[ThreadPoolExecutor] = None
+_writer_lock = threading.Lock()
+
+
+def _write(error_message: str, func: Callable, *args):
+    try:
+        func(*args)
+    except Exception as e:
+        # Діалог продовжується зі станом у пам'яті, втрачається лише стійкість до перезапуску
+        print(f"[!] {error_message}: {e}", flush=True)
+
+
+def _submit_write(error_message: str, func: Callable, *args):
+    """
+    Записати зміну стану в БД. У середовищі asyncio - в потоці записів:
+    один потік на всі сховища, тому записи виконуються в порядку змін.
+    """
+    from utils.handler_runtime import in_async_runtime
+
+    global _writer
+    if not in_async_runtime():
+        _write(error_message, func, *args)
+        return
+    with _writer_lock:
+        if _writer is None:
+            _writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='state-writer')
+        _writer.submit(_write, error_message, func, *args)
+
+
+class MemoryStateStore:
+    """
+    Обмежене сховище стану в пам'яті процесу.
+
+    Attributes:
+        name: Назва сховища (namespace у БД для SQLiteStateStore)
+        ttl: Скільки секунд запис живе після останнього запису
+        max_entries: Максимум записів; понад нього витісняються найдавніше використані
+    """
+
+    def __init__(self, name: str, ttl: int = CONVERSATION_STATE_TTL,
+                 max_entries: int = CONVERSATION_STATE_MAX_ENTRIES):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # {user_id: (expires_at, value)}, від найдавніше до найнещодавніше використаних
+        self._entries: 'OrderedDict[int, tuple]' = OrderedDict()
+        self._lock = threading.RLock()
+        self._next_sweep = 0.0
+
+    def get(self, user_id: int, default: Any = None) -> Any:
+        """Значення користувача або default, якщо його немає чи воно прострочене."""
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return default
+            if entry[0] <= time.time():
+                self._remove([user_id])
+                return default
+            self._entries.move_to_end(user_id)
+            return entry[1]
+
+    def __getitem__(self, user_id: int) -> Any:
+        value = self.get(user_id, _MISSING)
+        if value is _MISSING:
+            raise KeyError(user_id)
+        return value
+
+    def __contains__(self, user_id: int) -> bool:
+        return self.get(user_id, _MISSING) is not _MISSING
+
+    def __setitem__(self, user_id: int, value: Any):
+        with self._lock:
+            self._ensure_loaded()
+            now = time.time()
+            expires_at = int(now + self.ttl)
+            self._persist(user_id, value, expires_at)
+            self._entries[user_id] = (expires_at, value)
+            self._entries.move_to_end(user_id)
+
+            if len(self._entries) > self.max_entries:
+                overflow = len(self._entries) - self.max_entries
+                self._remove([key for key, _ in zip(self._entries, range(overflow))])
+            if now >= self._next_sweep:
+                self._sweep(now)
+
+    def __delitem__(self, user_id: int):
+        if self.pop(user_id, _MISSING) is _MISSING:
+            raise KeyError(user_id)
+
+    def pop(self, user_id: int, default: Any = None) -> Any:
+        """Видалити стан користувача та повернути його (default, якщо його немає)."""
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return default
+            self._remove([user_id])
+            return entry[1] if entry[0] > time.time() else default
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._entries)
+
+    def _remove(self, user_ids):
+        for user_id in user_ids:
+            del self._entries[user_id]
+        self._forget(user_ids)
+
+    def _sweep(self, now: float):
+        """Видалити всі прострочені записи."""
+        self._next_sweep = now + CONVERSATION_STATE_SWEEP_INTERVAL
+        expired = [user_id for user_id, (expires_at, _) in self._entries.items() if expires_at <= now]
+        if expired:
+            self._remove(expired)
+
+    # Точки розширення для постійного зберігання
+    def _ensure_loaded(self):
+        pass
+
+    def _persist(self, user_id: int, value: Any, expires_at: int):
+        pass
+
+    def _forget(self, user_ids):
+        pass
+
+
+class SQLiteStateStore(MemoryStateStore):
+    """MemoryStateStore із записом змін у таблицю conversation_states."""
+
+    def __init__(self, name: str, ttl: int = CONVERSATION_STATE_TTL,
+                 max_entries: int = CONVERSATION_STATE_MAX_ENTRIES):
+        super().__init__(name, ttl, max_entries)
+        self._loaded = False
+        _sqlite_stores.append(self)
+
+    def _ensure_loaded(self):
+        # Завантаження - при першому зверненні: сховища створюються при імпорті handlers, а таблиця - в init_db
+        if self._loaded:
+            return
+        from database import load_conversation_states, purge_expired_conversation_states
+
+        self._loaded = True
+        now = int(time.time())
+        try:
+            purge_expired_conversation_states(now)
+            rows = load_conversation_states(self.name, now)
+        except Exception as e:
+            print(f"[!] Could not load conversation states ({self.name}): {e}", flush=True)
+            return
+
+        for user_id, value, expires_at in rows[-self.max_entries:]:
+            self._entries[user_id] = (expires_at, json.loads(value))
+        if rows:
+            print(f"[OK] Restored {len(self._entries)} conversation states ({self.name})", flush=True)
+
+    def _persist(self, user_id: int, value: Any, expires_at: int):
+        from database import save_conversation_state
+
+        # Не-JSON значення - помилка виклику, тому серіалізуємо тут, а не в потоці записів
+        serialized = json.dumps(value, ensure_ascii=False)
+        _submit_write(f"Could not persist conversation state ({self.name})",
+                      save_conversation_state, self.name, user_id, serialized, expires_at)
+
+    def _forget(self, user_ids):
+        from database import delete_conversation_states
+
+        _submit_write(f"Could not delete conversation states ({self.name})",
+                      delete_conversation_states, self.name, list(user_ids))
+
+
+def load_state_stores():
+    """Завантажити стан усіх SQLite сховищ з БД (при старті, до отримання оновлень)."""
+    for store in _sqlite_stores:
+        with store._lock:
+            store._ensure_loaded()
+
+
+def shutdown_state_writer():
+    """Дочекатися записів стану, поставлених у потік записів (при зупинці бота)."""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.shutdown(wait=True)
+
+
+def create_state_store(name: str, ttl: Optional[int] = None):
+    """
+    Створити сховище стану з бекендом STATE_STORE (memory або sqlite).
+
+    Args:
+        name: Унікальна назва сховища
+        ttl: Час життя запису, сек (за замовчуванням CONVERSATION_STATE_TTL)
+
+    Returns:
+        MemoryStateStore або SQLiteStateStore
+    """
+    from config.config import STATE_STORE
+
+    store_class = SQLiteStateStore if STATE_STORE == 'sqlite' else MemoryStateStore
+    return store_class(name, CONVERSATION_STATE_TTL if ttl is None else ttl)
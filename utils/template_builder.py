@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+Збірка шаблону HTML звіту: templates/report.html -> templates/report.min.html.
+Стилі, скрипти та розмітка мінімізуються один раз при збірці, а не в кожному звіті.
+Якщо поруч лежить templates/vendor/chart.umd.min.js, Chart.js вбудовується в шаблон
+замість завантаження з CDN, і звіт відкривається без інтернету.
+
+Запуск вручну: python -m utils.template_builder [--download-chartjs]
+"""
+
+import os
+import re
+import urllib.request
+from pathlib import Path
+from typing import Optional
+
+REPORT_TEMPLATE = 'report.html'
+REPORT_TEMPLATE_MIN = 'report.min.html'
+CHARTJS_VENDOR_PATH = os.path.join('vendor', 'chart.umd.min.js')
+
+_STYLE_RE = re.compile(r'(<style[^>]*>)(.*?)(</style>)', re.S)
+_SCRIPT_RE = re.compile(r'(<script[^>]*>)(.*?)(</script>)', re.S)
+_CHARTJS_TAG_RE = re.compile(r'<script src="(https://[^"]*/chart\.umd\.min\.js)"></script>')
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+_CSS_SPACES_RE = re.compile(r'\s*([{};,>])\s*')
+_CSS_COLON_RE = re.compile(r'(?<=[\w-])\s*:\s+')
+_HTML_COMMENT_RE = re.compile(r'<!--.*?-->', re.S)
+
+
+def minify_css(css: str) -> str:
+    """Прибрати коментарі та зайві пробіли з CSS."""
+    css = _CSS_COMMENT_RE.sub('', css)
+    css = ' '.join(css.split())
+    css = _CSS_SPACES_RE.sub(r'\1', css)
+    css = _CSS_COLON_RE.sub(':', css)
+    return css.replace(';}', '}')
+
+
+def minify_js(js: str) -> str:
+    """
+    Консервативна мінімізація JS: відступи, порожні рядки та рядкові коментарі.
+    Переноси рядків зберігаються, тому автоматична вставка ';' працює як і раніше.
+    """
+    lines = (line.strip() for line in js.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+
+def minify_html(html: str) -> str:
+    """Прибрати HTML коментарі, відступи та порожні рядки (вміст <style>/<script> не чіпає)."""
+    html = _HTML_COMMENT_RE.sub('', html)
+    lines = (line.strip() for line in html.splitlines())
+    return '\n'.join(line for line in lines if line)
+
+
+def _minify_template(source: str) -> str:
+    """Мінімізувати шаблон, не зачіпаючи теги Jinja2."""
+    blocks = []
+
+    def stash(match, minify):
+        blocks.append(match.group(1) + minify(match.group(2)) + match.group(3))
+        return f'\x00{len(blocks) - 1}\x00'
+
+    # Стилі та скрипти мінімізуються окремо і не проходять через мінімізацію розмітки
+    source = _STYLE_RE.sub(lambda match: stash(match, minify_css), source)
+    source = _SCRIPT_RE.sub(lambda match: stash(match, minify_js), source)
+    source = minify_html(source)
+    return re.sub(r'\x00(\d+)\x00', lambda match: blocks[int(match.group(1))], source)
+
+
+def _embed_chartjs(source: str, chartjs: str) -> str:
+    """Замінити тег Chart.js з CDN на вбудований скрипт."""
+    if '{% endraw %}' in chartjs or '</script' in chartjs:
+        raise ValueError('Chart.js bundle cannot be embedded into the template')
+    embedded = '<script>{% raw %}' + chartjs.strip() + '{% endraw %}</script>'
+    return _CHARTJS_TAG_RE.sub(lambda match: embedded, source, count=1)
+
+
+def build_report_template(template_dir: str = 'templates') -> Path:
+    """
+    Зібрати мінімізований шаблон звіту.
+
+    Args:
+        template_dir: Директорія з шаблонами
+
+    Returns:
+        Path: Шлях до зібраного шаблону
+    """
+    template_dir = Path(template_dir)
+    source = (template_dir / REPORT_TEMPLATE).read_text(encoding='utf-8')
+    built = _minify_template(source)
+
+    chartjs_path = template_dir / CHARTJS_VENDOR_PATH
+    if chartjs_path.exists():
+        built = _embed_chartjs(built, chartjs_path.read_text(encoding='utf-8'))
+
+    # Запис через тимчасовий файл, щоб генератор ніколи не прочитав недописаний шаблон
+    target = template_dir / REPORT_TEMPLATE_MIN
+    temp_path = target.with_name(target.name + f'.{os.getpid()}.tmp')
+    temp_path.write_text(built, encoding='utf-8')
+    os.replace(temp_path, target)
+
+    print(f"[*] Built {target}: {len(source.encode('utf-8'))} -> {len(built.encode('utf-8'))} bytes"
+          f"{' (Chart.js embedded)' if chartjs_path.exists() else ''}", flush=True)
+    return target
+
+
+def _is_built_template_fresh(template_dir: Path) -> bool:
+    """Чи зібраний шаблон новіший за вихідний шаблон та Chart.js."""
+    target = template_dir / REPORT_TEMPLATE_MIN
+    if not target.exists():
+        return False
+
+    built_at = target.stat().st_mtime
+    sources = [template_dir / REPORT_TEMPLATE, template_dir / CHARTJS_VENDOR_PATH]
+    return all(built_at >= path.stat().st_mtime for path in sources if path.exists())
+
+
+def ensure_report_template(template_dir: str = 'templates') -> str:
+    """
+    Отримати ім'я шаблону звіту для рендерингу, перезібравши report.min.html за потреби.
+
+    Args:
+        template_dir: Директорія з шаблонами
+
+    Returns:
+        str: REPORT_TEMPLATE_MIN, або REPORT_TEMPLATE якщо зібрати шаблон не вдалося
+    """
+    template_dir = Path(template_dir)
+    try:
+        if not _is_built_template_fresh(template_dir):
+            build_report_template(str(template_dir))
+        return REPORT_TEMPLATE_MIN
+    except (OSError, ValueError) as e:
+        print(f"[WARNING] Failed to build minified report template, using {REPORT_TEMPLATE}: {e}", flush=True)
+        return REPORT_TEMPLATE
+
+
+def download_chartjs(template_dir: str = 'templates', url: Optional[str] = None) -> Path:
+    """
+    Завантажити Chart.js (версію з тегу в report.html) в templates/vendor.
+
+    Args:
+        template_dir: Директорія з шаблонами
+        url: Адреса бандла (за замовчуванням - з шаблону)
+
+    Returns:
+        Path: Шлях до збереженого файлу
+    """
+    template_dir = Path(template_dir)
+    if url is None:
+        match = _CHARTJS_TAG_RE.search((template_dir / REPORT_TEMPLATE).read_text(encoding='utf-8'))
+        if match is None:
+            raise ValueError(f'Chart.js script tag not found in {REPORT_TEMPLATE}')
+        url = match.group(1)
+
+    with urllib.request.urlopen(url, timeout=30) as response:
+        content = response.read()
+
+    target = template_dir / CHARTJS_VENDOR_PATH
+    target.parent.mkdir(exist_ok=True)
+    target.write_bytes(content)
+    print(f"[*] Downloaded {url} -> {target} ({len(content)} bytes)", flush=True)
+    return target
+
+
+if __name__ == '__main__':
+    import sys
+
+    if '--download-chartjs' in sys.argv[1:]:
+        download_chartjs()
+    build_report_template()
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+Пул обробників оновлень з гарантією порядку для кожного користувача.
+
+TeleBot(threaded=True) віддає кожне оновлення в спільний пул потоків, тому
+два оновлення одного користувача (швидкі натискання кнопок, повідомлення
+під час обробки попереднього) можуть виконуватись одночасно та змагатися за
+user_states. ShardedTeleBot розподіляє оновлення за user_id на фіксовану
+кількість черг (шардів): у межах користувача - строго послідовно, різні
+користувачі - паралельно. Один потік на шард, тому весь стан користувача
+змінюється з одного потоку.
+
+Порівняння з TeleBot(num_threads=N): python -m utils.update_dispatcher
+"""
+
+import queue
+import threading
+import time
+from typing import Dict, List
+
+from telebot import TeleBot, types
+
+# Поля Update з подією від користувача (from_user або user)
+_USER_UPDATE_FIELDS = (
+    'message', 'edited_message', 'callback_query', 'inline_query', 'chosen_inline_result',
+    'shipping_query', 'pre_checkout_query', 'poll_answer', 'my_chat_member', 'chat_member',
+    'chat_join_request', 'channel_post', 'edited_channel_post',
+)
+
+
+def get_update_user_id(update: types.Update) -> int:
+    """
+    Ключ шардування оновлення: ID користувача (для каналів - ID чату).
+
+    Returns:
+        int: ID користувача/чату або update_id, якщо в оновленні немає ні того, ні іншого
+    """
+    for field in _USER_UPDATE_FIELDS:
+        event = getattr(update, field, None)
+        if event is None:
+            continue
+        user = getattr(event, 'from_user', None) or getattr(event, 'user', None)
+        if user is not None:
+            return user.id
+        chat = getattr(event, 'chat', None)
+        if chat is not None:
+            return chat.id
+    return update.update_id
+
+
+class ShardedTeleBot(TeleBot):
+    """
+    TeleBot, що виконує обробники в пулі з workers потоків, по черзі на потік.
+
+    Оновлення потрапляє в чергу get_update_user_id(update) % workers, тому
+    оновлення одного користувача обробляються в порядку надходження.
+    process_new_updates лише ставить оновлення в черги, тож polling і webhook
+    не чекають на обробники. Для BOT_RUNTIME=asyncio той самий порядок
+    забезпечує RuntimeAsyncTeleBot (utils/async_runtime.py).
+    """
+
+    def __init__(self, token: str, workers: int, **kwargs):
+        # threaded=False: обробник виконується в потоці шарда, власний пул TeleBot не потрібен
+        super().__init__(token, threaded=False, **kwargs)
+        self.workers = workers
+        self._queues: List[queue.SimpleQueue] = [queue.SimpleQueue() for _ in range(workers)]
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'dispatched': 0, 'processed': 0, 'failed': 0,
+            'max_queue_depth': 0, 'wait_total': 0.0, 'max_wait': 0.0,
+        }
+        self._shard_threads = [
+            threading.Thread(target=self._run_shard, args=(shard_queue,), name=f'bot-shard-{index}', daemon=True)
+            for index, shard_queue in enumerate(self._queues)
+        ]
+        for thread in self._shard_threads:
+            thread.start()
+
+    def process_new_updates(self, updates: List[types.Update]):
+        """Поставити оновлення в черги шардів (обробка - в потоках шардів)."""
+        if not updates:
+            return
+        # Offset наступного getUpdates зсуваємо тут, у потоці polling: базовий
+        # process_new_updates зробив би це лише в потоці шарда після обробки,
+        # і polling отримав би ті самі оновлення ще раз
+        self.last_update_id = max(self.last_update_id, max(update.update_id for update in updates))
+
+        enqueued_at = time.monotonic()
+        max_depth = 0
+        for update in updates:
+            shard_queue = self._queues[get_update_user_id(update) % self.workers]
+            shard_queue.put((enqueued_at, update))
+            max_depth = max(max_depth, shard_queue.qsize())
+
+        with self._stats_lock:
+            self._stats['dispatched'] += len(updates)
+            if max_depth > self._stats['max_queue_depth']:
+                self._stats['max_queue_depth'] = max_depth
+
+    def _run_shard(self, shard_queue: queue.SimpleQueue):
+        while True:
+            item = shard_queue.get()
+            if item is None:
+                return
+
+            enqueued_at, update = item
+            wait = time.monotonic() - enqueued_at
+            try:
+                super().process_new_updates([update])
+                succeeded = True
+            except Exception as e:
+                print(f"[ERROR] Failed to process update {update.update_id}: {e}", flush=True)
+                succeeded = False
+
+            with self._stats_lock:
+                self._stats['processed' if succeeded else 'failed'] += 1
+                self._stats['wait_total'] += wait
+                if wait > self._stats['max_wait']:
+                    self._stats['max_wait'] = wait
+
+    def get_dispatch_stats(self) -> Dict:
+        """
+        Метрики пулу обробників.
+
+        Returns:
+            Dict: workers, dispatched, processed, failed, queued (оновлень у чергах зараз),
+            queue_depths (по шардах), max_queue_depth (найбільша глибина черги),
+            avg_wait / max_wait (час у черзі до початку обробки, сек)
+        """
+        depths = [shard_queue.qsize() for shard_queue in self._queues]
+        with self._stats_lock:
+            stats = dict(self._stats)
+        finished = stats['processed'] + stats['failed']
+        stats['avg_wait'] = stats.pop('wait_total') / finished if finished else 0.0
+        stats['workers'] = self.workers
+        stats['queue_depths'] = depths
+        stats['queued'] = sum(depths)
+        return stats
+
+    def stop_workers(self, wait: bool = True):
+        """Зупинити потоки шардів (при зупинці бота), обробивши вже отримані оновлення."""
+        for shard_queue in self._queues:
+            shard_queue.put(None)
+        if wait:
+            for thread in self._shard_threads:
+                thread.join()
+
+
+def _benchmark(workers: int = 16, users: int = 200, updates_per_user: int = 10, handler_delay: float = 0.005):
+    """
+    Кожен користувач надсилає пакет оновлень підряд; обробник триває handler_delay.
+    Порівнюються час, кількість оновлень, оброблених не по порядку, та
+    одночасних обробок одного користувача: TeleBot(num_threads) vs ShardedTeleBot.
+    """
+    from types import SimpleNamespace
+
+    def make_updates():
+        update_id = 0
+        updates = []
+        # Оновлення користувача йдуть підряд (серія натискань)
+        for user_id in range(1, users + 1):
+            for sequence in range(updates_per_user):
+                update_id += 1
+                updates.append(types.Update.de_json({
+                    'update_id': update_id,
+                    'message': {
+                        'message_id': sequence, 'date': 0, 'text': 'ping',
+                        'chat': {'id': user_id, 'type': 'private'},
+                        'from': {'id': user_id, 'is_bot': False, 'first_name': 'Bench'},
+                    },
+                }))
+        return updates
+
+    def run(label, bot, stop):
+        state = SimpleNamespace(last={}, active=set(), reordered=0, overlapped=0, handled=0)
+        lock = threading.Lock()
+        done = threading.Event()
+        total = users * updates_per_user
+
+        @bot.message_handler(func=lambda message: True)
+        def on_message(message):
+            user_id = message.from_user.id
+            with lock:
+                if user_id in state.active:
+                    state.overlapped += 1
+                state.active.add(user_id)
+                if message.message_id < state.last.get(user_id, -1):
+                    state.reordered += 1
+                state.last[user_id] = message.message_id
+            time.sleep(handler_delay)
+            with lock:
+                state.active.discard(user_id)
+                state.handled += 1
+                if state.handled == total:
+                    done.set()
+
+        updates = make_updates()
+        started = time.perf_counter()
+        # Пакетами по 100, як getUpdates
+        for index in range(0, len(updates), 100):
+            bot.process_new_updates(updates[index:index + 100])
+        done.wait(120)
+        elapsed = time.perf_counter() - started
+        stop()
+        print(f"{label:>26}: {elapsed:5.2f} s, out of order {state.reordered:5d}, "
+              f"concurrent per user {state.overlapped:5d}", flush=True)
+        return bot
+
+    bot = TeleBot('123456:BENCHMARK', num_threads=workers)
+    run(f'TeleBot(num_threads={workers})', bot, bot.worker_pool.close)
+
+    bot = ShardedTeleBot('123456:BENCHMARK', workers=workers)
+    run(f'ShardedTeleBot(workers={workers})', bot, bot.stop_workers)
+    stats = bot.get_dispatch_stats()
+    print(f"{'':>26}  max queue depth {stats['max_queue_depth']}, "
+          f"avg wait {stats['avg_wait'] * 1e3:.1f} ms, max wait {stats['max_wait'] * 1e3:.1f} ms", flush=True)
+
+
+if __name__ == '__main__':
+    _benchmark()
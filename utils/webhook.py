@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""
+Режим webhook: Telegram надсилає оновлення POST-запитами на HTTP сервер бота
+замість циклу getUpdates (infinity_polling).
+
+Сервер - ThreadingHTTPServer зі стандартної бібліотеки (окремий потік на
+з'єднання, без додаткових залежностей). Оновлення передається в
+bot.process_new_updates, обробники виконуються в пулі потоків бота, тому
+Telegram отримує відповідь одразу, не чекаючи обробки.
+
+Порівняння затримки з polling на локальному фейковому Bot API:
+    python -m utils.webhook
+"""
+
+import hmac
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from config.constants import WEBHOOK_MAX_BODY_BYTES, WEBHOOK_MAX_CONNECTIONS
+
+SECRET_TOKEN_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+
+class _WebhookRequestHandler(BaseHTTPRequestHandler):
+    """Приймає оновлення від Telegram: перевіряє шлях, секрет і розмір, передає в бота."""
+
+    # Keep-alive: Telegram перевикористовує з'єднання для наступних оновлень
+    protocol_version = 'HTTP/1.1'
+    server_version = 'BudgetHelperWebhook'
+    # Заголовки і тіло відповіді йдуть окремими записами - без TCP_NODELAY Nagle затримує відповідь на ~40 мс
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        server = self.server
+        if self.path != server.webhook_path:
+            return self._respond(404, close=True)
+        if server.secret_token is not None and not hmac.compare_digest(
+                self.headers.get(SECRET_TOKEN_HEADER, ''), server.secret_token):
+            return self._respond(403, close=True)
+
+        try:
+            length = int(self.headers.get('Content-Length', ''))
+        except ValueError:
+            return self._respond(411, close=True)
+        if length < 0:
+            # rfile.read(-1) читав би до закриття keep-alive з'єднання, займаючи потік сервера
+            return self._respond(400, close=True)
+        if length > WEBHOOK_MAX_BODY_BYTES:
+            return self._respond(413, close=True)
+
+        body = self.rfile.read(length)
+        try:
+            from telebot import types
+            update = types.Update.de_json(body.decode('utf-8'))
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"[WARNING] Webhook: invalid update: {e}", flush=True)
+            return self._respond(400)
+
+        try:
+            server.bot.process_new_updates([update])
+        except Exception as e:
+            # 200 все одно: інакше Telegram повторюватиме те саме оновлення
+            print(f"[ERROR] Webhook: failed to process update {update.update_id}: {e}", flush=True)
+        self._respond(200)
+
+    def do_GET(self):
+        self._respond(405, close=True)
+
+    def _respond(self, status: int, close: bool = False):
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        if close:
+            self.send_header('Connection', 'close')
+            self.close_connection = True
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        # Без рядка в лозі на кожне оновлення
+        pass
+
+
+class WebhookServer(ThreadingHTTPServer):
+    """
+    HTTP сервер webhook, що передає оновлення в bot.process_new_updates.
+
+    Attributes:
+        bot: TeleBot, що обробляє оновлення
+        webhook_path: Шлях, на який Telegram надсилає оновлення
+        secret_token: Очікуваний X-Telegram-Bot-Api-Secret-Token (None - не перевіряти)
+    """
+
+    daemon_threads = True
+    # Черга з'єднань більша за WEBHOOK_MAX_CONNECTIONS (за замовчуванням 5 - решта чекає повторного SYN ~1 с)
+    request_queue_size = 128
+
+    def __init__(self, bot, host: str, port: int, webhook_path: str, secret_token: Optional[str] = None):
+        self.bot = bot
+        self.webhook_path = webhook_path
+        self.secret_token = secret_token
+        super().__init__((host, port), _WebhookRequestHandler)
+
+    @property
+    def port(self) -> int:
+        """Фактичний порт (для port=0 - вибраний системою)."""
+        return self.server_address[1]
+
+
+def start_webhook_server(bot, host: str, port: int, webhook_path: str,
+                         secret_token: Optional[str] = None) -> WebhookServer:
+    """
+    Запустити webhook сервер у фоновому потоці.
+
+    Returns:
+        WebhookServer: Запущений сервер (зупинка - server.shutdown(); server.server_close())
+    """
+    server = WebhookServer(bot, host, port, webhook_path, secret_token)
+    threading.Thread(target=server.serve_forever, name='webhook-server', daemon=True).start()
+    return server
+
+
+def run_webhook(bot, host: str, port: int, webhook_path: str, public_url: Optional[str] = None,
+                secret_token: Optional[str] = None):
+    """
+    Отримувати оновлення через webhook (блокує до KeyboardInterrupt, як infinity_polling).
+
+    Args:
+        bot: TeleBot
+        host: Локальна адреса HTTP сервера
+        port: Локальний порт
+        webhook_path: Шлях webhook
+        public_url: Публічна https адреса; якщо задана - реєструється через setWebhook
+        secret_token: Секрет заголовка X-Telegram-Bot-Api-Secret-Token
+    """
+    server = WebhookServer(bot, host, port, webhook_path, secret_token)
+    try:
+        if public_url:
+            bot.set_webhook(url=public_url + webhook_path, secret_token=secret_token,
+                            max_connections=WEBHOOK_MAX_CONNECTIONS)
+            print(f"[OK] Webhook set: {public_url}{webhook_path}", flush=True)
+        else:
+            print("[WARNING] WEBHOOK_URL is not set, setWebhook skipped", flush=True)
+        print(f"[*] Webhook server listening on {host}:{server.port}{webhook_path}", flush=True)
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+class _FakeBotApi(ThreadingHTTPServer):
+    """
+    Мінімальний Bot API для локальних замірів: getUpdates з long polling,
+    getMe, повідомлення на send* та 'ok' на всі інші методи (із затримкою method_delay, сек - імітація
+    мережі до Telegram). Оновлення додаються через push().
+    """
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, method_delay: float = 0.0):
+        self.method_delay = method_delay
+        self.updates = []
+        self.last_update_id = 0
+        self.condition = threading.Condition()
+        super().__init__(('127.0.0.1', 0), _FakeBotApiHandler)
+
+    def push(self, update: dict):
+        with self.condition:
+            # Як і Telegram, нумеруємо оновлення в порядку надходження - інакше offset пропустить частину
+            self.last_update_id += 1
+            update['update_id'] = self.last_update_id
+            self.updates.append(update)
+            self.condition.notify_all()
+
+    def get_updates(self, offset: int, timeout: float, limit: int = 100) -> list:
+        with self.condition:
+            self.updates = [update for update in self.updates if update['update_id'] >= offset]
+            if not self.updates:
+                self.condition.wait(timeout)
+            return self.updates[:limit]
+
+
+class _FakeBotApiHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def _handle(self):
+        import time
+        from urllib.parse import parse_qsl, urlsplit
+
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            params.update(parse_qsl(self.rfile.read(length).decode('utf-8')))
+
+        if url.path.endswith('/getUpdates'):
+            result = self.server.get_updates(int(params.get('offset', 0)), float(params.get('timeout', 0)))
+        elif url.path.endswith('/getMe'):
+            result = {'id': 123456, 'is_bot': True, 'first_name': 'Benchmark', 'username': 'benchmark_bot'}
+        else:
+            if self.server.method_delay:
+                time.sleep(self.server.method_delay)
+            result = True
+            if '/send' in url.path:
+                result = {'message_id': 1, 'date': 0, 'chat': {'id': int(params.get('chat_id', 0)), 'type': 'private'}}
+        body = json.dumps({'ok': True, 'result': result}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _fake_update(update_id: int) -> dict:
+    """Оновлення з текстовим повідомленням, як від Telegram."""
+    return {
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': 0,
+            'chat': {'id': 1, 'type': 'private'},
+            'from': {'id': 1, 'is_bot': False, 'first_name': 'Bench'},
+            'text': 'ping',
+        },
+    }
+
+
+def _benchmark(count: int = 300, burst: int = 2000, clients: int = 8):
+    """Затримка оновлення (від надходження в Telegram до запуску обробника): polling vs webhook."""
+    import http.client
+    import statistics
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from telebot import TeleBot, apihelper
+
+    api = _FakeBotApi()
+    threading.Thread(target=api.serve_forever, daemon=True).start()
+    apihelper.API_URL = f'http://127.0.0.1:{api.server_address[1]}/bot{{0}}/{{1}}'
+
+    sent = {}
+    handled = {}
+    all_handled = threading.Event()
+    expected = [0]
+
+    def make_bot():
+        bot = TeleBot('123456:BENCHMARK', threaded=True)
+
+        @bot.message_handler(func=lambda message: True)
+        def on_message(message):
+            handled[message.message_id] = time.perf_counter()
+            if len(handled) >= expected[0]:
+                all_handled.set()
+
+        return bot
+
+    def measure(deliver, label):
+        handled.clear()
+        latencies = []
+        # Послідовно: наступне оновлення після обробки попереднього
+        for update_id in range(1, count + 1):
+            expected[0] = update_id
+            all_handled.clear()
+            sent[update_id] = time.perf_counter()
+            deliver([_fake_update(update_id)])
+            all_handled.wait(10)
+            latencies.append(handled[update_id] - sent[update_id])
+
+        # Пакет: burst оновлень від кількох відправників одночасно
+        handled.clear()
+        all_handled.clear()
+        expected[0] = burst
+        first_id = count + 1
+        start = time.perf_counter()
+        with ThreadPoolExecutor(clients) as pool:
+            for offset in range(clients):
+                ids = range(first_id + offset, first_id + burst, clients)
+                pool.submit(deliver, [_fake_update(update_id) for update_id in ids])
+        all_handled.wait(60)
+        elapsed = time.perf_counter() - start
+
+        latencies.sort()
+        print(f"{label:>8}: p50 {statistics.median(latencies) * 1e3:6.2f} ms, "
+              f"p95 {latencies[int(len(latencies) * 0.95)] * 1e3:6.2f} ms, "
+              f"burst {burst / elapsed:7.0f} updates/s", flush=True)
+
+    # Polling: обробник отримує оновлення через getUpdates з фейкового API
+    bot = make_bot()
+    polling = threading.Thread(target=bot.infinity_polling,
+                               kwargs={'timeout': 10, 'long_polling_timeout': 5}, daemon=True)
+    polling.start()
+    time.sleep(0.5)
+
+    def push_updates(updates):
+        for update in updates:
+            api.push(update)
+
+    measure(push_updates, 'polling')
+    bot.stop_polling()
+
+    # Webhook: фейковий клієнт Telegram надсилає POST на локальний сервер
+    bot = make_bot()
+    server = start_webhook_server(bot, '127.0.0.1', 0, '/webhook', 'secret')
+    local = threading.local()
+
+    def post_updates(updates):
+        connection = getattr(local, 'connection', None)
+        if connection is None:
+            connection = local.connection = http.client.HTTPConnection('127.0.0.1', server.port)
+        for update in updates:
+            connection.request('POST', '/webhook', body=json.dumps(update),
+                               headers={'Content-Type': 'application/json', SECRET_TOKEN_HEADER: 'secret'})
+            connection.getresponse().read()
+
+    measure(post_updates, 'webhook')
+    server.shutdown()
+    server.server_close()
+    api.shutdown()
+
+
+if __name__ == '__main__':
+    _benchmark()